@@ -0,0 +1,143 @@
+"""
+AsyncAppointmentChecker benchmark
+
+Bright Data Unlocker endpoint'inin yerine geçen lokal bir aiohttp sunucusu
+açar ve 1, 10, 50 eşzamanlı kontrol için dakikadaki kontrol sayısını ölçer.
+
+Kullanım:
+    python bench_async_checker.py [--latency 0.2] [--rounds 2] [--levels 1,10,50]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+
+from aiohttp import web
+
+CAPTCHA_PNG = (
+    "data:image/png;base64,"
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAAAAAA6fptVAAAACklEQVR4nGNgAAAAAgABSK+kcQAAAABJRU5ErkJggg=="
+)
+
+CAPTCHA_PAGE = f"""<html><body>
+<form method="post"><img class="imageCaptcha" src="{CAPTCHA_PNG}">
+<input name="mailConfirmCode"></form></body></html>"""
+
+FORM_PAGE = """<html><body><div class="appointment-form"><h3>BAŞVURU BİLGİLERİ</h3>
+<select id="city_id"><option value="">Seçiniz</option><option value="6">Ankara</option>
+<option value="35">izmir</option></select></div></body></html>"""
+
+OFFICE_PAGE = """<html><body><div class="appointment-form">
+<select id="office_id"><option value="">Seçiniz</option><option value="12">izmir Ofisi</option></select>
+</div></body></html>"""
+
+VISA_PAGE = """<html><body><div class="appointment-form">
+<select id="visa_purpose_id"><option value="">Seçiniz</option><option value="3">Turistik</option></select>
+<select id="service_type_id"><option value="">Seçiniz</option><option value="1">Standart</option></select>
+</div></body></html>"""
+
+RESULT_PAGE = """<html><body><div class="appointment-form"><h3>BAŞVURU BİLGİLERİ</h3>
+<div class="alert alert-danger">Uygun randevu tarihi bulunmamaktadır.</div>
+<a id="btnAppCountNext" style="display: none">İLERİ</a></div></body></html>"""
+
+
+def make_unlocker_app(latency):
+    """Unlocker API stand-in: payload'a göre bir sonraki form sayfasını döndürür"""
+
+    async def handle(request):
+        payload = await request.json()
+        await asyncio.sleep(latency)
+
+        body = payload.get("body") or ""
+        if payload.get("method") != "POST":
+            html = CAPTCHA_PAGE
+        elif body.startswith("mailConfirmCode="):
+            html = FORM_PAGE
+        elif "applicant_count=" in body:
+            html = RESULT_PAGE
+        elif "visa_purpose_id=" in body:
+            html = VISA_PAGE
+        elif "office_id=" in body:
+            html = VISA_PAGE
+        else:
+            html = OFFICE_PAGE
+        return web.Response(text=html, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_post("/request", handle)
+    return app
+
+
+class FixedSolver:
+    """Ağa çıkmayan sabit cevaplı CAPTCHA çözücü"""
+
+    def solve_captcha_from_base64(self, base64_data):
+        return "123456"
+
+
+async def bench(levels, rounds, latency):
+    runner = web.AppRunner(make_unlocker_app(latency))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    os.environ["BRIGHTDATA_API_URL"] = f"http://127.0.0.1:{port}/request"
+    os.environ.setdefault("BRIGHTDATA_API_KEY", "bench-key")
+    cache_dir = tempfile.mkdtemp()
+
+    # Config ortam değişkenlerini import sırasında okuduğu için burada import edilir
+    from src.checker_async import run_checks
+    from src.form_cache import FormOptionCache
+    from src.unlocker_transport import AsyncUnlockerTransport
+
+    results = []
+    try:
+        for concurrency in levels:
+            count = concurrency * rounds
+            transport = AsyncUnlockerTransport(pool_size=concurrency)
+            # Her seviye soğuk form ID önbelleğiyle başlar (repo dizinine yazılmaz)
+            form_cache = FormOptionCache(os.path.join(cache_dir, f"form_options_{concurrency}.json"))
+            start = time.perf_counter()
+            try:
+                outcomes = await run_checks(
+                    count, concurrency=concurrency, transport=transport,
+                    solver=FixedSolver(), form_cache=form_cache
+                )
+            finally:
+                await transport.close()
+            elapsed = time.perf_counter() - start
+
+            ok = sum(1 for r in outcomes if r['status'] == "😔 Randevu yok")
+            results.append({
+                "concurrency": concurrency,
+                "checks": count,
+                "completed": ok,
+                "seconds": round(elapsed, 2),
+                "checks_per_minute": round(count / elapsed * 60, 1),
+                "pool": transport.stats.as_dict()
+            })
+            print(json.dumps(results[-1]))
+    finally:
+        await runner.cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Stand-in cevap gecikmesi (s)")
+    parser.add_argument("--rounds", type=int, default=2, help="Seviye başına tur sayısı")
+    parser.add_argument("--levels", default="1,10,50", help="Eşzamanlılık seviyeleri")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    levels = [int(level) for level in args.levels.split(",")]
+    asyncio.run(bench(levels, args.rounds, args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+CAPTCHA önbelleği eşleşme kontrolü
+
+Sentetik CAPTCHA'lar üretir (Pillow gerekir; çalışma zamanı bağımlılığı
+değildir) ve src.captcha_cache.CaptchaCache ile iki şeyi ölçer:
+
+- Tek rakamı farklı 54 varyant (aynı arka plan gürültüsüyle) önbellekten
+  cevap almamalı: variant_hits 0 olmalı, aksi halde önbellek yanlış cevap
+  POST ettirir.
+- Aynı görselin yeniden kodlanmış halleri (kayıpsız PNG, JPEG q90 / q70
+  gidiş-dönüş) önbellekten cevap almalı.
+
+Her kod için bir JSON satırı, sonda özet satırı basılır. Tek rakamı farklı
+bir varyant önbellekten cevap alırsa çıkış kodu 1'dir.
+
+Kullanım:
+    python bench_captcha_cache.py [--codes 25] [--max-distance 3] [--seed 0]
+"""
+
+import argparse
+import base64
+import io
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+
+from config.settings import Config
+from src.captcha_cache import CaptchaCache
+from src.captcha_image import perceptual_hash
+
+REENCODES = ('png', 'jpeg90', 'jpeg70')
+
+
+def render(code, seed, Image, ImageDraw, font):
+    """Gri zemin üstüne 6 rakam ve seed'e bağlı gürültü çizgileri"""
+    rng = random.Random(seed)
+    image = Image.new('L', (180, 50), 255)
+    draw = ImageDraw.Draw(image)
+    for index, digit in enumerate(code):
+        draw.text((10 + index * 27, 8), digit, fill=30, font=font)
+    for _ in range(3):
+        draw.line([(rng.randrange(180), rng.randrange(50)), (rng.randrange(180), rng.randrange(50))],
+                  fill=120, width=1)
+    return image
+
+
+def data_url(image, reencode='png'):
+    """Görseli PNG data URL'sine çevir (jpegNN: önce o kalitede JPEG gidiş-dönüşü)"""
+    from PIL import Image
+    if reencode.startswith('jpeg'):
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=int(reencode[4:]))
+        buffer.seek(0)
+        image = Image.open(buffer).convert('L')
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', compress_level=1 if reencode == 'png' else 6)
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--codes", type=int, default=25, help="Denenecek rastgele kod sayısı")
+    parser.add_argument("--max-distance", type=int, default=Config.CAPTCHA_CACHE_MAX_DISTANCE,
+                        help="Rakam hücresi başına izin verilen bit farkı")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
+        print("Pillow gerekli: pip install pillow", file=sys.stderr)
+        return 1
+    try:
+        font = ImageFont.load_default(size=30)
+    except TypeError:
+        font = ImageFont.load_default()
+
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(args.seed)
+    variant_hits = variant_total = 0
+    reencode_hits = {name: 0 for name in REENCODES}
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(args.codes):
+            code = ''.join(rng.choice('0123456789') for _ in range(6))
+            noise = rng.randrange(1000)
+            image = render(code, noise, Image, ImageDraw, font)
+
+            # Her kod için boş önbellek: yalnızca bu kodun cevabı kayıtlı
+            cache = CaptchaCache(os.path.join(directory, f'{code}_{noise}.db'),
+                                 capacity=10, max_distance=args.max_distance)
+            cache.put(perceptual_hash(data_url(image)), code, solve_ms=1000)
+
+            wrong = []
+            for position in range(6):
+                for digit in '0123456789':
+                    if digit == code[position]:
+                        continue
+                    variant = code[:position] + digit + code[position + 1:]
+                    answer, _ = cache.get(perceptual_hash(data_url(render(variant, noise, Image, ImageDraw, font))))
+                    variant_total += 1
+                    if answer is not None:
+                        wrong.append(variant)
+            variant_hits += len(wrong)
+
+            hits = {}
+            for name in REENCODES:
+                answer, _ = cache.get(perceptual_hash(data_url(image, name)))
+                hits[name] = answer == code
+                reencode_hits[name] += answer == code
+            cache.close()
+            print(json.dumps({'code': code, 'variant_hits': wrong, 'reencode_hits': hits}), flush=True)
+
+    print(json.dumps({
+        'codes': args.codes,
+        'max_distance': args.max_distance,
+        'variant_hits': variant_hits,
+        'variants': variant_total,
+        'reencode_hit_rate': {name: round(count / args.codes, 3) for name, count in reencode_hits.items()}
+    }))
+    return 1 if variant_hits else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
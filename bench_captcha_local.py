@@ -0,0 +1,129 @@
+"""
+Yerel CAPTCHA tanıyıcı doğruluk / gecikme benchmark'ı
+
+Etiketli fixture dizinindeki PNG'leri (dosya adı 6 haneli etiketle başlar,
+ör. 483920.png veya 483920_2.png) ikiye böler: ilk kısımdan şablon üretir,
+kalan kısımda tam kod doğruluğunu, rakam doğruluğunu, güven eşiğinin
+altında kalıp Mistral'a düşecek oranı ve gecikme yüzdeliklerini ölçer.
+Görseller, çalışma zamanındaki gibi CAPTCHA_PREPROCESS açıksa ön işlenir.
+
+Kullanım:
+    python bench_captcha_local.py --fixtures fixtures/captcha [--train-ratio 0.5]
+    python bench_captcha_local.py --fixtures fixtures/captcha --build captcha_templates.npz
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import re
+import sys
+import time
+
+from config.settings import Config
+from src.captcha_image import preprocess_captcha
+from src.captcha_local import LocalCaptchaRecognizer
+
+_FIXTURE_RE = re.compile(r'^(\d{6})(?:[_-].*)?\.png$', re.IGNORECASE)
+
+
+def load_fixtures(directory, preprocess=False):
+    """
+    [(data_url, label), ...] (dosya adı sırasıyla)
+
+    preprocess=True ise görseller çalışma zamanındaki gibi ön işlenir.
+    """
+    samples = []
+    for name in sorted(os.listdir(directory)):
+        match = _FIXTURE_RE.match(name)
+        if not match:
+            continue
+        with open(os.path.join(directory, name), 'rb') as f:
+            data_url = "data:image/png;base64," + base64.b64encode(f.read()).decode('ascii')
+        if preprocess:
+            data_url, _ = preprocess_captcha(data_url, max_height=Config.CAPTCHA_PREPROCESS_HEIGHT)
+        samples.append((data_url, match.group(1)))
+    return samples
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def evaluate(recognizer, samples, min_confidence):
+    latencies = []
+    exact = digits = fallback = 0
+    for data_url, label in samples:
+        started = time.perf_counter()
+        text, confidence = recognizer.recognize(data_url)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        if confidence < min_confidence:
+            fallback += 1
+        if text == label:
+            exact += 1
+        if text:
+            digits += sum(a == b for a, b in zip(text, label))
+
+    total = len(samples) or 1
+    return {
+        'samples': len(samples),
+        'accuracy': round(exact / total, 4),
+        'digit_accuracy': round(digits / (total * 6), 4),
+        'fallback_rate': round(fallback / total, 4),
+        'latency_ms_p50': round(percentile(latencies, 50) or 0, 3),
+        'latency_ms_p95': round(percentile(latencies, 95) or 0, 3),
+        'latency_ms_max': round(max(latencies, default=0), 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", default="fixtures/captcha", help="Etiketli PNG dizini")
+    parser.add_argument("--train-ratio", type=float, default=0.5, help="Şablon için ayrılan oran")
+    parser.add_argument("--seed", type=int, default=0, help="Bölme için rastgele tohum")
+    parser.add_argument("--min-confidence", type=float, default=Config.CAPTCHA_LOCAL_MIN_CONFIDENCE)
+    parser.add_argument("--build", metavar="PATH", help="Tüm fixture'lardan şablon üretip kaydet")
+    parser.add_argument("--raw", action="store_true",
+                        help="Ön işleme yapmadan ham görsellerle çalış")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.fixtures):
+        print(f"Fixture dizini bulunamadı: {args.fixtures}", file=sys.stderr)
+        return 1
+
+    samples = load_fixtures(args.fixtures, preprocess=Config.CAPTCHA_PREPROCESS and not args.raw)
+    if not samples:
+        print(f"Etiketli PNG bulunamadı: {args.fixtures}", file=sys.stderr)
+        return 1
+
+    if args.build:
+        recognizer, used = LocalCaptchaRecognizer.build_templates(samples)
+        if not recognizer.available:
+            print("Hiçbir örnek 6 rakama bölünemedi", file=sys.stderr)
+            return 1
+        recognizer.save(args.build)
+        print(json.dumps({'templates': args.build, 'samples_used': used, 'samples': len(samples)}))
+        return 0
+
+    random.Random(args.seed).shuffle(samples)
+    split = max(1, int(len(samples) * args.train_ratio))
+    train, test = samples[:split], samples[split:] or samples
+
+    started = time.perf_counter()
+    recognizer, used = LocalCaptchaRecognizer.build_templates(train)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    result = evaluate(recognizer, test, args.min_confidence)
+    result.update({'train_samples': used, 'build_ms': round(build_ms, 1), 'min_confidence': args.min_confidence})
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+CAPTCHA ön işleme benchmark'ı
+
+Etiketli fixture setinde (bkz. bench_captcha_local.py) ham ve ön işlenmiş
+görselleri karşılaştırır: byte boyutu, ön işleme süresi ve seçilen
+çözücünün iki girdideki doğruluğu / gecikmesi.
+
+--solver local: şablonlar her girdi türü için eğitim kısmından ayrı üretilir
+--solver mistral / 2captcha: gerçek API çağrısı yapar (API anahtarı gerekir)
+
+Kullanım:
+    python bench_captcha_preprocess.py --fixtures fixtures/captcha [--solver local]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from bench_captcha_local import load_fixtures, percentile
+from config.settings import Config
+from src.captcha_answer import normalize_captcha_answer
+from src.captcha_image import preprocess_captcha
+from src.captcha_local import LocalCaptchaRecognizer
+
+
+def network_backend(name):
+    if name == 'mistral':
+        from src.captcha_solver import MistralBackend
+        return MistralBackend(Config.MISTRAL_API_KEY)
+    from src.captcha_twocaptcha import TwoCaptchaBackend
+    return TwoCaptchaBackend(Config.TWOCAPTCHA_API_KEY, Config.TWOCAPTCHA_POLLING_INTERVAL)
+
+
+def measure(solve, samples):
+    """solve(data_url) -> kod; doğruluk ve gecikme yüzdelikleri"""
+    latencies = []
+    exact = 0
+    for data_url, label in samples:
+        started = time.perf_counter()
+        text = solve(data_url)
+        latencies.append((time.perf_counter() - started) * 1000)
+        exact += text == label
+    return {
+        'accuracy': round(exact / (len(samples) or 1), 4),
+        'latency_ms_p50': round(percentile(latencies, 50) or 0, 3),
+        'latency_ms_p95': round(percentile(latencies, 95) or 0, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", default="fixtures/captcha", help="Etiketli PNG dizini")
+    parser.add_argument("--solver", choices=("local", "mistral", "2captcha"), default="local")
+    parser.add_argument("--train-ratio", type=float, default=0.5, help="local: şablon için ayrılan oran")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--height", type=int, default=Config.CAPTCHA_PREPROCESS_HEIGHT)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.fixtures):
+        print(f"Fixture dizini bulunamadı: {args.fixtures}", file=sys.stderr)
+        return 1
+    raw = load_fixtures(args.fixtures)
+    if not raw:
+        print(f"Etiketli PNG bulunamadı: {args.fixtures}", file=sys.stderr)
+        return 1
+
+    processed = []
+    sizes_before, sizes_after, prep_ms = [], [], []
+    for data_url, label in raw:
+        started = time.perf_counter()
+        small, stats = preprocess_captcha(data_url, max_height=args.height)
+        prep_ms.append((time.perf_counter() - started) * 1000)
+        processed.append((small, label))
+        if stats:
+            sizes_before.append(stats['bytes_before'])
+            sizes_after.append(stats['bytes_after'])
+
+    order = list(range(len(raw)))
+    random.Random(args.seed).shuffle(order)
+    split = max(1, int(len(order) * args.train_ratio)) if args.solver == 'local' else 0
+    train_idx, test_idx = order[:split], order[split:] or order
+
+    results = {}
+    for kind, samples in (('raw', raw), ('preprocessed', processed)):
+        test = [samples[i] for i in test_idx]
+        if args.solver == 'local':
+            recognizer, _ = LocalCaptchaRecognizer.build_templates([samples[i] for i in train_idx])
+            solve = lambda data_url: recognizer.recognize(data_url)[0]
+        else:
+            backend = network_backend(args.solver)
+            if not backend.available:
+                print(f"{args.solver} backend'i hazır değil (API anahtarı?)", file=sys.stderr)
+                return 1
+            solve = lambda data_url: normalize_captcha_answer(backend.solve(data_url, threading.Event()))
+        results[kind] = measure(solve, test)
+
+    count = len(sizes_before) or 1
+    print(json.dumps({
+        'solver': args.solver,
+        'samples': len(raw),
+        'test_samples': len(test_idx),
+        'preprocessed': len(sizes_before),
+        'bytes_before_avg': round(sum(sizes_before) / count),
+        'bytes_after_avg': round(sum(sizes_after) / count),
+        'size_ratio': round(sum(sizes_after) / (sum(sizes_before) or 1), 4),
+        'preprocess_ms_p50': round(percentile(prep_ms, 50), 3),
+        'preprocess_ms_p95': round(percentile(prep_ms, 95), 3),
+        'results': results
+    }))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
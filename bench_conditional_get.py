@@ -0,0 +1,133 @@
+"""
+Koşullu GET (ETag / 304) ve yanıt önbelleği benchmark'ı
+
+Birden fazla açık dashboard'un polling trafiğini simüle eder: her sekme
+/api/status (1 sn), /api/progress (500 ms), /api/history ve /api/stats
+(5 sn) çağırır; belirli aralıklarla bir kontrol çalışır ve durum /
+geçmiş değişir. Aynı trafik üç kez çalıştırılır: önbelleksiz ve
+ETag'siz, yalnızca yanıt önbelleğiyle, önbellek + If-None-Match ile;
+istek başına CPU süresi ve depo sorgu sayısı karşılaştırılır. Depo,
+sorgu sayan bellek içi depoyla (MemoryStorage) değiştirilir; Flask test
+istemcisi kullanılır.
+
+Kullanım:
+    python bench_conditional_get.py [--dashboards 5] [--seconds 300] [--check-every 60]
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+from src.storage import MemoryStorage
+
+POLLS = (
+    ('/api/status', 1.0),
+    ('/api/progress', 0.5),
+    ('/api/history', 5.0),
+    ('/api/stats', 5.0),
+)
+
+
+class CountingStorage(MemoryStorage):
+    """Sorgu sayan bellek içi depo (G/Ç yok)"""
+
+    def __init__(self):
+        super().__init__()
+        self.queries = 0
+
+    def write_batch(self, checks=(), captchas=()):
+        self.queries += 1
+        return super().write_batch(checks, captchas)
+
+    def get_history(self, *args, **kwargs):
+        self.queries += 1
+        return super().get_history(*args, **kwargs)
+
+    def get_stats(self):
+        self.queries += 1
+        return super().get_stats()
+
+
+def fake_check(progress_callback=None):
+    for step in range(1, 7):
+        if progress_callback:
+            progress_callback(step, f"Adım {step}")
+    return {'status': '😔 Randevu yok', 'captcha_image': None, 'captcha_text': '123456'}
+
+
+def run(app_module, dashboards, seconds, check_every, conditional, cache):
+    db = CountingStorage()
+    db.write_batch(checks=[
+        {'timestamp': datetime.now(), 'status': 'success', 'message': '😔 Randevu yok', 'response_time': 1000}
+        for _ in range(50)
+    ])
+    db.queries = 0
+    app_module.storage = db
+    app_module.response_cache.ttl = app_module.Config.RESPONSE_CACHE_TTL if cache else 0
+    app_module.response_cache.invalidate()
+    app_module.checker.run_check = fake_check
+    client = app_module.app.test_client()
+
+    etags = [{} for _ in range(dashboards)]
+    requests = not_modified = 0
+    cpu = 0.0
+    tick = 0.5
+    for step in range(int(seconds / tick)):
+        now = step * tick
+        if check_every and step and now % check_every == 0:
+            app_module.scheduled_check()
+            app_module.persistence.flush()
+
+        for tab in etags:
+            for path, interval in POLLS:
+                if now % interval:
+                    continue
+                headers = {'If-None-Match': tab[path]} if conditional and path in tab else {}
+                started = time.process_time()
+                response = client.get(path, headers=headers)
+                cpu += time.process_time() - started
+                requests += 1
+                if response.status_code == 304:
+                    not_modified += 1
+                elif response.headers.get('ETag'):
+                    tab[path] = response.headers['ETag']
+
+    return {
+        'conditional': conditional,
+        'cache': cache,
+        'requests': requests,
+        'not_modified': not_modified,
+        'cpu_us_per_request': round(cpu / requests * 1e6, 1),
+        'db_queries': db.queries,
+        'db_queries_per_request': round(db.queries / requests, 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dashboards", type=int, default=5, help="Açık sekme sayısı")
+    parser.add_argument("--seconds", type=int, default=300, help="Simüle edilen süre")
+    parser.add_argument("--check-every", type=int, default=60, help="Kontrol aralığı (sn)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    os.environ.setdefault('STORAGE_BACKEND', 'memory')  # Açılışta MySQL / SQLite'a bağlanma
+    os.environ.setdefault('STORAGE_FALLBACK', '')
+    import src.app as app_module
+
+    results = [
+        run(app_module, args.dashboards, args.seconds, args.check_every, conditional, cache)
+        for conditional, cache in ((False, False), (False, True), (True, True))
+    ]
+    plain = results[0]
+    for result in results:
+        result['cpu_saved_pct'] = round(100 * (1 - result['cpu_us_per_request'] / plain['cpu_us_per_request']), 1)
+        result['db_queries_saved_pct'] = round(100 * (1 - result['db_queries'] / max(plain['db_queries'], 1)), 1)
+        print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+SQLite kontrol geçmişi benchmark'ı
+
+Verilen satır sayılarında (varsayılan 10^5 ve 10^6) iki katmanı
+karşılaştırır:
+
+legacy: her çağrıda yeni bağlantı, varsayılan journal (DELETE,
+        synchronous=FULL), timestamp indeksi yok
+current: src.database.Database (tek bağlantı, WAL, synchronous=NORMAL,
+        migrasyonla gelen timestamp indeksi)
+
+Ölçülenler: tek kayıtlık log_check ile saniyedeki insert, 100'lük
+log_checks ile saniyedeki insert ve get_recent_checks(50) gecikmesi
+(p50 / p99). Veritabanları geçici dizinde oluşturulur.
+
+Kullanım:
+    python bench_sqlite.py [--rows 100000 1000000] [--inserts 1000] [--queries 50]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench_captcha_local import percentile
+from src.database import Database, SELECT_RECENT
+
+
+class LegacyDatabase:
+    """Önceki katman: çağrı başına bağlantı, pragma ve indeks yok"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS checks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                status TEXT,
+                appointment_found BOOLEAN,
+                error TEXT
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def log_checks(self, checks):
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany('''
+            INSERT INTO checks (timestamp, status, appointment_found, error)
+            VALUES (COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?)
+        ''', [
+            (c.get('timestamp'), c['status'], bool(c.get('appointment_found')), c.get('error'))
+            for c in checks
+        ])
+        conn.commit()
+        conn.close()
+        return True
+
+    def log_check(self, status, appointment_found=False, error=None):
+        self.log_checks([{'status': status, 'appointment_found': appointment_found, 'error': error}])
+
+    def get_recent_checks(self, limit=50):
+        conn = sqlite3.connect(self.db_path)
+        results = conn.execute(SELECT_RECENT, (limit,)).fetchall()
+        conn.close()
+        return results
+
+    def close(self):
+        pass
+
+
+def populate(db, rows, chunk=10000):
+    """Bir dakika aralıklı, geçmişe uzanan satırlar"""
+    start = datetime(2020, 1, 1)
+    for offset in range(0, rows, chunk):
+        db.log_checks([
+            {
+                'timestamp': (start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'),
+                'status': 'success' if i % 20 else 'error',
+                'appointment_found': False,
+                'error': None if i % 20 else 'timeout'
+            }
+            for i in range(offset, min(offset + chunk, rows))
+        ])
+
+
+def run(layer, rows, inserts, queries, directory):
+    path = os.path.join(directory, f'{layer}_{rows}.db')
+    db = LegacyDatabase(path) if layer == 'legacy' else Database(path)
+
+    started = time.perf_counter()
+    populate(db, rows)
+    populate_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(inserts):
+        db.log_check('success')
+    single = inserts / (time.perf_counter() - started)
+
+    batch = [{'status': 'success'} for _ in range(100)]
+    started = time.perf_counter()
+    for _ in range(max(1, inserts // 100)):
+        db.log_checks(batch)
+    batched = max(1, inserts // 100) * 100 / (time.perf_counter() - started)
+
+    latencies = []
+    for _ in range(queries):
+        started = time.perf_counter()
+        db.get_recent_checks(50)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    db.close()
+    return {
+        'layer': layer,
+        'rows': rows,
+        'populate_s': round(populate_s, 2),
+        'inserts_per_s': round(single, 1),
+        'batched_inserts_per_s': round(batched, 1),
+        'history_p50_ms': round(percentile(latencies, 50), 3),
+        'history_p99_ms': round(percentile(latencies, 99), 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs='+', default=[100000, 1000000], help="Tablo boyutları")
+    parser.add_argument("--inserts", type=int, default=1000, help="Tek kayıtlık insert sayısı")
+    parser.add_argument("--queries", type=int, default=50, help="Geçmiş sorgusu sayısı")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            for layer in ('legacy', 'current'):
+                print(json.dumps(run(layer, rows, args.inserts, args.queries, directory)), flush=True)
+
+
+if __name__ == '__main__':
+    main()
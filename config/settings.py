@@ -11,9 +11,94 @@ class Config:
     
     # Mistral AI
     MISTRAL_API_KEY = os.getenv('MISTRAL_API_KEY')
+    MISTRAL_POOL_SIZE = int(os.getenv('MISTRAL_POOL_SIZE', 4))  # Keep-alive bağlantı havuzu
+    MISTRAL_KEEPALIVE = int(os.getenv('MISTRAL_KEEPALIVE', 120))  # saniye (boşta bağlantı ömrü)
+    MISTRAL_TIMEOUT = float(os.getenv('MISTRAL_TIMEOUT', 30))  # saniye
+    CAPTCHA_WARMUP = os.getenv('CAPTCHA_WARMUP', 'True').lower() == 'true'  # Başlangıçta bağlantıyı ısıt
+    
+    # Yerel CAPTCHA tanıyıcı (güven eşiğin altındaysa Mistral'a düşer).
+    # Repo şablon ya da etiketli fixture içermez; tanıyıcı varsayılan olarak
+    # KAPALIDIR. Açmak için etiketli görsellerden şablon üretin
+    # (python bench_captcha_local.py --fixtures <dizin> --build captcha_templates.npz)
+    # ve CAPTCHA_BACKENDS'in başına 'local' ekleyin.
+    CAPTCHA_LOCAL_TEMPLATES = os.getenv('CAPTCHA_LOCAL_TEMPLATES', 'captcha_templates.npz')
+    CAPTCHA_LOCAL_MIN_CONFIDENCE = float(os.getenv('CAPTCHA_LOCAL_MIN_CONFIDENCE', 0.8))
+    
+    # CAPTCHA ön işleme: kırp, eşikle, küçült, 1-bit PNG (tüm çözücülerden önce).
+    # Çözücü doğruluğuna etkisi etiketli fixture setinde ölçülmedi
+    # (bench_captcha_preprocess.py); ölçülene kadar varsayılan olarak kapalı.
+    CAPTCHA_PREPROCESS = os.getenv('CAPTCHA_PREPROCESS', 'False').lower() == 'true'
+    CAPTCHA_PREPROCESS_HEIGHT = int(os.getenv('CAPTCHA_PREPROCESS_HEIGHT', 32))  # piksel
+    
+    # 2Captcha
+    TWOCAPTCHA_API_KEY = os.getenv('APIKEY_2CAPTCHA')
+    TWOCAPTCHA_POLLING_INTERVAL = float(os.getenv('TWOCAPTCHA_POLLING_INTERVAL', 2))  # saniye
+    
+    # CAPTCHA çözücü backend'leri (virgülle ayrılmış, sırasıyla kaydedilir).
+    # Listede 'local' varsa yarıştan önce denenir; ağ backend'lerinden beklenen
+    # süresi en düşük CAPTCHA_RACE_WIDTH tanesi aynı anda yarıştırılır.
+    # Yarışın bedeli: gruptaki her backend görseli alır ve ücretli servisler
+    # (2captcha send() anında ücretlendirir) kaybetseler de ücret keser; 2
+    # genişlik her CAPTCHA'da 2captcha harcamasını ikiye katlar. Varsayılan 1:
+    # backend'ler sırayla, bir önceki başarısız olursa yedek olarak denenir.
+    CAPTCHA_BACKENDS = [
+        name.strip() for name in os.getenv('CAPTCHA_BACKENDS', 'mistral,2captcha').split(',')
+        if name.strip()
+    ]
+    CAPTCHA_RACE_WIDTH = int(os.getenv('CAPTCHA_RACE_WIDTH', 1))
+    CAPTCHA_SOLVE_TIMEOUT = float(os.getenv('CAPTCHA_SOLVE_TIMEOUT', 60))  # saniye
+    
+    # Bozuk (6 haneye indirgenemeyen) cevapta POST yerine önce çözücüye yeniden
+    # sor, yine olmazsa yeni CAPTCHA sayfası iste
+    CAPTCHA_MAX_REASKS = int(os.getenv('CAPTCHA_MAX_REASKS', 1))
+    CAPTCHA_MAX_REFETCH = int(os.getenv('CAPTCHA_MAX_REFETCH', 1))
+    
+    # Kabul edilen cevapların algısal hash önbelleği (SQLite'a kalıcı, 0 = kapalı)
+    CAPTCHA_CACHE_SIZE = int(os.getenv('CAPTCHA_CACHE_SIZE', 2000))
+    CAPTCHA_CACHE_MAX_DISTANCE = int(os.getenv('CAPTCHA_CACHE_MAX_DISTANCE', 3))  # bit, rakam hücresi başına
+    CAPTCHA_CACHE_DB = os.getenv('CAPTCHA_CACHE_DB', 'appointments.db')
+    
+    # Arka plan iş kuyruğu (kontroller HTTP isteği dışında çalışır)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 1))
+    JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', 10))
+    JOB_HISTORY = int(os.getenv('JOB_HISTORY', 100))
+    
+    # SSE (/api/stream): istemci başına sınırlı kuyruk, heartbeat, yeniden bağlanma
+    SSE_HEARTBEAT = int(os.getenv('SSE_HEARTBEAT', 15))  # saniye
+    SSE_MAX_DURATION = int(os.getenv('SSE_MAX_DURATION', 300))  # saniye, sonra yeniden bağlanır
+    SSE_CLIENT_QUEUE = int(os.getenv('SSE_CLIENT_QUEUE', 200))
+    SSE_MAX_CLIENTS = int(os.getenv('SSE_MAX_CLIENTS', 8))
+    SSE_HISTORY = int(os.getenv('SSE_HISTORY', 500))  # Last-Event-ID için tutulan olay
+    
+    # /api/history ve /api/stats yanıt önbelleği (yazmada temizlenir, bu süre güvenlik sınırı)
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 300))  # saniye
+    
+    # Write-behind kalıcılık (kontrol / CAPTCHA kayıtları toplu yazılır)
+    PERSIST_BATCH_SIZE = int(os.getenv('PERSIST_BATCH_SIZE', 100))  # Bu kadar kayıtta hemen yaz
+    PERSIST_FLUSH_INTERVAL = float(os.getenv('PERSIST_FLUSH_INTERVAL', 2.0))  # saniye
+    PERSIST_MAX_PENDING = int(os.getenv('PERSIST_MAX_PENDING', 10000))  # Dolunca yeni kayıt düşürülür
+    
+    # Kalıcı depo: mysql / sqlite / memory. Birincil yazamazsa yedeğe yazılır,
+    # geri gelince replay journal'daki kayıtlar ona aktarılır (yedek boşsa failover yok)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'mysql')
+    STORAGE_FALLBACK = os.getenv('STORAGE_FALLBACK', 'sqlite')
+    STORAGE_DB = os.getenv('STORAGE_DB', 'appointments.db')  # SQLite dosyası
+    STORAGE_RETRY_INTERVAL = float(os.getenv('STORAGE_RETRY_INTERVAL', 30))  # saniye
+    STORAGE_JOURNAL_MAX = int(os.getenv('STORAGE_JOURNAL_MAX', 50000))  # Journal'da tutulan en fazla kayıt
+    # Journal'ı diske yaz (boş: bellekte); MySQL kesintisinde yeniden başlatmaya dayanır
+    STORAGE_SPOOL = os.getenv('STORAGE_SPOOL', 'storage_spool.bin')
+    STORAGE_SPOOL_FSYNC_INTERVAL = float(os.getenv('STORAGE_SPOOL_FSYNC_INTERVAL', 1.0))  # saniye
+    # Birincilin reddettiği (veri / deyim hatası) batch'ler; boş: yalnızca loglanır
+    STORAGE_DEAD_LETTER = os.getenv('STORAGE_DEAD_LETTER', 'storage_dead_letter.jsonl')
+    MYSQL_RECONNECT_INTERVAL = float(os.getenv('MYSQL_RECONNECT_INTERVAL', 5))  # İlk deneme (saniye, 60'a kadar katlanır)
     
     # Bright Data Unlocker API
     BRIGHTDATA_API_KEY = os.getenv('BRIGHTDATA_API_KEY')
+    BRIGHTDATA_API_URL = os.getenv('BRIGHTDATA_API_URL', 'https://api.brightdata.com/request')
+    BRIGHTDATA_POOL_SIZE = int(os.getenv('BRIGHTDATA_POOL_SIZE', 10))  # Keep-alive bağlantı havuzu
+    BRIGHTDATA_KEEPALIVE = int(os.getenv('BRIGHTDATA_KEEPALIVE', 60))  # saniye (boşta bağlantı ömrü)
+    BRIGHTDATA_CONNECT_TIMEOUT = float(os.getenv('BRIGHTDATA_CONNECT_TIMEOUT', 10))  # saniye
+    BRIGHTDATA_READ_TIMEOUT = float(os.getenv('BRIGHTDATA_READ_TIMEOUT', 45))  # saniye (max 44.74s görüldü)
     
     # Randevu URL
     APPOINTMENT_URL = 'https://it-tr-appointment.idata.com.tr/tr'
@@ -23,6 +108,86 @@ class Config:
     MAX_RETRIES = int(os.getenv('MAX_RETRIES', 5))
     CLOUDFLARE_TIMEOUT = int(os.getenv('CLOUDFLARE_TIMEOUT', 30))
     
+    # Form ID önbelleği (appointments.db ile aynı dizinde)
+    FORM_CACHE_PATH = os.getenv('FORM_CACHE_PATH', 'form_options_cache.json')
+    FORM_CACHE_TTL = int(os.getenv('FORM_CACHE_TTL', 86400))  # saniye (24 saat)
+    
+    # Form adımları: seçenekler eksikse back-off ile yeniden isteme
+    FORM_READY_INITIAL_DELAY = float(os.getenv('FORM_READY_INITIAL_DELAY', 0.25))  # saniye
+    FORM_READY_MAX_DELAY = float(os.getenv('FORM_READY_MAX_DELAY', 2))  # saniye
+    FORM_READY_MAX_ATTEMPTS = int(os.getenv('FORM_READY_MAX_ATTEMPTS', 3))
+    
+    # Sayfa sınıflandırıcı kalıpları (büyük/küçük harf duyarsız, düz metin).
+    # PAGE_PATTERNS_FILE verilirse aynı yapıdaki JSON dosyası kategorileri ezer.
+    PAGE_PATTERNS_FILE = os.getenv('PAGE_PATTERNS_FILE')
+    PAGE_PATTERNS = {
+        'cloudflare': [
+            "cloudflare",
+            "attention required"
+        ],
+        'captcha': [
+            "imageCaptcha",
+            "mailConfirmCode"
+        ],
+        'captcha-error': [
+            "yanlış",
+            "hatalı",
+            "geçersiz",
+            "invalid",
+            "incorrect",
+            "wrong"
+        ],
+        'form': [
+            "appointment-form",
+            "başvuru bilgileri",
+            "ikametgah şehri",
+            "idata ofisi seçiniz",
+            "gidiş amacı",
+            "hizmet türü"
+        ],
+        'no-appointment': [
+            "no appointment",
+            "randevu yok",
+            "müsait randevu yok",
+            "no available appointment",
+            "uygun randevu tarihi bulunmamaktadır"
+        ],
+        'appointment-available': [
+            "randevu",
+            "appointment"
+        ]
+    }
+    # Birden çok kategori eşleşirse karar bu sıraya göre verilir
+    PAGE_VERDICT_PRIORITY = [
+        'cloudflare',
+        'form',
+        'captcha-error',
+        'captcha',
+        'no-appointment',
+        'appointment-available'
+    ]
+    
+    # Randevu durumu kontrolünün dar kalıp seti (PAGE_PATTERNS'tan bağımsız).
+    # Form sayfası ham HTML'de büyük/küçük harf duyarlı işaretlerle tanınır;
+    # diğer kategoriler küçük harfe çevrilmiş görünür metinde, önce
+    # 'no-appointment' olmak üzere aranır.
+    AVAILABILITY_FORM_MARKERS = [
+        "appointment-form",
+        "BAŞVURU BİLGİLERİ"
+    ]
+    AVAILABILITY_PATTERNS = {
+        'no-appointment': [
+            "no appointment",
+            "randevu yok",
+            "müsait randevu yok",
+            "no available appointment"
+        ],
+        'appointment-available': [
+            "randevu",
+            "appointment"
+        ]
+    }
+    
     # Chrome Ayarları
     CHROME_BIN = os.getenv('CHROME_BIN', '/usr/bin/chromium-browser')
     CHROMEDRIVER_PATH = os.getenv('CHROMEDRIVER_PATH', '/usr/bin/chromedriver')
@@ -1,30 +1,40 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, abort, make_response, render_template, jsonify, request, stream_with_context, url_for
 from flask_cors import CORS
 from apscheduler.schedulers.background import BackgroundScheduler
 from src.checker_brightdata import AppointmentChecker  # Bright Data Unlocker API kullanıyor!
 from src.notifier import Notifier
-from src.database import Database
-from src.mysql_db import MySQLDatabase
+from src.storage import HISTORY_COLUMNS, create_storage
+from src.rollups import WINDOWS as STATS_WINDOWS, summarize, window_range
+from src.captcha_metrics import CaptchaMetrics, CaptchaTelemetry, WINDOWS
+from src.jobs import JobQueue, JobQueueFull
+from src.events import EventBroker, stream_events
+from src.log_buffer import LogRing, MemoryLogHandler
+from src.image_store import ImageStore
+from src.versions import VersionCounters
+from src.response_cache import ResponseCache
+from src.write_behind import WriteBehindQueue
 from config.settings import Config
+import atexit
+import csv
+import io
+import json
 import logging
+import threading
 import time
+import zlib
+from functools import wraps
 from pathlib import Path
-from collections import deque
 from datetime import datetime
 
-# Memory'de tutulacak log buffer'ı
-log_buffer = deque(maxlen=100)  # Son 100 log mesajı
+# Memory'de tutulacak log buffer'ı (sıra numaralı)
+log_buffer = LogRing(maxlen=100)  # Son 100 log mesajı
 
-class MemoryLogHandler(logging.Handler):
-    """Logları memory'de tutan handler"""
-    def emit(self, record):
-        log_entry = {
-            'timestamp': datetime.fromtimestamp(record.created).strftime('%H:%M:%S'),
-            'level': record.levelname,
-            'logger': record.name,
-            'message': self.format(record)
-        }
-        log_buffer.append(log_entry)
+# SSE: log, progress, durum ve geçmiş değişiklikleri (yalnızca delta)
+events = EventBroker(
+    history=Config.SSE_HISTORY,
+    max_queue=Config.SSE_CLIENT_QUEUE,
+    max_clients=Config.SSE_MAX_CLIENTS
+)
 
 # Logging yapılandırması
 logging.basicConfig(
@@ -33,13 +43,15 @@ logging.basicConfig(
 )
 
 # Memory handler ekle
-memory_handler = MemoryLogHandler()
+# Mesaj metni kayıt okunana kadar (API / SSE) biçimlendirilmez
+memory_handler = MemoryLogHandler(log_buffer, on_entry=lambda entry: events.publish('log', entry))
 memory_handler.setFormatter(logging.Formatter('%(message)s'))
 
 # Tüm logger'lara memory handler ekle
 logging.getLogger('src.checker').addHandler(memory_handler)
 logging.getLogger('src.captcha_solver').addHandler(memory_handler)
 logging.getLogger('src.app').addHandler(memory_handler)
+logging.getLogger('src.jobs').addHandler(memory_handler)
 
 logger = logging.getLogger(__name__)
 
@@ -55,16 +67,43 @@ app.config.from_object(Config)
 
 # Global nesneler
 checker = AppointmentChecker()
+if Config.CAPTCHA_WARMUP:
+    # Mistral bağlantısını ilk kontrolden önce aç (açılışı bloklamadan)
+    threading.Thread(target=checker.warm_up, daemon=True).start()
 notifier = Notifier()
-db = Database()
-mysql_db = MySQLDatabase()  # MySQL database handler
+storage = create_storage(Config)  # MySQL / SQLite / bellek (yedekli)
+atexit.register(storage.close)  # persistence'tan sonra çalışır (atexit ters sırada)
+response_cache = ResponseCache(ttl=Config.RESPONSE_CACHE_TTL)  # history / stats JSON gövdeleri
+
+def on_persisted(batch):
+    """Toplu yazma bitince history / stats önbelleğini ve ETag'lerini eskit"""
+    if 'check' in batch:
+        response_cache.invalidate('history', 'stats')
+        versions.bump('history', 'stats')
+
+persistence = WriteBehindQueue(
+    writers=[lambda batch: storage.write_batch(batch.get('check', ()), batch.get('captcha', ()))],
+    batch_size=Config.PERSIST_BATCH_SIZE,
+    flush_interval=Config.PERSIST_FLUSH_INTERVAL,
+    max_pending=Config.PERSIST_MAX_PENDING,
+    on_flush=on_persisted
+)
+atexit.register(persistence.close)
+captcha_telemetry = CaptchaTelemetry(CaptchaMetrics(), lambda record: persistence.submit('captcha', record))
 scheduler = BackgroundScheduler()
+captcha_images = ImageStore()  # İçerik adresli CAPTCHA görselleri
+versions = VersionCounters()   # status / progress / history / stats ETag sayaçları
+jobs = JobQueue(
+    max_workers=Config.JOB_WORKERS,
+    max_pending=Config.JOB_QUEUE_SIZE,
+    history=Config.JOB_HISTORY
+)
 
 # Durum değişkenleri
 monitoring_active = False
 last_check_time = None
 last_check_status = "Henüz kontrol yapılmadı"
-last_captcha_image = None  # Son CAPTCHA görseli (base64)
+last_captcha_hash = None   # Son CAPTCHA görselinin içerik özeti (/api/captcha/<hash>.png)
 last_captcha_text = None   # Son çözülen CAPTCHA metni
 
 # Progress tracking
@@ -84,42 +123,112 @@ def update_progress(step, message):
         'message': message,
         'timestamp': time.time()
     }
+    versions.bump('progress', 'status')
+    events.publish('progress', current_progress)
     logger.info(f"📊 Progress: [{step}/6] {message}")
 
-def scheduled_check():
-    """Zamanlanmış kontrol"""
-    global last_check_time, last_check_status, last_captcha_image, last_captcha_text, monitoring_active
+def status_snapshot():
+    """/api/status ile aynı tam durum"""
+    return {
+        'monitoring_active': monitoring_active,
+        'last_check_time': last_check_time,
+        'last_check_status': last_check_status,
+        'check_interval': Config.CHECK_INTERVAL,
+        'captcha_hash': last_captcha_hash,
+        'captcha_url': f"/api/captcha/{last_captcha_hash}.png" if last_captcha_hash else None,
+        'captcha_text': last_captcha_text,
+        'progress': current_progress  # Progress bilgisi ekle
+    }
+
+_published_status = {}
+
+def publish_status():
+    """Durumun yalnızca değişen alanlarını SSE ile yayınla (progress ayrı olaydır)"""
+    global _published_status
+    status = status_snapshot()
+    status.pop('progress')
+    changed = {key: value for key, value in status.items() if _published_status.get(key) != value}
+    if changed:
+        _published_status = status
+        versions.bump('status')
+        events.publish('status', changed)
+
+def record_check(status, message=None, captcha_text=None,
+                 appointment_found=False, error=None, response_time=None):
+    """
+    Kontrol sonucunu write-behind kuyruğuna bırak ve SSE ile yayınla
+    
+    Depoya toplu flush sırasında yazılır; history / stats
+    ETag'leri flush tamamlanınca eskir.
+    """
+    record = {
+        'timestamp': datetime.now(),
+        'status': status,
+        'message': message,
+        'captcha_text': captcha_text,
+        'appointment_found': bool(appointment_found),
+        'error': error,
+        'response_time': response_time
+    }
+    persistence.submit('check', record)
+    events.publish('history', dict(record, timestamp=record['timestamp'].isoformat()))
+
+def scheduled_check(job=None):
+    """
+    Zamanlanmış kontrol
+    
+    Args:
+        job: Kontrolü çalıştıran Job (verilirse adımlar işe de yazılır)
+    
+    Returns:
+        dict: {'status': str, 'appointment_found': bool, 'error': str or None}
+    """
+    global last_check_time, last_check_status, last_captcha_hash, last_captcha_text, monitoring_active
     
+    def progress(step, message):
+        update_progress(step, message)
+        if job is not None:
+            job.set_stage(step, message)
+    
+    appointment_found = False
     try:
         logger.info("⏰ Zamanlanmış kontrol başladı")
         start_time = time.time()
         last_check_time = start_time
         last_check_status = "Kontrol ediliyor..."
+        publish_status()
         
         # Progress tracking ile kontrol yap
-        result = checker.run_check(progress_callback=update_progress)
+        result = checker.run_check(progress_callback=progress)
         response_time = int((time.time() - start_time) * 1000)  # milisaniye
         
         # CAPTCHA bilgilerini kaydet
         if isinstance(result, dict):
             last_check_status = result.get('status', 'Bilinmeyen durum')
-            last_captcha_image = result.get('captcha_image')
+            captcha_image = result.get('captcha_image')
+            last_captcha_hash = captcha_images.put(captcha_image) if captcha_image else None
             last_captcha_text = result.get('captcha_text')
             
             # Randevu kontrolü
             appointment_found = "RANDEVU VAR" in last_check_status
             
-            # MySQL'e kaydet
-            mysql_db.log_check(
-                status="success",
+            # Depoya arka planda toplu yazılır
+            record_check(
+                "success",
                 message=last_check_status,
                 captcha_text=last_captcha_text,
                 appointment_found=appointment_found,
                 response_time=response_time
             )
             
-            # SQLite'a da kaydet (backward compatibility)
-            db.log_check("success", appointment_found=appointment_found)
+            # CAPTCHA telemetrisi: histogram + write-behind ile captcha_history
+            if result.get('captcha_solve_ms') is not None:
+                captcha_telemetry.record(
+                    captcha_text=last_captcha_text,
+                    correct=result.get('captcha_correct'),
+                    elapsed_ms=result['captcha_solve_ms'],
+                    posts_saved=result.get('captcha_posts_saved', 0)
+                )
             
             if appointment_found:
                 notifier.notify_appointment_found()
@@ -131,35 +240,91 @@ def scheduled_check():
             last_check_status = str(result)
             appointment_found = bool(result)
             
-            # MySQL'e kaydet
-            mysql_db.log_check(
-                status="success",
+            record_check(
+                "success",
                 message=last_check_status,
                 appointment_found=appointment_found,
                 response_time=response_time
             )
             
-            db.log_check("success", appointment_found=appointment_found)
-            
             if appointment_found:
                 notifier.notify_appointment_found()
                 monitoring_active = False
                 scheduler.pause()
         
+        publish_status()
         logger.info(f"✅ Kontrol tamamlandı: {last_check_status} ({response_time}ms)")
+        return {'status': last_check_status, 'appointment_found': appointment_found, 'error': None}
         
     except Exception as e:
         last_check_status = f"❌ Hata: {str(e)}"
         
-        # MySQL'e hata kaydet
-        mysql_db.log_check(
-            status="error",
-            error=str(e),
-            response_time=int((time.time() - start_time) * 1000) if 'start_time' in locals() else 0
-        )
+        response_time = int((time.time() - start_time) * 1000) if 'start_time' in locals() else 0
         
-        db.log_check("error", error=str(e))
+        record_check("error", error=str(e), response_time=response_time)
+        publish_status()
         logger.error(f"❌ Kontrol hatası: {e}")
+        return {'status': last_check_status, 'appointment_found': False, 'error': str(e)}
+
+def enqueue_check(trigger):
+    """
+    Kontrolü arka plan kuyruğuna ekle (çalışan kontrol varsa ona bağlanır)
+    
+    Returns:
+        tuple: (Job, created: bool)
+    """
+    return jobs.submit('check', scheduled_check, trigger=trigger)
+
+def scheduler_tick():
+    """APScheduler tetikleyicisi: kontrolü kuyruğa at, bekleme"""
+    try:
+        enqueue_check('scheduler')
+    except JobQueueFull as e:
+        logger.warning(f"⚠️ Zamanlanmış kontrol atlandı: {e}")
+
+def job_response(job, created, **extra):
+    """202 Accepted + iş tanıtıcısı"""
+    payload = job.as_dict()
+    payload.update(extra, job_id=job.id, created=created, url=f"/api/jobs/{job.id}")
+    response = jsonify(payload)
+    response.status_code = 202
+    response.headers['Location'] = payload['url']
+    return response
+
+def conditional(name, extra=None):
+    """
+    Koşullu GET: ETag kaynağın sürüm sayacından üretilir
+    
+    If-None-Match eşleşirse view hiç çalışmaz (JSON üretilmez, veritabanı
+    sorgulanmaz) ve 304 döner. Yalnızca 200 yanıtlar ETag alır.
+    
+    Args:
+        extra: Yazma olmadan da değişen yanıtlar için ETag'e katılan
+            değeri döndüren fonksiyon (ör. kayan pencerenin başı)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Sürüm, yanıt üretilmeden önce okunur: arada değişirse istemci
+            # bir sonraki istekte yeni veriyi alır. Sorgu parametreleri
+            # farklı yanıt demek, ETag'e katılır.
+            query = request.query_string
+            parts = [format(zlib.crc32(query), 'x')] if query else []
+            if extra:
+                parts.append(extra())
+            etag = versions.etag(name, *parts)
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+            
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                response.headers['Cache-Control'] = 'no-cache'  # Her seferinde doğrula
+            return response
+        return wrapper
+    return decorator
 
 @app.route('/')
 def index():
@@ -196,25 +361,28 @@ def start_monitoring():
         
         # Yeni job ekle
         scheduler.add_job(
-            scheduled_check,
+            scheduler_tick,
             'interval',
             seconds=interval,
             id='appointment_check',
             replace_existing=True
         )
         
-        # İlk kontrolü hemen yap
-        scheduled_check()
+        # İlk kontrolü hemen kuyruğa at (isteği bekletmeden)
+        job, created = enqueue_check('start')
         
         monitoring_active = True
+        publish_status()
         
         logger.info(f"✅ İzleme başlatıldı (interval: {interval}s)")
-        return jsonify({
-            'status': 'started',
-            'interval': interval,
-            'message': 'İzleme başlatıldı'
-        })
+        return job_response(
+            job, created,
+            status='started',
+            interval=interval
+        )
         
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         logger.error(f"❌ Başlatma hatası: {e}")
         return jsonify({'error': str(e)}), 500
@@ -227,6 +395,7 @@ def stop_monitoring():
     try:
         scheduler.pause()
         monitoring_active = False
+        publish_status()
         
         logger.info("⏹️ İzleme durduruldu")
         return jsonify({
@@ -239,90 +408,288 @@ def stop_monitoring():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/status')
+@conditional('status')
 def get_status():
     """Mevcut durumu getir"""
-    return jsonify({
-        'monitoring_active': monitoring_active,
-        'last_check_time': last_check_time,
-        'last_check_status': last_check_status,
-        'check_interval': Config.CHECK_INTERVAL,
-        'captcha_image': last_captcha_image,
-        'captcha_text': last_captcha_text,
-        'progress': current_progress  # Progress bilgisi ekle
-    })
+    return jsonify(status_snapshot())
+
+@app.route('/api/stream')
+def stream():
+    """
+    SSE: durum, progress, log ve geçmiş değişiklikleri
+    
+    Yeni istemciye önce 'snapshot' (tam durum + log buffer) gönderilir,
+    sonra yalnızca değişiklikler. Last-Event-ID ile yeniden bağlanan
+    istemci kaçırdığı olayları alır; tampon yetmezse 'reset' gönderilir.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    sub, backlog = events.subscribe(last_event_id)
+    if sub is None:
+        # İstemci sınırı dolu: dashboard polling'e düşer
+        return jsonify({'error': 'Çok fazla canlı bağlantı'}), 503
+    
+    def snapshot():
+        logs, _, _ = log_buffer.since()
+        return {'status': status_snapshot(), 'logs': logs}
+    
+    response = Response(
+        stream_with_context(stream_events(
+            events, sub, backlog, snapshot,
+            resumed=last_event_id is not None,
+            heartbeat=Config.SSE_HEARTBEAT,
+            max_duration=Config.SSE_MAX_DURATION
+        )),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Proxy tamponlamasın
+    return response
 
 @app.route('/api/progress')
+@conditional('progress')
 def get_progress():
     """Progress durumunu getir"""
     return jsonify(current_progress)
 
 @app.route('/api/history')
+@conditional('history')
 def get_history():
-    """Kontrol geçmişini getir (MySQL'den)"""
-    try:
-        # MySQL'den logları getir
-        mysql_logs = mysql_db.get_recent_logs(limit=50)
-        
-        history = []
-        for log in mysql_logs:
-            history.append({
-                'id': log.get('id'),
-                'timestamp': log.get('timestamp').isoformat() if log.get('timestamp') else None,
-                'status': log.get('status'),
-                'message': log.get('message'),
-                'captcha_text': log.get('captcha_text'),
-                'appointment_found': bool(log.get('appointment_found')),
-                'error': log.get('error'),
-                'response_time': log.get('response_time')
-            })
-        
-        return jsonify(history)
+    """
+    Kontrol geçmişini getir (depodan)
+    
+    Parametresiz istek son 50 kaydı döner (yazılana kadar önbellekten).
+    Parametreler: before_id (keyset sayfa), status, appointment_found,
+    since, until (ISO tarih), fields (virgüllü kolonlar), limit. Sonraki
+    sayfa varsa X-Next-Before-Id ve Link başlıkları döner.
+    """
+    if request.args:
+        try:
+            filters, fields = history_filters()
+            limit = request.args.get('limit', 50, type=int)
+            before_id = request.args.get('before_id', type=int)
+            if not 1 <= limit <= 500:
+                raise ValueError("limit 1-500 arası olmalı")
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
+        rows = storage.get_history(limit=limit, before_id=before_id, columns=fields, **filters)
+        response = jsonify([serialize_history_row(row, fields) for row in rows])
+        if len(rows) == limit:
+            next_id = rows[-1]['id']
+            args = request.args.to_dict()
+            args['before_id'] = next_id
+            response.headers['X-Next-Before-Id'] = str(next_id)
+            response.headers['Link'] = f'<{url_for("get_history", **args)}>; rel="next"'
+        return response
+    
+    try:
+        return json_body(response_cache.get('history', build_history))
     except Exception as e:
-        # MySQL hatası varsa SQLite'a fallback
-        logger.warning(f"⚠️ MySQL hata, SQLite kullanılıyor: {e}")
-        checks = db.get_recent_checks(limit=50)
-        
-        history = []
-        for check in checks:
-            history.append({
-                'id': check[0],
-                'timestamp': check[1],
-                'status': check[2],
-                'appointment_found': bool(check[3]),
-                'error': check[4]
-            })
-        
-        return jsonify(history)
+        logger.error(f"❌ Geçmiş hatası: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def history_filters():
+    """
+    /api/history ve /api/history/export filtre parametreleri
+    
+    Returns:
+        tuple: (filters: dict, fields: list veya None)
+    
+    Raises:
+        ValueError: Geçersiz parametre
+    """
+    args = request.args
+    filters = {}
+    if args.get('status'):
+        filters['status'] = args['status']
+    if args.get('appointment_found'):
+        value = args['appointment_found'].lower()
+        if value not in ('1', '0', 'true', 'false'):
+            raise ValueError("appointment_found true/false olmalı")
+        filters['appointment_found'] = value in ('1', 'true')
+    for key in ('since', 'until'):
+        if args.get(key):
+            try:
+                filters[key] = datetime.fromisoformat(args[key])
+            except ValueError:
+                raise ValueError(f"{key} ISO tarih olmalı (ör. 2024-05-01T00:00:00)")
+    
+    fields = None
+    if args.get('fields'):
+        fields = [f.strip() for f in args['fields'].split(',') if f.strip()]
+        unknown = [f for f in fields if f not in HISTORY_COLUMNS]
+        if unknown:
+            raise ValueError(f"Bilinmeyen alan: {', '.join(unknown)}")
+    return filters, fields
+
+def serialize_history_row(row, fields=None):
+    """check_logs satırını JSON'a uygun hale getir (yalnızca istenen alanlar)"""
+    keys = ['id', 'timestamp'] + [f for f in (fields or HISTORY_COLUMNS) if f not in ('id', 'timestamp')]
+    item = {}
+    for key in keys:
+        value = row.get(key)
+        if key == 'timestamp' and value is not None:
+            value = value.isoformat()
+        elif key == 'appointment_found':
+            value = bool(value)
+        item[key] = value
+    return item
+
+@app.route('/api/history/export')
+def export_history():
+    """
+    Geçmişi NDJSON veya CSV olarak akıt (?format=ndjson|csv + /api/history filtreleri)
+    
+    Satırlar sunucu tarafı imleçten okunup tek tek yazılır; aylarca
+    geçmiş belleğe alınmadan indirilebilir.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format ndjson veya csv olmalı'}), 400
+    try:
+        filters, fields = history_filters()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    rows = storage.iter_history(columns=fields, **filters)
+    
+    def ndjson():
+        for row in rows:
+            yield json.dumps(serialize_history_row(row, fields), ensure_ascii=False) + '\n'
+    
+    def as_csv():
+        buffer = io.StringIO()
+        writer = None
+        for row in rows:
+            item = serialize_history_row(row, fields)
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(item))
+                writer.writeheader()
+            writer.writerow(item)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    filename = f"history-{datetime.now():%Y%m%d-%H%M%S}.{export_format}"
+    response = Response(
+        stream_with_context(ndjson() if export_format == 'ndjson' else as_csv()),
+        mimetype='application/x-ndjson' if export_format == 'ndjson' else 'text/csv'
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+def build_history():
+    """/api/history JSON gövdesi (son 50 kayıt)"""
+    rows = storage.get_history(limit=50)
+    return jsonify([serialize_history_row(row) for row in rows]).get_data()
+
+def stats_window_start():
+    """?window= için ilk dilimin başı (pencere kaydıkça ETag değişir)"""
+    window = request.args.get('window')
+    if window not in STATS_WINDOWS:
+        return None
+    return window_range(window)[1].isoformat()
 
 @app.route('/api/stats')
+@conditional('stats', extra=stats_window_start)
 def get_stats():
-    """MySQL istatistiklerini getir"""
+    """
+    Depo istatistiklerini getir
+    
+    Parametresiz: ömür boyu toplamlar (yazılana kadar önbellekten).
+    ?window=1h|24h|7d: son pencere, dakika / saat / gün rollup
+    satırlarından (gecikme yüzdelikleriyle).
+    """
+    window = request.args.get('window')
+    if window and window not in STATS_WINDOWS:
+        return jsonify({'error': f"Geçersiz pencere, seçenekler: {', '.join(STATS_WINDOWS)}"}), 400
     try:
-        stats = mysql_db.get_stats()
-        return jsonify({
-            'total_checks': stats.get('total_checks', 0),
-            'successful_checks': stats.get('successful_checks', 0),
-            'failed_checks': stats.get('failed_checks', 0),
-            'appointments_found': stats.get('appointments_found', 0),
-            'success_rate': round(
-                (stats.get('successful_checks', 0) / stats.get('total_checks', 1)) * 100, 2
-            ) if stats.get('total_checks', 0) > 0 else 0,
-            'last_check_time': stats.get('last_check_time').isoformat() if stats.get('last_check_time') is not None else None,
-            'monitoring_active': stats.get('monitoring_active', False)
-        })
+        if window:
+            return build_window_stats(window)
+        return json_body(response_cache.get('stats', build_stats))
     except Exception as e:
         logger.error(f"❌ Stats hatası: {e}")
         return jsonify({'error': str(e)}), 500
 
+def build_stats():
+    """/api/stats JSON gövdesi"""
+    stats = storage.get_stats()
+    return jsonify({
+        'total_checks': stats.get('total_checks', 0),
+        'successful_checks': stats.get('successful_checks', 0),
+        'failed_checks': stats.get('failed_checks', 0),
+        'appointments_found': stats.get('appointments_found', 0),
+        'success_rate': stats.get('success_rate', 0),
+        'latency': stats.get('latency'),
+        'last_check_time': stats.get('last_check_time').isoformat() if stats.get('last_check_time') is not None else None,
+        'monitoring_active': stats.get('monitoring_active', False)
+    }).get_data()
+
+def build_window_stats(window):
+    """/api/stats?window= yanıtı (pencere başı dilim sınırına yuvarlanır)"""
+    granularity, since = window_range(window)
+    stats = summarize(storage.get_rollups(granularity, since))
+    stats.update(window=window, granularity=granularity, since=since.isoformat())
+    return jsonify(stats)
+
+def json_body(body):
+    """Hazır (önbellekteki) JSON gövdesinden yanıt"""
+    return Response(body, mimetype='application/json')
+
+@app.route('/api/captcha/<digest>.png')
+def get_captcha_image(digest):
+    """CAPTCHA görseli (içerik adresli: aynı URL hep aynı görsel)"""
+    image = captcha_images.get(digest)
+    if image is None:
+        abort(404)
+    mime, raw = image
+    response = Response(raw, mimetype=mime or 'image/png')
+    response.set_etag(digest)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response.make_conditional(request)
+
+@app.route('/api/captcha/stats')
+def get_captcha_stats():
+    """CAPTCHA çözüm gecikmesi (p50/p90/p99) ve doğruluk - bellek içi histogramdan"""
+    window = request.args.get('window')
+    if window and window not in WINDOWS:
+        return jsonify({'error': f"Geçersiz pencere, seçenekler: {', '.join(WINDOWS)}"}), 400
+    
+    metrics = captcha_telemetry.metrics
+    stats = getattr(checker.solver, 'stats', None)
+    cache_stats = getattr(checker.solver, 'cache_stats', None)
+    return jsonify({
+        'windows': {window: metrics.window(WINDOWS[window])} if window else metrics.snapshot(),
+        'backends': stats() if stats else {},
+        'cache': cache_stats() if cache_stats else None,
+        'dropped': persistence.metrics()['dropped'].get('captcha', 0)
+    })
+
 @app.route('/api/logs/recent')
 def get_recent_logs():
-    """Son logları getir (gerçek zamanlı detaylı loglar)"""
+    """
+    Son logları getir (gerçek zamanlı detaylı loglar)
+    
+    ?after=<seq> verilirse yalnızca o kayıttan sonrakiler döner; istemci
+    bir sonraki istekte yanıttaki `next` değerini kullanır.
+    """
     try:
-        # Memory buffer'daki logları JSON olarak döndür
+        after = request.args.get('after', type=int)
+        limit = request.args.get('limit', type=int)
+        if limit is not None and limit <= 0:
+            return jsonify({'error': 'limit pozitif olmalı'}), 400
+        
+        logs, next_seq, truncated = log_buffer.since(after, limit)
         return jsonify({
-            'logs': list(log_buffer),
-            'count': len(log_buffer)
+            'logs': logs,
+            'count': len(logs),
+            'next': next_seq,
+            'truncated': truncated
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -338,16 +705,38 @@ def clear_logs():
 
 @app.route('/api/check-now', methods=['POST'])
 def check_now():
-    """Anında kontrol yap"""
+    """Anında kontrolü kuyruğa at (çalışan kontrol varsa ona bağlanır)"""
     try:
-        scheduled_check()
-        return jsonify({
-            'status': 'completed',
-            'result': last_check_status
-        })
+        job, created = enqueue_check('check-now')
+        return job_response(job, created)
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """İşin durumu, adımı ve süreleri"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    return jsonify(job.as_dict())
+
+@app.route('/api/jobs')
+def list_jobs():
+    """Aktif işler"""
+    return jsonify({'jobs': [job.as_dict() for job in jobs.active()]})
+
+@app.route('/api/metrics')
+def get_metrics():
+    """Write-behind kuyruğu (bekleyen, backpressure, düşürülen), depo failover ve yanıt önbelleği sayaçları"""
+    storage_metrics = getattr(storage, 'metrics', None)
+    return jsonify({
+        'persistence': persistence.metrics(),
+        'storage': storage_metrics() if storage_metrics else {'backend': storage.name},
+        'response_cache': response_cache.stats()
+    })
+
 # Scheduler'ı başlat (ama job eklemeden)
 if not scheduler.running:
     scheduler.start()
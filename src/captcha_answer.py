@@ -0,0 +1,108 @@
+"""
+CAPTCHA cevabı normalizasyonu ve doğrulama
+
+Çözücülerin cevabı (model açıklaması, boşluklar, O/0 veya l/1 karışıklığı)
+doğrudan POST edilmez. Cevaptan tam olarak 6 rakam çıkarılır; çıkarılamazsa
+cevap reddedilir ve Unlocker POST'u harcanmaz.
+"""
+
+import re
+
+CAPTCHA_LENGTH = 6
+
+# OCR / vision modellerinin sık karıştırdığı karakterler
+CONFUSABLE_DIGITS = str.maketrans({
+    'O': '0', 'o': '0', 'Q': '0', 'D': '0',
+    'I': '1', 'l': '1', 'i': '1', '|': '1', '!': '1',
+    'Z': '2', 'z': '2',
+    'S': '5', 's': '5',
+    'G': '6', 'b': '6',
+    'T': '7',
+    'B': '8',
+    'g': '9', 'q': '9'
+})
+
+_DIGIT_RUN = re.compile(r'(?<!\d)\d{6}(?!\d)')
+_SEPARATORS = re.compile(r'[\s\-_.,:;\'"`()\[\]]+')
+
+
+def _confusable_token(token):
+    """Token 6 karakterse ve çoğunluğu rakamsa karışıklıkları düzelt"""
+    if len(token) != CAPTCHA_LENGTH:
+        return None
+    digits = sum(ch.isdigit() for ch in token)
+    if digits < CAPTCHA_LENGTH // 2:
+        return None
+    mapped = token.translate(CONFUSABLE_DIGITS)
+    return mapped if mapped.isdigit() else None
+
+
+def normalize_captcha_answer(raw):
+    """
+    Çözücü cevabından 6 haneli kodu çıkar
+
+    Sırayla denenir:
+        1. Metinde tek bir 6 haneli rakam dizisi ("Kod: 123456")
+        2. Ayraçlar atılınca tek 6 haneli dizi ("12 34 56", "123-456")
+        3. Tek bir 6 karakterlik, çoğunluğu rakam token'da karışıklık
+           düzeltmesi ("12O4l6" -> "120416")
+
+    Returns:
+        str or None: 6 haneli kod, çıkarılamazsa None
+    """
+    if not raw:
+        return None
+    text = raw.strip()
+
+    runs = _DIGIT_RUN.findall(text)
+    if len(runs) == 1:
+        return runs[0]
+    if len(runs) > 1:
+        return None
+
+    compact = _SEPARATORS.sub('', text)
+    if compact.isdigit() and len(compact) == CAPTCHA_LENGTH:
+        return compact
+
+    candidates = {
+        mapped for mapped in (
+            _confusable_token(token) for token in _SEPARATORS.split(text)
+        ) if mapped
+    }
+    if len(candidates) == 1:
+        return candidates.pop()
+
+    mapped = _confusable_token(compact)
+    return mapped
+
+
+class CaptchaAnswer:
+    """
+    Tek bir çözüm turunun sonucu
+
+    Attributes:
+        text: Doğrulanmış 6 haneli kod (yoksa None)
+        source: Cevabı veren backend adı
+        rejected: Bu turda reddedilen (POST edilmeyen) bozuk cevap sayısı
+        posts_saved: Bozuk cevap yüzünden atlanan CAPTCHA POST'u sayısı
+        elapsed: Çözüm süresi (saniye)
+        key: Görselin algısal hash'i (önbellek anahtarı, yoksa None)
+        task_id: Cevabı veren servisteki görev kimliği (rapor için, yoksa None)
+    """
+
+    def __init__(self, text=None, source=None, rejected=0, posts_saved=0, elapsed=0.0, key=None,
+                 task_id=None):
+        self.text = text
+        self.source = source
+        self.rejected = rejected
+        self.posts_saved = posts_saved
+        self.elapsed = elapsed
+        self.key = key
+        self.task_id = task_id
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def __repr__(self):
+        return (f"CaptchaAnswer({self.text!r}, source={self.source!r}, "
+                f"rejected={self.rejected}, posts_saved={self.posts_saved})")
@@ -0,0 +1,232 @@
+"""
+Çözülmüş CAPTCHA önbelleği (algısal hash -> doğrulanmış cevap)
+
+Unlocker'ın dönen çıkış IP'lerinde site daha önce görülmüş CAPTCHA
+görsellerini sık sık tekrar gönderiyor. Sunucunun kabul ettiği cevaplar
+görselin algısal hash'iyle saklanır; aynı görsel (ya da kayıplı yeniden
+kodlanmış hali) tekrar gelince çözücüye gidilmez. Eşleşme her rakam
+hücresinde ayrı ayrı aranır: hücrelerden biri max_distance'tan fazla bit
+farklıysa (tek rakamı farklı CAPTCHA) önbellek kullanılmaz. Önbellek
+boyutu sınırlıdır (LRU) ve yeniden başlatmalarda kaybolmasın diye tek bir
+kalıcı bağlantıyla SQLite'a yazılır. İsabet sayacı / son kullanım bellekte
+biriktirilir ve sonraki put/discard ya da close ile toplu yazılır; önbellekten
+cevap almak diske yazma beklemez.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from src.captcha_image import HASH_SHAPE, hash_cell_masks
+
+logger = logging.getLogger(__name__)
+
+# Hash'ler sabit genişlikli hex olarak saklanır; farklı ızgaradan kalma
+# kayıtlar açılışta silinir
+HASH_HEX_WIDTH = HASH_SHAPE[0] * HASH_SHAPE[1] // 4
+
+
+def _hex(phash):
+    return f"{phash:0{HASH_HEX_WIDTH}x}"
+
+
+class CaptchaCache:
+    """
+    Sınırlı LRU CAPTCHA cevap önbelleği (SQLite'a kalıcı)
+
+    Args:
+        db_path: SQLite dosyası
+        capacity: En fazla kayıt sayısı
+        max_distance: Eşleşme için her rakam hücresinde izin verilen en
+            büyük Hamming mesafesi (bit)
+    """
+
+    def __init__(self, db_path='appointments.db', capacity=2000, max_distance=3):
+        self.db_path = db_path
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self._cells = hash_cell_masks()
+        self._entries = OrderedDict()  # hash -> (cevap, çözüm süresi ms)
+        self._touched = {}  # hash -> (bekleyen isabet, son kullanım); put/discard/close'da yazılır
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self.init_db()
+        self.load()
+
+    def init_db(self):
+        """Kalıcı bağlantıyı aç ve önbellek tablosunu oluştur"""
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS captcha_cache (
+                        phash TEXT PRIMARY KEY,
+                        answer TEXT NOT NULL,
+                        solve_ms INTEGER,
+                        hits INTEGER DEFAULT 0,
+                        last_used REAL
+                    )
+                ''')
+                deleted = conn.execute(
+                    'DELETE FROM captcha_cache WHERE length(phash) != ?', (HASH_HEX_WIDTH,)
+                ).rowcount
+            if deleted:
+                logger.info(f"🗑️ Eski hash biçimindeki {deleted} önbellek kaydı silindi")
+            self._conn = conn
+
+        except Exception as e:
+            logger.error(f"❌ CAPTCHA önbellek tablosu hatası: {e}")
+            logger.warning("⚠️ CAPTCHA önbelleği yalnızca bellekte çalışıyor (yeniden başlatmada kaybolur)")
+
+    @property
+    def persistent(self):
+        return self._conn is not None
+
+    def load(self):
+        """Kayıtları en son kullanılan en sonda olacak şekilde yükle"""
+        if self._conn is None:
+            return
+        try:
+            with self._db_lock:
+                rows = self._conn.execute('''
+                    SELECT phash, answer, solve_ms FROM captcha_cache
+                    ORDER BY last_used DESC
+                    LIMIT ?
+                ''', (self.capacity,)).fetchall()
+
+        except Exception as e:
+            logger.error(f"❌ CAPTCHA önbelleği yüklenemedi: {e}")
+            return
+
+        with self._lock:
+            for phash, answer, solve_ms in reversed(rows):
+                self._entries[int(phash, 16)] = (answer, solve_ms or 0)
+        if rows:
+            logger.info(f"🗂️ CAPTCHA önbelleği yüklendi: {len(rows)} kayıt")
+
+    def _write(self, statements):
+        """
+        Bekleyen isabet güncellemeleriyle birlikte tek işlemde yaz
+
+        Args:
+            statements: (sorgu, parametreler) listesi
+        """
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if self._conn is None:
+            return
+        try:
+            with self._db_lock, self._conn:
+                for query, params in statements:
+                    self._conn.execute(query, params)
+                if touched:
+                    self._conn.executemany(
+                        'UPDATE captcha_cache SET hits = hits + ?, last_used = ? WHERE phash = ?',
+                        [(hits, last_used, _hex(key)) for key, (hits, last_used) in touched.items()]
+                    )
+        except Exception as e:
+            logger.error(f"❌ CAPTCHA önbellek yazma hatası: {e}")
+
+    def _nearest(self, phash):
+        """
+        En yakın kaydın hash'i
+
+        Her rakam hücresindeki fark max_distance içinde olmalı; yoksa None.
+        """
+        if phash in self._entries:
+            return phash
+        best, best_distance = None, self.max_distance * len(self._cells) + 1
+        for candidate in self._entries:
+            diff = candidate ^ phash
+            distance = diff.bit_count()
+            if distance >= best_distance:
+                continue
+            if all((diff & cell).bit_count() <= self.max_distance for cell in self._cells):
+                best, best_distance = candidate, distance
+        return best
+
+    def get(self, phash, lookup_started=None):
+        """
+        Hash'e eşleşen doğrulanmış cevabı getir
+
+        Args:
+            phash: perceptual_hash() değeri
+            lookup_started: Hash hesabının başladığı perf_counter (tasarruf
+                hesabından hash + arama süresi düşülür)
+
+        Returns:
+            tuple: (cevap, eşleşen hash) veya (None, None)
+        """
+        if phash is None:
+            return None, None
+        with self._lock:
+            key = self._nearest(phash)
+            if key is None:
+                self.misses += 1
+                return None, None
+            self._entries.move_to_end(key)
+            answer, solve_ms = self._entries[key]
+            self.hits += 1
+            spent_ms = (time.perf_counter() - lookup_started) * 1000 if lookup_started else 0.0
+            self.saved_ms += max(solve_ms - spent_ms, 0.0)
+            # İsabet sayacı diske hemen yazılmaz; çözüm yolunu SQLite commit'i beklemesin
+            hits, _ = self._touched.get(key, (0, None))
+            self._touched[key] = (hits + 1, time.time())
+        return answer, key
+
+    def put(self, phash, answer, solve_ms):
+        """Sunucunun kabul ettiği cevabı ekle (kapasite dolarsa en eskisi atılır)"""
+        if phash is None or not answer:
+            return
+        evicted = []
+        with self._lock:
+            self._entries[phash] = (answer, int(solve_ms))
+            self._entries.move_to_end(phash)
+            while len(self._entries) > self.capacity:
+                evicted.append(self._entries.popitem(last=False)[0])
+
+        self._write([('''
+            INSERT OR REPLACE INTO captcha_cache (phash, answer, solve_ms, hits, last_used)
+            VALUES (?, ?, ?, 0, ?)
+        ''', (_hex(phash), answer, int(solve_ms), time.time()))] + [
+            ('DELETE FROM captcha_cache WHERE phash = ?', (_hex(key),)) for key in evicted
+        ])
+
+    def discard(self, phash):
+        """Sunucunun reddettiği önbellek cevabını sil"""
+        with self._lock:
+            if self._entries.pop(phash, None) is None:
+                return
+            self._touched.pop(phash, None)
+        self._write([('DELETE FROM captcha_cache WHERE phash = ?', (_hex(phash),))])
+        logger.warning("🗑️ Reddedilen CAPTCHA cevabı önbellekten silindi")
+
+    def stats(self):
+        """İsabet oranı ve isabet başına kazanılan süre"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'capacity': self.capacity,
+                'persistent': self.persistent,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'saved_ms_total': round(self.saved_ms, 1),
+                'saved_ms_per_hit': round(self.saved_ms / self.hits, 1) if self.hits else 0.0
+            }
+
+    def close(self):
+        """Bekleyen isabet güncellemelerini yaz ve bağlantıyı kapat"""
+        self._write([])
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
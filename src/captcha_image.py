@@ -0,0 +1,445 @@
+"""
+CAPTCHA görsel işleme yardımcıları (NumPy)
+
+data:image URL'sini çözme, PNG decode, gri tonlama, ikili hale getirme
+(binarize), 6 haneli kodu tek tek rakam görsellerine (glyph) bölme ve
+çözücülere gönderilecek minimal PNG'yi üretme (preprocess_captcha) ve
+önbellek anahtarı için algısal hash (perceptual_hash).
+Harici görüntü kütüphanesi gerektirmez; PNG dışındaki formatlar için
+decode None döner.
+"""
+
+import base64
+import logging
+import struct
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+GLYPH_SIZE = 16
+CAPTCHA_DIGITS = 6
+HASH_SHAPE = (24, 96)  # Algısal hash ızgarası (satır, sütun) -> 2304 bit, rakam başına 24 x 16
+
+
+def decode_data_url(data_url):
+    """
+    data:image/...;base64,... URL'sini çöz
+
+    Returns:
+        tuple: (mime: str, raw: bytes) veya (None, None)
+    """
+    if not data_url or not data_url.startswith('data:image'):
+        return None, None
+    try:
+        header, encoded = data_url.split(',', 1)
+        mime = header[5:].split(';', 1)[0]
+        return mime, base64.b64decode(encoded)
+    except (ValueError, base64.binascii.Error) as e:
+        logger.warning(f"⚠️ data URL çözülemedi: {e}")
+        return None, None
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def _unfilter(data, stride, height, bpp):
+    """PNG scanline filtrelerini geri al (stride: satır başına byte)"""
+    out = np.zeros((height, stride), dtype=np.uint8)
+    prev = np.zeros(stride, dtype=np.int32)
+    pos = 0
+
+    for y in range(height):
+        filter_type = data[pos]
+        line = np.frombuffer(data, dtype=np.uint8, count=stride, offset=pos + 1).astype(np.int32)
+        pos += stride + 1
+
+        if filter_type == 0:
+            row = line
+        elif filter_type == 1:
+            # Sub: her kanal için kümülatif toplam
+            row = np.cumsum(line.reshape(-1, bpp), axis=0).reshape(-1) & 0xFF
+        elif filter_type == 2:
+            row = (line + prev) & 0xFF
+        elif filter_type in (3, 4):
+            row = line.tolist()
+            up = prev.tolist()
+            for x in range(stride):
+                left = row[x - bpp] if x >= bpp else 0
+                if filter_type == 3:
+                    row[x] = (row[x] + ((left + up[x]) >> 1)) & 0xFF
+                else:
+                    upper_left = up[x - bpp] if x >= bpp else 0
+                    row[x] = (row[x] + _paeth(left, up[x], upper_left)) & 0xFF
+            row = np.array(row, dtype=np.int32)
+        else:
+            raise ValueError(f"Bilinmeyen PNG filtresi: {filter_type}")
+
+        out[y] = row
+        prev = row
+    return out
+
+
+def decode_png_gray(raw):
+    """
+    PNG byte'larını 0-255 gri tonlamalı diziye çevir
+
+    Interlace'siz 8-bit gri / RGB / palet / alfa PNG'leri ve 1/2/4-bit gri
+    veya palet PNG'leri destekler; alfa kanalı beyaz zemin üzerine
+    birleştirilir.
+
+    Returns:
+        np.ndarray (height, width) uint8 veya None
+    """
+    if not raw or not raw.startswith(PNG_SIGNATURE):
+        return None
+
+    try:
+        pos = len(PNG_SIGNATURE)
+        idat = []
+        palette = None
+        header = None
+        while pos < len(raw):
+            length, chunk_type = struct.unpack('>I4s', raw[pos:pos + 8])
+            chunk = raw[pos + 8:pos + 8 + length]
+            pos += 12 + length
+            if chunk_type == b'IHDR':
+                header = struct.unpack('>IIBBBBB', chunk)
+            elif chunk_type == b'PLTE':
+                palette = np.frombuffer(chunk, dtype=np.uint8).reshape(-1, 3)
+            elif chunk_type == b'IDAT':
+                idat.append(chunk)
+            elif chunk_type == b'IEND':
+                break
+
+        width, height, bit_depth, color_type, _, _, interlace = header
+        packed = bit_depth < 8 and color_type in (0, 3)
+        if interlace or not (bit_depth == 8 or packed):
+            logger.info(f"ℹ️ Desteklenmeyen PNG (bit_depth={bit_depth}, interlace={interlace})")
+            return None
+
+        channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[color_type]
+        stride = (width * channels * bit_depth + 7) // 8
+        rows = _unfilter(zlib.decompress(b''.join(idat)), stride, height, max(1, channels * bit_depth // 8))
+
+        if packed:
+            bits = np.unpackbits(rows, axis=1)[:, :width * bit_depth].reshape(height, width, bit_depth)
+            values = bits.astype(np.int32) @ (1 << np.arange(bit_depth - 1, -1, -1))
+            if color_type == 0:
+                values = values * (255 // ((1 << bit_depth) - 1))
+            pixels = values.reshape(height, width, 1).astype(np.float32)
+        else:
+            pixels = rows.reshape(height, width, channels).astype(np.float32)
+
+        if color_type == 3:
+            pixels = palette[pixels[..., 0].astype(np.uint8)].astype(np.float32)
+            channels = 3
+
+        alpha = None
+        if color_type in (4, 6):
+            alpha = pixels[..., -1] / 255.0
+            pixels = pixels[..., :-1]
+            channels -= 1
+
+        if channels == 3:
+            gray = pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        else:
+            gray = pixels[..., 0]
+
+        if alpha is not None:
+            gray = gray * alpha + 255.0 * (1.0 - alpha)
+
+        return np.clip(gray, 0, 255).astype(np.uint8)
+
+    except (KeyError, TypeError, ValueError, struct.error, zlib.error) as e:
+        logger.warning(f"⚠️ PNG decode hatası: {e}")
+        return None
+
+
+def decode_captcha_gray(data_url):
+    """data:image URL'sini gri tonlamalı diziye çevir (PNG değilse None)"""
+    mime, raw = decode_data_url(data_url)
+    if raw is None:
+        return None
+    return decode_png_gray(raw)
+
+
+def _png_chunk(tag, data):
+    return (struct.pack('>I', len(data)) + tag + data
+            + struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+
+def encode_png_mask(mask):
+    """
+    İkili maskeyi minimal PNG'ye çevir
+
+    1-bit gri, tek IDAT, yardımcı chunk yok; mürekkep siyah, zemin beyaz.
+
+    Returns:
+        bytes
+    """
+    height, width = mask.shape
+    rows = np.packbits(~mask, axis=1)
+    scanlines = np.hstack([np.zeros((height, 1), dtype=np.uint8), rows]).tobytes()
+    return (PNG_SIGNATURE
+            + _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 1, 0, 0, 0, 0))
+            + _png_chunk(b'IDAT', zlib.compress(scanlines, 9))
+            + _png_chunk(b'IEND', b''))
+
+
+def otsu_threshold(gray):
+    """Otsu yöntemiyle eşik değeri"""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 128
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    mean_bg = np.cumsum(hist * levels)
+    mean_total = mean_bg[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (mean_total * weight_bg / total - mean_bg) ** 2 / (weight_bg * weight_fg)
+    between = np.nan_to_num(between)
+    return int(np.argmax(between))
+
+
+def binarize(gray):
+    """
+    Rakam pikselleri True olacak şekilde ikili maske
+
+    Rakamların zeminden az yer kapladığı varsayılır; maske yarıdan fazlaysa
+    ters çevrilir (açık renk rakam / koyu zemin).
+    """
+    mask = gray <= otsu_threshold(gray)
+    if mask.mean() > 0.5:
+        mask = ~mask
+    return mask
+
+
+def _ink_runs(mask, axis=0):
+    """Mürekkep bulunan ardışık sütun (axis=1: satır) aralıkları [[başlangıç, bitiş], ...]"""
+    ink = mask.sum(axis=axis) > 0
+    runs = []
+    start = None
+    for x, has_ink in enumerate(ink):
+        if has_ink and start is None:
+            start = x
+        elif not has_ink and start is not None:
+            runs.append([start, x])
+            start = None
+    if start is not None:
+        runs.append([start, len(ink)])
+    return runs
+
+
+def _significant_runs(mask, runs, axis=0, min_fraction=0.05):
+    """En büyük parçanın min_fraction'ından az mürekkep içeren (gürültü) parçaları at"""
+    profile = mask.sum(axis=axis)
+    ink = [int(profile[a:b].sum()) for a, b in runs]
+    max_ink = max(ink)
+    return [run for run, amount in zip(runs, ink) if amount >= max_ink * min_fraction]
+
+
+def segment_glyphs(mask, count=CAPTCHA_DIGITS):
+    """
+    İkili maskeyi soldan sağa `count` adet rakam bölgesine ayır
+
+    Sütun projeksiyonundaki boşluklardan bölünür; fazla parça varsa önce
+    gürültü sayılabilecek küçük parçalar atılır, sonra en yakın komşular
+    birleştirilir; az parça varsa en geniş parça ortadan ikiye bölünür.
+
+    Returns:
+        list[np.ndarray] veya None
+    """
+    runs = _ink_runs(mask)
+    if not runs:
+        return None
+
+    runs = _significant_runs(mask, runs)
+
+    while len(runs) > count:
+        gaps = [runs[i + 1][0] - runs[i][1] for i in range(len(runs) - 1)]
+        i = int(np.argmin(gaps))
+        runs[i:i + 2] = [[runs[i][0], runs[i + 1][1]]]
+
+    while len(runs) < count:
+        widths = [b - a for a, b in runs]
+        i = int(np.argmax(widths))
+        a, b = runs[i]
+        if b - a < 2:
+            return None
+        middle = (a + b) // 2
+        runs[i:i + 1] = [[a, middle], [middle, b]]
+
+    glyphs = []
+    for a, b in runs:
+        column = mask[:, a:b]
+        rows = np.flatnonzero(column.any(axis=1))
+        if rows.size == 0:
+            return None
+        glyphs.append(column[rows[0]:rows[-1] + 1])
+    return glyphs
+
+
+def normalize_glyph(glyph, size=GLYPH_SIZE):
+    """Glyph'i size x size float diziye ölçekle (en yakın komşu)"""
+    height, width = glyph.shape
+    rows = (np.arange(size) * height / size).astype(int)
+    cols = (np.arange(size) * width / size).astype(int)
+    return glyph[rows][:, cols].astype(np.float32)
+
+
+def captcha_glyphs(data_url, count=CAPTCHA_DIGITS):
+    """
+    data:image URL'sinden normalize edilmiş rakam görselleri
+
+    Returns:
+        list[np.ndarray (GLYPH_SIZE, GLYPH_SIZE)] veya None
+    """
+    gray = decode_captcha_gray(data_url)
+    if gray is None:
+        return None
+    glyphs = segment_glyphs(binarize(gray), count=count)
+    if glyphs is None:
+        return None
+    return [normalize_glyph(glyph) for glyph in glyphs]
+
+
+def crop_to_ink(mask, pad=2):
+    """
+    Maskeyi rakamların sınır kutusuna kırp (gürültü parçaları hariç)
+
+    Returns:
+        np.ndarray veya None (mürekkep yoksa)
+    """
+    bounds = []
+    for axis in (0, 1):
+        runs = _ink_runs(mask, axis=axis)
+        if not runs:
+            return None
+        runs = _significant_runs(mask, runs, axis=axis)
+        size = mask.shape[1 - axis]
+        bounds.append((max(runs[0][0] - pad, 0), min(runs[-1][1] + pad, size)))
+    (left, right), (top, bottom) = bounds
+    return mask[top:bottom, left:right]
+
+
+def downscale_mask(mask, max_height, fill=0.25):
+    """
+    Maskeyi en boy oranını koruyarak max_height'a küçült
+
+    Her hedef piksel kaynak bloğunun ortalamasıdır; ince çizgiler
+    kaybolmasın diye blok fill oranında mürekkep içeriyorsa mürekkeptir.
+    """
+    height, width = mask.shape
+    if height <= max_height:
+        return mask
+    new_width = max(1, round(width * max_height / height))
+    row_edges = (np.arange(max_height) * height / max_height).astype(int)
+    col_edges = (np.arange(new_width) * width / new_width).astype(int)
+    counts = np.add.reduceat(
+        np.add.reduceat(mask.astype(np.int32), row_edges, axis=0), col_edges, axis=1
+    )
+    areas = np.outer(np.diff(np.append(row_edges, height)), np.diff(np.append(col_edges, width)))
+    return counts >= areas * fill
+
+
+def preprocess_captcha(data_url, max_height=32, pad=2):
+    """
+    CAPTCHA'yı çözücülere gönderilecek minimal PNG'ye çevir
+
+    Bir kez decode edilir, gri tonlanır, eşiklenir, rakam kutusuna
+    kırpılır, küçültülür ve 1-bit PNG olarak yeniden kodlanır.
+
+    Returns:
+        tuple: (data_url, stats: dict) - işlenemezse (orijinal data_url, None)
+    """
+    mime, raw = decode_data_url(data_url)
+    gray = decode_png_gray(raw) if raw else None
+    if gray is None:
+        return data_url, None
+
+    mask = crop_to_ink(binarize(gray), pad=pad)
+    if mask is None:
+        return data_url, None
+    mask = downscale_mask(mask, max_height)
+
+    png = encode_png_mask(mask)
+    stats = {
+        'bytes_before': len(raw),
+        'bytes_after': len(png),
+        'shape_before': gray.shape,
+        'shape_after': mask.shape
+    }
+    return "data:image/png;base64," + base64.b64encode(png).decode('ascii'), stats
+
+
+def resample_mask(mask, shape):
+    """
+    Maskeyi sabit (satır, sütun) ızgarasına örnekle (büyütme dahil)
+
+    Her hücre, kaynakta denk geldiği bloğun mürekkep oranıdır; integral
+    görüntü ile hesaplanır.
+    """
+    rows, cols = shape
+    height, width = mask.shape
+    integral = np.zeros((height + 1, width + 1), dtype=np.int32)
+    integral[1:, 1:] = mask.astype(np.int32).cumsum(axis=0).cumsum(axis=1)
+
+    top = (np.arange(rows) * height) // rows
+    bottom = np.maximum((np.arange(1, rows + 1) * height) // rows, top + 1)
+    left = (np.arange(cols) * width) // cols
+    right = np.maximum((np.arange(1, cols + 1) * width) // cols, left + 1)
+
+    counts = (integral[np.ix_(bottom, right)] - integral[np.ix_(top, right)]
+              - integral[np.ix_(bottom, left)] + integral[np.ix_(top, left)])
+    areas = np.outer(bottom - top, right - left)
+    return counts / areas
+
+
+def perceptual_hash(data_url, shape=HASH_SHAPE):
+    """
+    CAPTCHA'nın algısal hash'i
+
+    Görsel ikili hale getirilip rakam kutusuna kırpılır ve sabit ızgaraya
+    örneklenir; hücrenin çoğunluğu mürekkepse bit 1'dir. Hash, sütunlara
+    göre CAPTCHA_DIGITS rakam hücresine bölünerek karşılaştırılır
+    (hash_cell_masks). Kayıpsız yeniden kodlama hash'i değiştirmez, JPEG
+    benzeri kayıplı sıkıştırma hücre başına birkaç bit oynatır; ölçek
+    değişikliği ve ön işleme ise çok sayıda bit değiştirir (eşleşmez).
+    Ölçüm: bench_captcha_cache.py.
+
+    Returns:
+        int or None: shape[0] * shape[1] bitlik hash (decode edilemezse None)
+    """
+    gray = decode_captcha_gray(data_url)
+    if gray is None:
+        return None
+    mask = crop_to_ink(binarize(gray))
+    if mask is None:
+        return None
+    bits = (resample_mask(mask, shape) >= 0.5).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hash_cell_masks(shape=HASH_SHAPE, cells=CAPTCHA_DIGITS):
+    """
+    perceptual_hash'i rakam hücrelerine (eşit sütun dilimleri) ayıran bit maskeleri
+
+    Returns:
+        list[int]: Soldan sağa hücre başına bir maske
+    """
+    masks = []
+    for columns in np.array_split(np.arange(shape[1]), cells):
+        grid = np.zeros(shape, dtype=bool)
+        grid[:, columns] = True
+        masks.append(int.from_bytes(np.packbits(grid.ravel()).tobytes(), 'big'))
+    return masks
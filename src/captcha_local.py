@@ -0,0 +1,184 @@
+"""
+Yerel (offline) 6 haneli CAPTCHA tanıyıcı
+
+CAPTCHA her zaman 6 rakamdan oluşur. Görsel NumPy ile ikili hale getirilip
+6 rakama bölünür ve her rakam şablon eşleştirme (normalize korelasyon, en
+yakın komşu) ile sınıflandırılır. Sonuç bir güven skoru ile döner; skor
+eşiğin altındaysa CaptchaSolver ağ çözücülerine (Mistral, 2captcha) düşer.
+
+Şablonlar etiketli örneklerden build_templates() ile üretilip .npz dosyası
+olarak saklanır (bkz. bench_captcha_local.py --build). Repo şablon ya da
+etiketli fixture içermediği için tanıyıcı varsayılan olarak kapalıdır
+(Config.CAPTCHA_BACKENDS'te 'local' yok); şablonlar üretilip doğruluk
+ölçülene kadar açılmamalıdır. Şablon dosyası yoksa tanıyıcı güven 0 döner
+ve registry onu atlar.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from src.captcha_image import CAPTCHA_DIGITS, captcha_glyphs
+
+logger = logging.getLogger(__name__)
+
+_LABEL_RE = re.compile(r'^\d{6}$')
+
+
+def _flatten(glyph):
+    """Glyph'i sıfır ortalamalı, birim normlu vektöre çevir"""
+    vector = glyph.reshape(-1).astype(np.float32)
+    vector = vector - vector.mean()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class LocalCaptchaRecognizer:
+    """
+    Şablon eşleştirmeli rakam tanıyıcı
+
+    Args:
+        templates: (N, GLYPH_SIZE * GLYPH_SIZE) normalize şablon vektörleri
+        labels: (N,) her şablonun rakamı ('0'-'9')
+    """
+
+    def __init__(self, templates=None, labels=None):
+        if templates is None or len(templates) == 0:
+            self.templates = None
+            self.labels = None
+        else:
+            self.templates = np.asarray(templates, dtype=np.float32)
+            self.labels = np.asarray(labels)
+
+    @property
+    def available(self):
+        """Şablon yüklü mü?"""
+        return self.templates is not None
+
+    @classmethod
+    def load(cls, path):
+        """
+        .npz şablon dosyasından yükle (dosya yoksa boş tanıyıcı)
+        """
+        if not path or not os.path.exists(path):
+            logger.info(f"ℹ️ Yerel CAPTCHA şablonları yok ({path}), ağ çözücüleri kullanılacak")
+            return cls()
+        try:
+            with np.load(path) as data:
+                recognizer = cls(data['templates'], data['labels'])
+            logger.info(f"🧩 Yerel CAPTCHA şablonları yüklendi: {len(recognizer.labels)} şablon")
+            return recognizer
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(f"❌ CAPTCHA şablonları okunamadı: {e}")
+            return cls()
+
+    def save(self, path):
+        """Şablonları .npz olarak kaydet"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(path, templates=self.templates, labels=self.labels)
+        logger.info(f"💾 CAPTCHA şablonları kaydedildi: {path}")
+
+    @classmethod
+    def build_templates(cls, samples):
+        """
+        Etiketli örneklerden tanıyıcı oluştur
+
+        Args:
+            samples: [(data_url, '123456'), ...]
+
+        Returns:
+            tuple: (LocalCaptchaRecognizer, kullanılan örnek sayısı)
+        """
+        vectors = []
+        labels = []
+        used = 0
+        for data_url, label in samples:
+            if not _LABEL_RE.match(label or ''):
+                continue
+            glyphs = captcha_glyphs(data_url, count=CAPTCHA_DIGITS)
+            if glyphs is None:
+                continue
+            used += 1
+            for glyph, digit in zip(glyphs, label):
+                vectors.append(_flatten(glyph))
+                labels.append(digit)
+
+        if not vectors:
+            return cls(), 0
+        return cls(np.stack(vectors), np.array(labels)), used
+
+    def recognize(self, data_url):
+        """
+        CAPTCHA'yı yerel olarak oku
+
+        Güven skoru, rakamlar arasındaki en düşük korelasyondur (0-1).
+
+        Returns:
+            tuple: (text: str veya None, confidence: float)
+        """
+        if not self.available:
+            return None, 0.0
+
+        glyphs = captcha_glyphs(data_url, count=CAPTCHA_DIGITS)
+        if glyphs is None:
+            return None, 0.0
+
+        vectors = np.stack([_flatten(glyph) for glyph in glyphs])
+        scores = vectors @ self.templates.T
+        best = scores.argmax(axis=1)
+
+        text = ''.join(self.labels[best])
+        confidence = float(np.clip(scores[np.arange(len(best)), best].min(), 0.0, 1.0))
+        return text, round(confidence, 4)
+
+
+class LocalBackend:
+    """
+    Yerel tanıyıcıyı SolverRegistry backend'i olarak sunar
+
+    Güven skoru min_confidence altındaysa cevap vermez (None); registry
+    bu durumda ağ backend'lerini yarıştırır.
+    """
+
+    name = 'local'
+    inline = True
+
+    def __init__(self, recognizer, min_confidence=0.8):
+        self.recognizer = recognizer
+        self.min_confidence = min_confidence
+
+    @property
+    def available(self):
+        return self.recognizer.available
+
+    def solve(self, data_url, cancel=None):
+        started = time.perf_counter()
+        text, confidence = self.recognizer.recognize(data_url)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if text and confidence >= self.min_confidence:
+            logger.info(f"🧩 Yerel tanıyıcı: '{text}' (güven {confidence:.2f}, {elapsed_ms:.1f} ms)")
+            return text
+
+        logger.info(f"ℹ️ Yerel güven düşük ({confidence:.2f} < {self.min_confidence}), ağ çözücülerine geçiliyor")
+        return None
+
+
+_default_recognizer = None
+_default_lock = threading.Lock()
+
+
+def default_recognizer(path):
+    """Şablon dosyasından bir kez yüklenen paylaşılan tanıyıcı"""
+    global _default_recognizer
+    if _default_recognizer is None:
+        with _default_lock:
+            if _default_recognizer is None:
+                _default_recognizer = LocalCaptchaRecognizer.load(path)
+    return _default_recognizer
@@ -0,0 +1,135 @@
+"""
+CAPTCHA çözüm telemetrisi
+
+Her çözüm süresi ve sonucu (sunucu kabul etti / reddetti / belirsiz)
+bellekte dakikalık dilimlere ayrılmış sabit log-ölçekli bir histogramda
+tutulur; p50/p90/p99 ve doğruluk, tablo taramadan bu histogramdan
+hesaplanır. captcha_history kaydı bloklamayan bir sink'e (write-behind
+kuyruğu) bırakılır, kontrolü bekletmez.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Kayan pencereler (dakika)
+WINDOWS = {'5m': 5, '1h': 60, '24h': 1440}
+
+# Gecikme histogramı kutu sınırları (ms): 10 ms - 120 s, log ölçekli
+LATENCY_EDGES_MS = np.geomspace(10, 120_000, 81)
+
+_CORRECT, _WRONG, _UNKNOWN, _POSTS_SAVED = range(4)
+
+
+class CaptchaMetrics:
+    """
+    Dakikalık halka tamponda gecikme histogramı ve sonuç sayaçları
+
+    Args:
+        horizon_minutes: Tutulacak en uzun pencere (dakika)
+        edges: Gecikme kutu sınırları (ms)
+        clock: Zaman kaynağı (saniye)
+    """
+
+    def __init__(self, horizon_minutes=max(WINDOWS.values()), edges=LATENCY_EDGES_MS, clock=time.time):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.clock = clock
+        self._slots = horizon_minutes
+        self._latency = np.zeros((horizon_minutes, len(self.edges) + 1), dtype=np.int64)
+        self._outcomes = np.zeros((horizon_minutes, 4), dtype=np.int64)
+        self._minutes = np.full(horizon_minutes, -1, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def _slot(self, minute):
+        index = minute % self._slots
+        if self._minutes[index] != minute:
+            self._latency[index] = 0
+            self._outcomes[index] = 0
+            self._minutes[index] = minute
+        return index
+
+    def record(self, elapsed_ms, correct=None, posts_saved=0):
+        """
+        Bir çözümü kaydet
+
+        Args:
+            elapsed_ms: Çözüm süresi (ms)
+            correct: Sunucu kabul etti (True), reddetti (False), bilinmiyor (None)
+            posts_saved: Bozuk cevap yüzünden atlanan POST sayısı
+        """
+        minute = int(self.clock() // 60)
+        latency_bin = int(np.searchsorted(self.edges, elapsed_ms))
+        outcome = _UNKNOWN if correct is None else (_CORRECT if correct else _WRONG)
+        with self._lock:
+            index = self._slot(minute)
+            self._latency[index, latency_bin] += 1
+            self._outcomes[index, outcome] += 1
+            self._outcomes[index, _POSTS_SAVED] += posts_saved
+
+    def _percentile(self, histogram, total, q):
+        rank = q * total
+        index = int(np.searchsorted(np.cumsum(histogram), rank))
+        return round(float(self.edges[min(index, len(self.edges) - 1)]), 1)
+
+    def window(self, minutes):
+        """
+        Son `minutes` dakikanın özeti
+
+        Yüzdelikler, değerin düştüğü kutunun üst sınırıdır (ms).
+        """
+        now = int(self.clock() // 60)
+        with self._lock:
+            live = (self._minutes > now - minutes) & (self._minutes >= 0)
+            histogram = self._latency[live].sum(axis=0)
+            correct, wrong, unknown, posts_saved = (int(v) for v in self._outcomes[live].sum(axis=0))
+
+        total = int(histogram.sum())
+        judged = correct + wrong
+        return {
+            'count': total,
+            'p50_ms': self._percentile(histogram, total, 0.50) if total else None,
+            'p90_ms': self._percentile(histogram, total, 0.90) if total else None,
+            'p99_ms': self._percentile(histogram, total, 0.99) if total else None,
+            'correct': correct,
+            'wrong': wrong,
+            'unknown': unknown,
+            'accuracy': round(correct / judged, 4) if judged else None,
+            'posts_saved': posts_saved
+        }
+
+    def snapshot(self):
+        """Tüm pencerelerin özeti"""
+        return {name: self.window(minutes) for name, minutes in WINDOWS.items()}
+
+
+class CaptchaTelemetry:
+    """
+    Metrikleri günceller ve captcha_history kaydını sink'e bırakır
+
+    Args:
+        metrics: CaptchaMetrics
+        sink: sink(record: dict) - bloklamamalı (ör. WriteBehindQueue.submit)
+    """
+
+    def __init__(self, metrics, sink):
+        self.metrics = metrics
+        self.sink = sink
+
+    def record(self, captcha_text, correct, elapsed_ms, posts_saved=0):
+        """Çözümü histograma ekle ve veritabanı kaydını sink'e bırak"""
+        self.metrics.record(elapsed_ms, correct, posts_saved)
+        try:
+            self.sink({
+                'timestamp': datetime.now(),
+                'captcha_text': captcha_text,
+                'solved_correctly': correct,
+                'response_time': int(elapsed_ms),
+                'posts_saved': posts_saved
+            })
+        except Exception as e:
+            logger.error(f"❌ CAPTCHA telemetri kaydı bırakılamadı: {e}")
@@ -1,15 +1,106 @@
 from mistralai import Mistral
+import httpx
 import logging
+import time
+
+from config.settings import Config
+from src.captcha_answer import CaptchaAnswer
+from src.captcha_cache import CaptchaCache
+from src.captcha_image import perceptual_hash
+from src.captcha_local import LocalBackend, default_recognizer
+from src.captcha_twocaptcha import TwoCaptchaBackend
+from src.solver_registry import SolverRegistry
+from src.unlocker_transport import PoolStats
 
 logger = logging.getLogger(__name__)
 
-class CaptchaSolver:
-    def __init__(self, api_key):
+def _counting_http_client(stats, pool_size, keepalive, timeout):
+    """
+    Keep-alive havuzlu httpx istemcisi
+    
+    Cevap alınan her istek PoolStats'a yazılır; yeni TCP bağlantıları
+    httpx'in "trace" extension'ı ile (connection.connect_tcp.complete) sayılır.
+    """
+    def trace(event_name, info):
+        if event_name == 'connection.connect_tcp.complete':
+            stats.record_new_connection()
+    
+    def on_request(request):
+        request.extensions['trace'] = trace
+    
+    def on_response(response):
+        stats.record_request()
+    
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=keepalive
+        ),
+        timeout=timeout,
+        event_hooks={'request': [on_request], 'response': [on_response]}
+    )
+
+class MistralBackend:
+    """
+    Mistral pixtral görsel modeli ile CAPTCHA çözücü (SolverRegistry backend'i)
+    
+    İstemci ve altındaki bağlantı havuzu bir kez oluşturulur ve tüm
+    kontrollerde kullanılır; warm_up() TLS bağlantısını ilk CAPTCHA'dan
+    önce açar.
+    
+    Args:
+        api_key: Mistral API anahtarı
+        pool_size: Keep-alive bağlantı sayısı
+        keepalive: Boşta bağlantı ömrü (saniye)
+        timeout: İstek zaman aşımı (saniye)
+    """
+    
+    name = 'mistral'
+    inline = False
+    
+    def __init__(self, api_key, pool_size=4, keepalive=120, timeout=30.0):
         self.api_key = api_key
-        self.client = Mistral(api_key=api_key) if api_key else None
         self.model = "pixtral-12b-2409"
+        self.pool_stats = PoolStats()
+        self.http_client = None
+        self.client = None
+        if api_key:
+            self.http_client = _counting_http_client(self.pool_stats, pool_size, keepalive, timeout)
+            self.client = Mistral(api_key=api_key, client=self.http_client)
     
-    def solve_captcha_from_base64(self, base64_data):
+    @property
+    def available(self):
+        return self.client is not None
+    
+    def solve(self, data_url, cancel=None):
+        # Tek HTTP çağrısı; yarışı kaybederse sonucu yok sayılır
+        return self._solve_with_mistral(data_url)
+    
+    def warm_up(self):
+        """
+        Bağlantıyı önceden aç (ücretsiz models.list çağrısı)
+        
+        Returns:
+            float or None: Süre (saniye), başarısızsa None
+        """
+        if not self.client:
+            return None
+        started = time.perf_counter()
+        try:
+            self.client.models.list()
+        except Exception as e:
+            logger.warning(f"⚠️ Mistral warm-up başarısız: {e}")
+            return None
+        elapsed = time.perf_counter() - started
+        logger.info(f"🔥 Mistral bağlantısı ısıtıldı ({elapsed:.2f}s)")
+        return elapsed
+    
+    def close(self):
+        if self.http_client is not None:
+            self.http_client.close()
+    
+    def _solve_with_mistral(self, base64_data):
         """Base64 CAPTCHA görselini Mistral ile çöz"""
         if not self.client:
             logger.error("Mistral API anahtari yok!")
@@ -46,7 +137,7 @@ class CaptchaSolver:
                 temperature=0.1
             )
             
-            captcha_text = response.choices[0].message.content.strip().upper()
+            captcha_text = response.choices[0].message.content.strip()
             logger.info(f"Mistral AI tarafindan tespit edilen CAPTCHA metni: '{captcha_text}'")
             
             return captcha_text
@@ -54,3 +145,158 @@ class CaptchaSolver:
         except Exception as e:
             logger.error(f"CAPTCHA cozum hatasi: {e}")
             return None
+
+
+class CaptchaSolver:
+    """
+    CAPTCHA çözücü (SolverRegistry üzerinden)
+    
+    Config.CAPTCHA_BACKENDS sırasıyla backend'leri kaydeder: yerel tanıyıcı
+    önce denenir, güveni düşükse ağ backend'leri yarıştırılır. Hangi
+    backend'in kazandığı last_source'ta tutulur. Cevaplar 6 haneye
+    normalize edilir; bozuk cevap POST edilmez. report() ile sunucunun
+    cevabı kabul edip etmediği bildirilir ve sonraki yönlendirme buna göre
+    yapılır. Kabul edilen cevaplar görselin algısal hash'iyle önbelleğe
+    alınır; aynı görsel tekrar gelirse hiçbir backend çağrılmaz.
+    
+    Args:
+        api_key: Mistral API anahtarı
+        local: LocalCaptchaRecognizer (verilmezse ve CAPTCHA_BACKENDS'te
+               'local' varsa şablon dosyasından)
+        min_confidence: Yerel tanıyıcı güven eşiği
+        registry: Hazır SolverRegistry (verilirse diğer argümanlar yok sayılır)
+        cache: CaptchaCache (verilmezse Config'e göre; False ise kapalı)
+    """
+    
+    def __init__(self, api_key, local=None, min_confidence=None, registry=None, cache=None):
+        self.api_key = api_key
+        self.last_source = None
+        self.max_reasks = Config.CAPTCHA_MAX_REASKS
+        if registry is None:
+            registry = self._build_registry(api_key, local, min_confidence)
+        self.registry = registry
+        self._owns_cache = cache is None
+        if cache is None and Config.CAPTCHA_CACHE_SIZE > 0:
+            cache = CaptchaCache(
+                Config.CAPTCHA_CACHE_DB,
+                capacity=Config.CAPTCHA_CACHE_SIZE,
+                max_distance=Config.CAPTCHA_CACHE_MAX_DISTANCE
+            )
+        self.cache = cache or None
+    
+    @staticmethod
+    def _build_registry(api_key, local, min_confidence):
+        if min_confidence is None:
+            min_confidence = Config.CAPTCHA_LOCAL_MIN_CONFIDENCE
+        
+        factories = {
+            # Şablonlar yalnızca 'local' istenirse yüklenir
+            'local': lambda: LocalBackend(
+                local if local is not None else default_recognizer(Config.CAPTCHA_LOCAL_TEMPLATES),
+                min_confidence
+            ),
+            'mistral': lambda: MistralBackend(
+                api_key,
+                pool_size=Config.MISTRAL_POOL_SIZE,
+                keepalive=Config.MISTRAL_KEEPALIVE,
+                timeout=Config.MISTRAL_TIMEOUT
+            ),
+            '2captcha': lambda: TwoCaptchaBackend(
+                Config.TWOCAPTCHA_API_KEY, Config.TWOCAPTCHA_POLLING_INTERVAL
+            )
+        }
+        backends = []
+        for name in Config.CAPTCHA_BACKENDS:
+            if name not in factories:
+                logger.warning(f"⚠️ Bilinmeyen CAPTCHA backend'i: {name}")
+                continue
+            backends.append(factories[name]())
+        
+        return SolverRegistry(
+            backends,
+            race_width=Config.CAPTCHA_RACE_WIDTH,
+            timeout=Config.CAPTCHA_SOLVE_TIMEOUT
+        )
+    
+    def solve(self, base64_data):
+        """
+        CAPTCHA'yı çöz; bozuk cevapta CAPTCHA_MAX_REASKS kez yeniden sor
+        
+        Bozuk cevabın reddedildiği her tur, eskiden boşa gidecek bir
+        CAPTCHA POST'u demektir ve posts_saved'e eklenir.
+        
+        Returns:
+            CaptchaAnswer
+        """
+        started = time.perf_counter()
+        phash = None
+        if self.cache:
+            phash = perceptual_hash(base64_data)
+            cached, key = self.cache.get(phash, lookup_started=started)
+            if cached:
+                logger.info(f"⚡ CAPTCHA önbellekten: {cached}")
+                self.last_source = 'cache'
+                return CaptchaAnswer(
+                    cached, source='cache', elapsed=time.perf_counter() - started, key=key
+                )
+        
+        rejected = posts_saved = 0
+        for attempt in range(1 + self.max_reasks):
+            if attempt:
+                logger.info(f"🔁 Bozuk cevap, çözücüye yeniden soruluyor ({attempt}/{self.max_reasks})")
+            answer = self.registry.solve(base64_data)
+            rejected += answer.rejected
+            if answer or not answer.rejected:
+                break
+            posts_saved += 1
+        
+        answer.rejected = rejected
+        answer.posts_saved = posts_saved
+        answer.elapsed = time.perf_counter() - started
+        answer.key = phash
+        self.last_source = answer.source
+        return answer
+    
+    def solve_captcha_from_base64(self, base64_data):
+        """Base64 CAPTCHA görselini çöz (doğrulanmış 6 hane veya None)"""
+        return self.solve(base64_data).text
+    
+    def report(self, correct, source=None, answer=None):
+        """
+        Cevabın sunucu tarafından kabul edilip edilmediğini bildir
+        
+        answer verilirse kabul edilen cevap önbelleğe eklenir, reddedilen
+        önbellek cevabı silinir; servise rapor answer.task_id ile yapılır.
+        """
+        source = source or self.last_source
+        if source:
+            self.registry.report(source, correct, task_id=answer.task_id if answer else None)
+        
+        if not self.cache or answer is None or answer.key is None:
+            return
+        if answer.source == 'cache':
+            if correct is False:
+                self.cache.discard(answer.key)
+        elif correct:
+            self.cache.put(answer.key, answer.text, answer.elapsed * 1000)
+    
+    def stats(self):
+        """Backend başına gecikme / doğruluk istatistikleri"""
+        return self.registry.stats_dict()
+    
+    def cache_stats(self):
+        """Önbellek isabet oranı ve isabet başına kazanılan süre"""
+        return self.cache.stats() if self.cache else None
+    
+    def warm_up(self):
+        """Ağ backend'lerinin bağlantılarını önceden aç"""
+        return self.registry.warm_up()
+    
+    def connection_stats(self):
+        """Backend başına yeniden kullanılan / yeni bağlantı sayaçları"""
+        return self.registry.connection_stats()
+    
+    def close(self):
+        self.registry.close()
+        if self.cache and self._owns_cache:
+            self.cache.close()
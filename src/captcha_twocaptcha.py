@@ -0,0 +1,71 @@
+"""
+2captcha CAPTCHA backend'i
+
+Görsel base64 olarak 2captcha'ya gönderilir ve cevap kendi döngümüzle
+sorgulanır; böylece yarışı kaybettiğinde iptal sinyali sorgulamayı hemen
+durdurur. Cevap görev kimliğiyle birlikte döner; yanlış çıkan cevaplar o
+kimlikle reportbad ile bildirilir (paylaşılan "son id" tutulmaz, eşzamanlı
+çözümlerde yanlış göreve rapor yapılmaz).
+
+Not: 2captcha send() anında ücret keser; yarışı kaybedip iptal edilen görev
+de ücretlidir.
+"""
+
+import logging
+
+try:
+    from twocaptcha import TwoCaptcha
+    from twocaptcha.solver import NetworkException
+except ImportError:
+    TwoCaptcha = None
+    NetworkException = None
+
+logger = logging.getLogger(__name__)
+
+
+class TwoCaptchaBackend:
+    """
+    2captcha normal (görsel) CAPTCHA çözücü
+
+    Args:
+        api_key: 2captcha API anahtarı
+        polling_interval: Sonuç sorgulama aralığı (saniye)
+    """
+
+    name = '2captcha'
+    inline = False
+
+    def __init__(self, api_key, polling_interval=2.0):
+        self.polling_interval = polling_interval
+        self.client = TwoCaptcha(api_key) if (api_key and TwoCaptcha) else None
+        if api_key and TwoCaptcha is None:
+            logger.warning("⚠️ 2captcha-python kurulu değil, 2captcha backend'i devre dışı")
+
+    @property
+    def available(self):
+        return self.client is not None
+
+    def solve(self, data_url, cancel):
+        """
+        Görseli gönder, cevap gelene veya iptal edilene kadar sorgula
+
+        Returns:
+            tuple: (cevap, captcha id) veya iptal edildiyse None
+        """
+        body = data_url.split(',', 1)[1] if ',' in data_url else data_url
+        captcha_id = self.client.send(method='base64', body=body, numeric=1, minLen=6, maxLen=6)
+        logger.info(f"📤 2captcha'ya gönderildi (id: {captcha_id})")
+
+        while not cancel.wait(self.polling_interval):
+            try:
+                text = self.client.get_result(captcha_id)
+            except NetworkException:
+                continue
+            return text.strip(), captcha_id
+
+        logger.info(f"🛑 2captcha sorgusu iptal edildi (id: {captcha_id})")
+        return None
+
+    def report(self, correct, task_id):
+        """task_id'li cevabı 2captcha'ya doğru/yanlış olarak bildir"""
+        self.client.report(task_id, correct)
@@ -0,0 +1,515 @@
+"""
+Bright Data Unlocker API ile asyncio tabanlı kontrol motoru
+
+AppointmentChecker ile aynı akışı ve aynı sonuç dict'ini üretir; fark,
+ağ çağrılarının (sayfa GET, CAPTCHA POST, 4 form POST'u) ortak bir
+AsyncUnlockerTransport (aiohttp) üzerinden coroutine olarak yapılmasıdır.
+Böylece tek process, her kontrol için thread açmadan onlarca kontrolü aynı
+anda yürütebilir.
+"""
+
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from config.settings import Config
+from src.checker_brightdata import AppointmentChecker
+from src.page import parse_page
+from src.unlocker_transport import AsyncUnlockerTransport
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAppointmentChecker(AppointmentChecker):
+    """
+    AppointmentChecker'ın asyncio sürümü
+
+    HTML parse eden metodlar (extract_captcha_from_html,
+    check_appointment_availability, _find_option) senkron sınıftan aynen
+    kullanılır; sadece I/O yapan metodlar coroutine'dir.
+
+    Args:
+        transport: Paylaşılan AsyncUnlockerTransport (verilmezse oluşturulur
+                   ve cleanup() ile kapatılır)
+        solver: solve_captcha_from_base64(data) metodu olan CAPTCHA çözücü
+                (verilmezse CaptchaSolver oluşturulur ve cleanup() ile kapatılır)
+    """
+
+    def __init__(self, transport=None, solver=None, form_cache=None):
+        super().__init__(
+            transport=transport or AsyncUnlockerTransport(),
+            form_cache=form_cache,
+            solver=solver
+        )
+        self._owns_transport = transport is None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.cleanup()
+
+    async def fetch_with_brightdata(self, url, max_retries=2):
+        """
+        Bright Data Unlocker API ile sayfa getir (async)
+
+        Args:
+            url: Hedef URL
+            max_retries: Maksimum deneme sayısı
+
+        Returns:
+            tuple: (success: bool, html: str, status_code: int)
+        """
+        logger.info(f"🌐 Bright Data Unlocker API ile sayfa getiriliyor: {url}")
+
+        if not self.config.BRIGHTDATA_API_KEY:
+            logger.error("❌ BRIGHTDATA_API_KEY bulunamadı!")
+            return False, "", 0
+
+        payload = self._unlocker_payload(url)
+
+        for attempt in range(1, max_retries + 1):
+            try:
+                logger.info(f"🔄 Deneme {attempt}/{max_retries}...")
+                status, text, headers = await self.transport.post(payload)
+                logger.info(f"📡 Response Status: {status} ({len(text)} karakter)")
+
+                if status == 200:
+                    if len(text) == 0:
+                        # Navigation timeout kontrolü
+                        brd_error = headers.get('x-brd-error', '')
+                        if 'navigation timeout' in brd_error.lower() and attempt < max_retries:
+                            logger.warning(f"⚠️ Navigation timeout! Deneme {attempt}/{max_retries}")
+                            await asyncio.sleep(attempt * 3)
+                            continue
+
+                        logger.error("❌ Response boş! API yanıt veriyor ama içerik yok")
+                        return False, "", status
+
+                    logger.info(f"✅ Sayfa başarıyla getirildi! (Status: {status})")
+                    return True, text, status
+
+                elif status == 401:
+                    logger.error("❌ Bright Data API Key geçersiz!")
+                    return False, "", status
+
+                elif status == 429:
+                    logger.warning(f"⚠️ Rate limit aşıldı, {attempt * 5}s bekleniyor...")
+                    await asyncio.sleep(attempt * 5)
+                    continue
+
+                else:
+                    logger.warning(f"⚠️ Beklenmeyen status code: {status}")
+                    if attempt < max_retries:
+                        await asyncio.sleep(attempt * 3)
+                        continue
+
+            except asyncio.TimeoutError:
+                logger.error(f"❌ Timeout hatası! (Deneme {attempt}/{max_retries})")
+                if attempt < max_retries:
+                    await asyncio.sleep(attempt * 3)
+                    continue
+
+            except aiohttp.ClientError as e:
+                logger.error(f"❌ Request hatası: {e}")
+                if attempt < max_retries:
+                    await asyncio.sleep(attempt * 3)
+                    continue
+
+        logger.error(f"❌ {max_retries} denemeden sonra başarısız!")
+        return False, "", 0
+
+    async def submit_captcha(self, captcha_text):
+        """
+        CAPTCHA kodunu POST et ve form sayfasını al (async)
+
+        Returns:
+            tuple: (success: bool, html: str)
+        """
+        self.captcha_accepted = None
+        try:
+            target_url = self.config.APPOINTMENT_URL
+            logger.info(f"📤 CAPTCHA POST ediliyor: {captcha_text}")
+
+            payload = self._unlocker_payload(
+                target_url,
+                body=f"mailConfirmCode={captcha_text}",
+                headers={
+                    "Content-Type": "application/x-www-form-urlencoded",
+                    "Referer": target_url,
+                    "Origin": "https://it-tr-appointment.idata.com.tr"
+                }
+            )
+            status, html, _ = await self.transport.post(payload)
+            logger.info(f"📡 Response Status: {status}")
+
+            if status != 200:
+                logger.error(f"❌ POST başarısız: {status}")
+                return False, None
+
+            page_kind = self._classify_captcha_response(html)
+            self.captcha_accepted = {'form': True, 'error': False}.get(page_kind)
+            if page_kind == 'form':
+                logger.info("✅ Form sayfasına yönlendirme başarılı!")
+                return True, html
+            if page_kind == 'error':
+                logger.warning("⚠️ CAPTCHA kodu yanlış girildi!")
+                return False, None
+
+            logger.info("ℹ️ Sayfa içeriği belirsiz, HTML döndürülüyor")
+            return True, html
+
+        except Exception as e:
+            logger.error(f"❌ CAPTCHA POST hatası: {e}")
+            return False, None
+
+    async def _post_form_step(self, step_name, body):
+        """Form adımını POST et, başarılıysa sayfa HTML'ini döndür"""
+        payload = self._unlocker_payload(self.config.APPOINTMENT_URL, body=body)
+        status, text, _ = await self.transport.post(payload)
+        if status != 200:
+            logger.error(f"❌ {step_name} başarısız: {status}")
+            return None
+        return text
+
+    async def _wait_until_ready(self, step, html, resolve, refetch, what):
+        """
+        AppointmentChecker._wait_until_ready'nin async sürümü
+
+        Args:
+            refetch: Sayfayı yeniden getiren coroutine fonksiyonu
+
+        Returns:
+            tuple: (sonuç or None, html: str)
+        """
+        result = resolve(html)
+        if result:
+            self.readiness.record(step, 0.0)
+            return result, html
+
+        started = time.monotonic()
+        for delay in self.readiness.delays(step):
+            logger.warning(f"⚠️ {what} hazır değil, {delay:.2f}s sonra yeniden istenecek...")
+            await asyncio.sleep(delay)
+            html = await refetch() or ""
+            result = resolve(html)
+            if result:
+                self.readiness.record(step, time.monotonic() - started, ready_delay=delay)
+                return result, html
+
+        self.readiness.record(step, time.monotonic() - started)
+        return None, html
+
+    async def _wait_for_options(self, step, html, wanted, refetch):
+        """AppointmentChecker._wait_for_options'ın async sürümü"""
+        return await self._wait_until_ready(
+            step, html, lambda page: self._resolve_options(page, wanted), refetch,
+            f"{', '.join(wanted)} seçenekleri"
+        )
+
+    async def _wait_for_final_page(self, html, expected, refetch):
+        """AppointmentChecker._wait_for_final_page'in async sürümü"""
+        ready, html = await self._wait_until_ready(
+            'count', html, lambda page: self._is_final_form_page(page, expected), refetch,
+            "Sonuç sayfası"
+        )
+        return bool(ready), html
+
+    async def _refetch_page(self):
+        """Randevu sayfasını yeniden getir (sadece HTML)"""
+        _, html, _ = await self.fetch_with_brightdata(self.config.APPOINTMENT_URL)
+        return html
+
+    async def fill_appointment_form(self, form_html):
+        """
+        Form sayfasını doldur (async) - İzmir / Turistik / Standart / 1 kişi
+
+        Returns:
+            tuple: (success: bool, result_html: str or None)
+        """
+        self.readiness.reset()
+        try:
+            logger.info("📝 Form doldurma başlatılıyor...")
+
+            # 0. Önbellekteki ID'lerle tek POST
+            cached_ids = self.form_cache.get()
+            if cached_ids:
+                logger.info(f"⚡ Önbellekteki form ID'leri kullanılıyor: {cached_ids}")
+                payload = self._unlocker_payload(
+                    self.config.APPOINTMENT_URL,
+                    body=self._form_body(applicant_count=1, **cached_ids)
+                )
+                status, html, _ = await self.transport.post(payload)
+                if status == 200 and self._is_final_form_page(html, dict(cached_ids, applicant_count=1)):
+                    logger.info("✅ Form tek POST ile dolduruldu (önbellek)")
+                    return True, html
+
+                logger.warning(f"⚠️ Önbellekteki ID'ler sonuç sayfası döndürmedi ({status}), adım adım zincire dönülüyor")
+                self.form_cache.invalidate()
+
+            # 1. Şehir seçeneği (yoksa sayfa back-off ile yeniden getirilir)
+            city_ids, form_html = await self._wait_for_options(
+                'city', form_html, {'city_id': ['izmir']}, self._refetch_page
+            )
+            if not city_ids:
+                logger.error("❌ İzmir seçeneği bulunamadı!")
+                return False, None
+            izmir_option = city_ids['city_id']
+            logger.info(f"✅ İzmir bulundu: value={izmir_option}")
+
+            # 2. Şehir seçimi
+            logger.info("📤 POST 1/4: Şehir seçimi (İzmir)...")
+            city_body = self._form_body(izmir_option)
+            html = await self._post_form_step("Şehir seçimi", city_body)
+            if html is None:
+                return False, None
+
+            # 3. Ofis seçeneği (cevapta yoksa şehir POST'u back-off ile tekrarlanır)
+            office_ids, _ = await self._wait_for_options(
+                'office', html, {'office_id': ['izmir']},
+                lambda: self._post_form_step("Şehir seçimi", city_body)
+            )
+            if not office_ids:
+                logger.error("❌ İzmir Ofisi bulunamadı!")
+                return False, None
+            izmir_office = office_ids['office_id']
+            logger.info(f"✅ İzmir Ofisi bulundu: value={izmir_office}")
+
+            # 4. Ofis seçimi
+            logger.info("📤 POST 2/4: Ofis seçimi (İzmir Ofisi)...")
+            office_body = self._form_body(izmir_option, izmir_office)
+            html = await self._post_form_step("Ofis seçimi", office_body)
+            if html is None:
+                return False, None
+
+            # 5. Gidiş amacı + hizmet türü
+            visa_ids, _ = await self._wait_for_options(
+                'visa', html,
+                {'visa_purpose_id': ['turist'], 'service_type_id': ['standart', 'standard']},
+                lambda: self._post_form_step("Ofis seçimi", office_body)
+            )
+            if not visa_ids:
+                logger.warning("⚠️ Vize tipi veya hizmet türü bulunamadı!")
+                return False, None
+            tourist_purpose = visa_ids['visa_purpose_id']
+            standard_service = visa_ids['service_type_id']
+
+            # 6. Vize tipi + hizmet türü seçimi
+            logger.info("📤 POST 3/4: Turistik + Standart seçimi...")
+            html = await self._post_form_step(
+                "Vize tipi seçimi",
+                self._form_body(izmir_option, izmir_office, tourist_purpose, standard_service)
+            )
+            if html is None:
+                return False, None
+
+            # 7. Kişi sayısı
+            logger.info("📤 POST 4/4: Kişi sayısı (1 kişi)...")
+            count_body = self._form_body(izmir_option, izmir_office, tourist_purpose, standard_service, 1)
+            html = await self._post_form_step("Kişi sayısı ayarı", count_body)
+            if html is None:
+                return False, None
+
+            # 8. Sonuç sayfası (değilse kişi sayısı POST'u back-off ile tekrarlanır)
+            form_ids = dict(
+                city_id=izmir_option,
+                office_id=izmir_office,
+                visa_purpose_id=tourist_purpose,
+                service_type_id=standard_service
+            )
+            final, html = await self._wait_for_final_page(
+                html, dict(form_ids, applicant_count=1),
+                lambda: self._post_form_step("Kişi sayısı ayarı", count_body)
+            )
+
+            logger.info("✅ Form doldurma tamamlandı!")
+            if final:
+                self.form_cache.store(**form_ids)
+            else:
+                logger.warning("⚠️ Sonuç sayfası gelmedi, form ID'leri önbelleğe alınmadı")
+            return True, html
+
+        except Exception as e:
+            logger.error(f"❌ Form doldurma hatası: {e}")
+            return False, None
+
+        finally:
+            logger.info(f"⏱️ Form adım beklemeleri: {self.readiness.summary()}")
+
+    async def _solve_captcha(self, captcha_data):
+        """
+        AppointmentChecker._solve_captcha'nın async sürümü (çözücü thread'de)
+
+        Returns:
+            tuple: (CaptchaAnswer, kullanılan (ön işlenmiş) captcha_data)
+        """
+        posts_saved = 0
+        elapsed = 0.0
+        for refetch in range(1 + self.config.CAPTCHA_MAX_REFETCH):
+            if refetch:
+                logger.info("🔄 Bozuk cevap, yeni CAPTCHA sayfası isteniyor (POST edilmedi)")
+                success, html, _ = await self.fetch_with_brightdata(self.config.APPOINTMENT_URL)
+                fresh = self.extract_captcha_from_html(html) if success else None
+                if not fresh:
+                    break
+                captcha_data = fresh
+
+            answer, captcha_data = await asyncio.to_thread(self._solve_once, captcha_data)
+            posts_saved += answer.posts_saved
+            elapsed += answer.elapsed
+            if answer or not answer.posts_saved:
+                break
+
+        answer.posts_saved = posts_saved
+        answer.elapsed = elapsed
+        return answer, captcha_data
+
+    async def run_check(self, progress_callback=None):
+        """
+        Ana kontrol döngüsü (async) - AppointmentChecker.run_check ile aynı sonuç
+
+        Returns:
+            dict: AppointmentChecker.run_check ile aynı anahtarlar
+        """
+        result = {
+            'status': "Kontrol başlatılıyor...",
+            'captcha_image': None,
+            'captcha_text': None,
+            'captcha_correct': None,
+            'captcha_posts_saved': 0,
+            'captcha_solve_ms': None,
+            'captcha_source': None
+        }
+
+        def update_progress(step, message):
+            """Progress callback helper"""
+            if progress_callback:
+                progress_callback(step, message)
+
+        try:
+            logger.info("🚀 Async kontrol başlatılıyor...")
+
+            # 1. Sayfa getir
+            update_progress(1, "URL'ye bağlanılıyor...")
+            success, html, _ = await self.fetch_with_brightdata(self.config.APPOINTMENT_URL)
+            if not success:
+                logger.error("❌ Sayfa getirilemedi!")
+                result['status'] = "❌ Bağlantı hatası"
+                return result
+
+            # 2. Cloudflare kontrolü
+            update_progress(2, "Cloudflare kontrolü...")
+            if parse_page(html).classify().has('cloudflare'):
+                logger.error("❌ Bright Data bile Cloudflare'ı geçemedi!")
+                result['status'] = "❌ Cloudflare bypass başarısız"
+                return result
+
+            # 3. CAPTCHA
+            update_progress(3, "CAPTCHA algılanıyor...")
+            captcha_data = self.extract_captcha_from_html(html)
+
+            if captcha_data:
+                update_progress(3, "CAPTCHA çözülüyor...")
+                answer, captcha_data = await self._solve_captcha(captcha_data)
+                captcha_text = answer.text
+
+                result['captcha_image'] = captcha_data
+                result['captcha_posts_saved'] = answer.posts_saved
+                result['captcha_solve_ms'] = int(answer.elapsed * 1000)
+                result['captcha_source'] = answer.source
+
+                if captcha_text:
+                    logger.info(f"✅ CAPTCHA çözüldü: {captcha_text}")
+                    result['captcha_text'] = captcha_text
+
+                    update_progress(4, "CAPTCHA gönderiliyor...")
+                    success, form_html = await self.submit_captcha(captcha_text)
+                    result['captcha_correct'] = self.captcha_accepted
+                    self._report_captcha(answer)
+
+                    if success and form_html:
+                        html = form_html
+
+                        update_progress(5, "Form doldurma (İzmir/Turistik/Standart/1 kişi)...")
+                        form_success, final_html = await self.fill_appointment_form(form_html)
+
+                        if form_success and final_html:
+                            html = final_html
+                        else:
+                            logger.warning("⚠️ Form doldurulamadı, mevcut HTML kullanılacak")
+                    else:
+                        logger.warning("⚠️ CAPTCHA POST başarısız, ilk sayfadaki HTML kullanılacak")
+                else:
+                    logger.warning("⚠️ CAPTCHA çözülemedi!")
+            else:
+                logger.info("ℹ️ CAPTCHA bulunamadı veya gerekli değil")
+
+            # 4. Randevu durumu
+            update_progress(6, "Randevu durumu kontrol ediliyor...")
+            available, message = self.check_appointment_availability(html)
+
+            update_progress(7, "Sonuç analiz ediliyor...")
+            logger.info(f"📊 Sonuç: {message}")
+            result['status'] = message
+            return result
+
+        except Exception as e:
+            logger.error(f"❌ Kritik hata: {e}")
+            result['status'] = f"❌ Hata: {e}"
+            return result
+
+    async def cleanup(self):
+        """Temizlik işlemleri (sadece kendi açtığı transport ve çözücüyü kapatır)"""
+        if self._owns_transport:
+            await self.transport.close()
+        if self._owns_solver:
+            self.solver.close()
+
+
+async def run_checks(count, concurrency=10, transport=None, solver=None, form_cache=None):
+    """
+    Aynı process içinde birden çok kontrolü eşzamanlı çalıştır
+
+    Args:
+        count: Toplam kontrol sayısı
+        concurrency: Aynı anda çalışacak maksimum kontrol
+        transport: Paylaşılan AsyncUnlockerTransport (verilmezse oluşturulur)
+        solver: Tüm kontrollerde kullanılacak CAPTCHA çözücü (verilmezse
+                tek bir CaptchaSolver oluşturulup paylaşılır)
+        form_cache: Paylaşılan FormOptionCache (verilmezse her kontrol
+                    Config.FORM_CACHE_PATH'ten kendi nesnesini oluşturur)
+
+    Returns:
+        list[dict]: run_check sonuçları (sırayla)
+    """
+    owns_transport = transport is None
+    if owns_transport:
+        transport = AsyncUnlockerTransport(pool_size=concurrency)
+
+    owns_solver = solver is None
+    if owns_solver:
+        from src.captcha_solver import CaptchaSolver
+        solver = CaptchaSolver(Config.MISTRAL_API_KEY)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_check():
+        async with semaphore:
+            checker = AsyncAppointmentChecker(
+                transport=transport, solver=solver, form_cache=form_cache
+            )
+            try:
+                return await checker.run_check()
+            finally:
+                await checker.cleanup()
+
+    try:
+        return await asyncio.gather(*(one_check() for _ in range(count)))
+    finally:
+        logger.info(f"🔌 Unlocker bağlantı havuzu: {transport.stats.as_dict()}")
+        if owns_transport:
+            await transport.close()
+        if owns_solver:
+            solver.close()
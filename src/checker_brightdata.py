@@ -6,16 +6,225 @@ Bu modül Selenium yerine Bright Data'nın profesyonel Unlocker API'sini kullan
 import requests
 import time
 import logging
-from bs4 import BeautifulSoup
 from config.settings import Config
+from src.unlocker_transport import UnlockerTransport
+from src.form_cache import FormOptionCache
+from src.readiness import ReadinessBackoff
+from src.page import parse_page
+from src.captcha_answer import CaptchaAnswer, normalize_captcha_answer
+from src.captcha_image import preprocess_captcha
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class AppointmentChecker:
-    def __init__(self):
+    def __init__(self, transport=None, form_cache=None, solver=None):
         self.config = Config()
-        self.session = requests.Session()
+        # Tüm Unlocker çağrıları aynı keep-alive havuzundan geçer; dışarıdan
+        # verilen (paylaşılan) transport cleanup() ile kapatılmaz
+        self._owns_transport = transport is None
+        self.transport = transport or UnlockerTransport(self.config)
+        # Önceki kontrollerde çözülen form ID'leri
+        self.form_cache = form_cache or FormOptionCache(
+            self.config.FORM_CACHE_PATH,
+            ttl=self.config.FORM_CACHE_TTL
+        )
+        # Form adımları arasında sabit sleep yerine hazır-olma takibi
+        self.readiness = ReadinessBackoff(
+            initial_delay=self.config.FORM_READY_INITIAL_DELAY,
+            max_delay=self.config.FORM_READY_MAX_DELAY,
+            max_attempts=self.config.FORM_READY_MAX_ATTEMPTS
+        )
+        # Kontroller boyunca yaşayan CAPTCHA çözücü: Mistral istemcisi ve
+        # bağlantı havuzu her kontrolde yeniden kurulmaz
+        self._owns_solver = solver is None
+        if solver is None:
+            from src.captcha_solver import CaptchaSolver
+            solver = CaptchaSolver(self.config.MISTRAL_API_KEY)
+        self.solver = solver
+        # Son CAPTCHA POST'unun sonucu: True kabul, False red, None belirsiz
+        self.captcha_accepted = None
+    
+    def _unlocker_payload(self, url, body=None, headers=None):
+        """
+        Unlocker API request payload'ı oluştur
+        
+        body verilirse hedef sayfaya form POST'u yapılır, yoksa GET.
+        """
+        payload = {
+            "zone": "web_unlocker1",  # Zone name (default for Web Unlocker)
+            "url": url,
+            "format": "raw",  # Raw HTML response
+            "country": "tr"   # Turkey proxy (TESTED: WORKS!)
+        }
+        if body is not None:
+            payload["method"] = "POST"
+            if headers:
+                payload["headers"] = headers
+            payload["body"] = body
+        return payload
+    
+    @staticmethod
+    def _form_body(city_id, office_id=None, visa_purpose_id=None,
+                   service_type_id=None, applicant_count=None):
+        """Form adımının POST body'sini oluştur (verilen alanlar sırasıyla)"""
+        fields = [
+            ("city_id", city_id),
+            ("office_id", office_id),
+            ("visa_purpose_id", visa_purpose_id),
+            ("service_type_id", service_type_id),
+            ("applicant_count", applicant_count)
+        ]
+        return "&".join(f"{name}={value}" for name, value in fields if value is not None)
+    
+    @staticmethod
+    def _find_option(html, select_id, keywords):
+        """
+        <select id=...> içinde metni anahtar kelimelerden birini içeren option'ı bul
+        
+        Returns:
+            tuple: (value: str or None, options: list[(value, text)] or None)
+                   options None ise select elementi bulunamadı
+        """
+        options = parse_page(html).select_options(select_id)
+        if options is None:
+            return None, None
+        
+        for value, text in options:
+            text_lower = text.lower()
+            if value and any(keyword in text_lower for keyword in keywords):
+                return value, options
+        return None, options
+    
+    def _resolve_options(self, html, wanted):
+        """
+        Sayfada istenen tüm seçenekleri bul
+        
+        Args:
+            wanted: {select_id: [anahtar kelimeler]}
+            
+        Returns:
+            dict or None: {select_id: value} (biri bile eksikse None)
+        """
+        values = {}
+        for select_id, keywords in wanted.items():
+            value, _ = self._find_option(html, select_id, keywords)
+            if not value:
+                return None
+            values[select_id] = value
+        return values
+    
+    def _wait_until_ready(self, step, html, resolve, refetch, what):
+        """
+        Cevap hazır olana kadar ilerle
+        
+        resolve(html) cevapta bir sonuç veriyorsa hiç beklenmez. Yoksa
+        ReadinessBackoff'un sınırlı gecikmeleriyle refetch() çağrılarak
+        sayfa yeniden istenir; geçen süre adıma kaydedilir.
+        
+        Args:
+            step: Adım adı (süre kaydı için)
+            html: Mevcut cevap
+            resolve: html -> sonuç (hazır değilse None / False)
+            refetch: Sayfayı yeniden getiren fonksiyon (html veya None döner)
+            what: Log için beklenen şeyin adı
+            
+        Returns:
+            tuple: (sonuç or None, html: str)
+        """
+        result = resolve(html)
+        if result:
+            self.readiness.record(step, 0.0)
+            return result, html
+        
+        started = time.monotonic()
+        for delay in self.readiness.delays(step):
+            logger.warning(f"⚠️ {what} hazır değil, {delay:.2f}s sonra yeniden istenecek...")
+            time.sleep(delay)
+            html = refetch() or ""
+            result = resolve(html)
+            if result:
+                self.readiness.record(step, time.monotonic() - started, ready_delay=delay)
+                return result, html
+        
+        self.readiness.record(step, time.monotonic() - started)
+        return None, html
+    
+    def _wait_for_options(self, step, html, wanted, refetch):
+        """
+        Beklenen <select> seçenekleri hazır olana kadar ilerle
+        
+        Args:
+            wanted: {select_id: [anahtar kelimeler]}
+            
+        Returns:
+            tuple: (values: dict or None, html: str)
+        """
+        return self._wait_until_ready(
+            step, html, lambda page: self._resolve_options(page, wanted), refetch,
+            f"{', '.join(wanted)} seçenekleri"
+        )
+    
+    def _wait_for_final_page(self, html, expected, refetch):
+        """
+        Kişi sayısı POST'unun cevabı sonuç sayfası olana kadar ilerle
+        
+        Returns:
+            tuple: (hazır: bool, html: str)
+        """
+        ready, html = self._wait_until_ready(
+            'count', html, lambda page: self._is_final_form_page(page, expected), refetch,
+            "Sonuç sayfası"
+        )
+        return bool(ready), html
+    
+    def _post_form_html(self, payload):
+        """Form adımını POST et, 200 dönerse HTML'i döndür"""
+        response = self.transport.post(payload)
+        return response.text if response.status_code == 200 else None
+    
+    @staticmethod
+    def _is_final_form_page(html, expected=None):
+        """
+        Son form adımının sonucu mu?
+        
+        İLERİ butonu form sayfalarında gizli (display: none) olarak hep
+        bulunur; sonuç sayfası ancak buton görünürse ya da alert-danger'da
+        "Uygun randevu tarihi bulunmamaktadır" uyarısı varsa kabul edilir.
+        
+        Args:
+            expected: {select_id: gönderilen value}; sayfada seçili gelen
+                      değer farklıysa sonuç sayfası sayılmaz (seçim
+                      işaretlenmemişse doğrulanamaz, engel değildir)
+        """
+        if not html:
+            return False
+        page = parse_page(html)
+        no_appointment = "Uygun randevu tarihi bulunmamaktadır" in (page.alert_danger_text() or "")
+        if not (page.next_button_visible() or no_appointment):
+            return False
+        for select_id, value in (expected or {}).items():
+            selected = page.selected_value(select_id)
+            if selected is not None and selected != str(value):
+                logger.warning(f"⚠️ {select_id} seçimi eşleşmiyor (gönderilen {value}, sayfada {selected})")
+                return False
+        return True
+    
+    def _classify_captcha_response(self, html):
+        """
+        CAPTCHA POST cevabını sınıflandır
+        
+        Returns:
+            str: 'form', 'error' veya None (belirsiz)
+        """
+        verdict = parse_page(html).classify()
+        
+        if verdict.has('form'):
+            return 'form'
+        if verdict.has('captcha-error'):
+            logger.info(f"🔎 Hata kanıtı: {verdict.evidence['captcha-error'][:3]}")
+            return 'error'
+        return None
         
     def fetch_with_brightdata(self, url, max_retries=2):
         """
@@ -38,33 +247,14 @@ class AppointmentChecker:
         
         logger.info(f"🔑 API Key (ilk 10 karakter): {api_key[:10]}...")
         
-        # Bright Data Web Unlocker API endpoint
-        api_url = "https://api.brightdata.com/request"
-        
-        # API Headers
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}"
-        }
-        
         # Request payload (Bright Data format)
-        payload = {
-            "zone": "web_unlocker1",  # Zone name (default for Web Unlocker)
-            "url": url,
-            "format": "raw",  # Raw HTML response
-            "country": "tr"   # Turkey proxy (TESTED: WORKS!)
-        }
+        payload = self._unlocker_payload(url)
         
         for attempt in range(1, max_retries + 1):
             try:
                 logger.info(f"🔄 Deneme {attempt}/{max_retries}...")
                 
-                response = self.session.post(
-                    api_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=45  # 45 saniye (test sonuçlarına göre optimize edildi - max 44.74s görüldü)
-                )
+                response = self.transport.post(payload)
                 
                 # Debug logging
                 logger.info(f"📡 Response Status: {response.status_code}")
@@ -147,18 +337,17 @@ class AppointmentChecker:
             str: CAPTCHA base64 data URL veya None
         """
         try:
-            # Use lxml parser for better performance
-            soup = BeautifulSoup(html, 'lxml')
+            # lxml ile bir kez parse edilen sayfa (sonraki aşamalar da kullanır)
+            page = parse_page(html)
             
             logger.info("🔍 CAPTCHA görseli aranıyor...")
             logger.info(f"📊 HTML boyutu: {len(html)} karakter")
             
             # CAPTCHA görseli ara
-            captcha_img = soup.find('img', class_='imageCaptcha')
+            src = page.captcha_src()
             
-            if captcha_img:
+            if src is not None:
                 logger.info("✅ img.imageCaptcha elementi bulundu!")
-                src = captcha_img.get('src', '')
                 logger.info(f"📡 src attribute: {src[:100]}...")
                 
                 if src and src.startswith('data:image'):
@@ -171,10 +360,10 @@ class AppointmentChecker:
                 logger.warning("⚠️ img.imageCaptcha elementi bulunamadı")
                 
                 # Debug: Tüm img elementlerini listele
-                all_imgs = soup.find_all('img')
+                all_imgs = page.images()
                 logger.info(f"📊 Toplam img elementi: {len(all_imgs)}")
                 for idx, img in enumerate(all_imgs[:5]):  # İlk 5'i göster
-                    logger.info(f"   img[{idx}]: class={img.get('class', [])} src={str(img.get('src', ''))[:50]}...")
+                    logger.info(f"   img[{idx}]: class={img.get('class', '')} src={str(img.get('src', ''))[:50]}...")
                     
             logger.warning("⚠️ CAPTCHA görseli HTML'de bulunamadı")
             return None
@@ -193,40 +382,26 @@ class AppointmentChecker:
         Returns:
             tuple: (success: bool, html: str)
         """
+        self.captcha_accepted = None
         try:
             target_url = "https://it-tr-appointment.idata.com.tr/tr"
-            api_url = "https://api.brightdata.com/request"
             
             logger.info(f"📤 CAPTCHA POST ediliyor: {captcha_text}")
             logger.info(f"🎯 Hedef URL: {target_url}")
             
             # Form data hazırla
-            payload = {
-                "zone": "web_unlocker1",
-                "url": target_url,
-                "format": "raw",
-                "country": "tr",
-                "method": "POST",
-                "headers": {
+            payload = self._unlocker_payload(
+                target_url,
+                body=f"mailConfirmCode={captcha_text}",
+                headers={
                     "Content-Type": "application/x-www-form-urlencoded",
                     "Referer": target_url,
                     "Origin": "https://it-tr-appointment.idata.com.tr"
-                },
-                "body": f"mailConfirmCode={captcha_text}"
-            }
-            
-            headers = {
-                "Authorization": f"Bearer {self.config.BRIGHTDATA_API_KEY}",
-                "Content-Type": "application/json"
-            }
+                }
+            )
             
             logger.info("🔄 POST isteği gönderiliyor...")
-            response = requests.post(
-                api_url,
-                json=payload,
-                headers=headers,
-                timeout=45  # 45 saniye timeout (test sonuçlarına göre optimize edildi)
-            )
+            response = self.transport.post(payload)
             
             logger.info(f"📡 Response Status: {response.status_code}")
             
@@ -234,36 +409,16 @@ class AppointmentChecker:
                 html = response.text
                 logger.info(f"📊 Form sayfası boyutu: {len(html)} karakter")
                 
-                # HTML'i küçük harfe çevir (performans için sadece bir kez)
-                html_lower = html.lower()
-                
-                # Form sayfası kontrolü (geliştirilmiş)
-                form_indicators = [
-                    "appointment-form",
-                    "başvuru bilgileri",
-                    "ikametgah şehri",
-                    "idata ofisi seçiniz",
-                    "gidiş amacı",
-                    "hizmet türü"
-                ]
+                # Form sayfası mı, hata sayfası mı?
+                page_kind = self._classify_captcha_response(html)
+                self.captcha_accepted = {'form': True, 'error': False}.get(page_kind)
                 
-                error_indicators = [
-                    "yanlış",
-                    "hatalı",
-                    "geçersiz",
-                    "invalid",
-                    "incorrect",
-                    "wrong"
-                ]
-                
-                # Form sayfası mı?
-                if any(indicator in html_lower for indicator in form_indicators):
+                if page_kind == 'form':
                     logger.info("✅ Form sayfasına yönlendirme başarılı!")
                     logger.info("📋 Başvuru formu sayfası tespit edildi")
                     return True, html
                 
-                # Hata sayfası mı?
-                if any(error in html_lower for error in error_indicators):
+                if page_kind == 'error':
                     logger.warning("⚠️ CAPTCHA kodu yanlış girildi!")
                     return False, None
                 
@@ -279,6 +434,93 @@ class AppointmentChecker:
             logger.error(f"❌ CAPTCHA POST hatası: {e}")
             return False, None
     
+    def warm_up(self):
+        """CAPTCHA çözücünün ağ bağlantılarını ilk kontrolden önce aç"""
+        warm_up = getattr(self.solver, 'warm_up', None)
+        if warm_up:
+            logger.info(f"🔥 CAPTCHA çözücü warm-up: {warm_up()}")
+    
+    def _report_captcha(self, answer):
+        """CAPTCHA POST sonucunu çözücünün backend istatistiklerine bildir"""
+        report = getattr(self.solver, 'report', None)
+        if report and self.captcha_accepted is not None:
+            report(self.captcha_accepted, source=answer.source, answer=answer)
+            logger.info(f"📈 CAPTCHA backend istatistikleri: {self.solver.stats()}")
+            logger.info(f"🔌 CAPTCHA çözücü bağlantıları: {self.solver.connection_stats()}")
+            cache_stats = self.solver.cache_stats()
+            if cache_stats:
+                logger.info(f"🗂️ CAPTCHA önbelleği: {cache_stats}")
+    
+    def _preprocess_captcha(self, captcha_data):
+        """CAPTCHA'yı çözücülerden önce küçült (kapalıysa veya işlenemezse aynen)"""
+        if not self.config.CAPTCHA_PREPROCESS:
+            return captcha_data
+        processed, stats = preprocess_captcha(
+            captcha_data, max_height=self.config.CAPTCHA_PREPROCESS_HEIGHT
+        )
+        if stats:
+            logger.info(
+                f"🗜️ CAPTCHA ön işlendi: {stats['bytes_before']} -> {stats['bytes_after']} byte "
+                f"({stats['shape_before']} -> {stats['shape_after']})"
+            )
+        return processed
+    
+    def _solve_once(self, captcha_data):
+        """
+        CAPTCHA'yı ön işle ve çözücüyü çalıştır (sadece
+        solve_captcha_from_base64 sunan çözücüler için cevap burada
+        normalize edilir)
+        
+        Returns:
+            tuple: (CaptchaAnswer, ön işlenmiş captcha_data)
+        """
+        captcha_data = self._preprocess_captcha(captcha_data)
+        started = time.perf_counter()
+        solve = getattr(self.solver, 'solve', None)
+        if solve:
+            answer = solve(captcha_data)
+        else:
+            raw = self.solver.solve_captcha_from_base64(captcha_data)
+            text = normalize_captcha_answer(raw)
+            rejected = int(bool(raw) and text is None)
+            answer = CaptchaAnswer(text, rejected=rejected, posts_saved=rejected)
+        answer.elapsed = time.perf_counter() - started
+        return answer, captcha_data
+    
+    def _solve_captcha(self, captcha_data):
+        """
+        CAPTCHA'yı çöz; bozuk cevap POST edilmez
+        
+        Çözücü (yeniden sorma dahil) 6 haneli cevap üretemezse
+        CAPTCHA_MAX_REFETCH kez yeni CAPTCHA sayfası istenir.
+        
+        Returns:
+            tuple: (CaptchaAnswer, kullanılan (ön işlenmiş) captcha_data)
+        """
+        posts_saved = 0
+        elapsed = 0.0
+        for refetch in range(1 + self.config.CAPTCHA_MAX_REFETCH):
+            if refetch:
+                logger.info("🔄 Bozuk cevap, yeni CAPTCHA sayfası isteniyor (POST edilmedi)")
+                success, html, _ = self.fetch_with_brightdata(self.config.APPOINTMENT_URL)
+                fresh = self.extract_captcha_from_html(html) if success else None
+                if not fresh:
+                    break
+                captcha_data = fresh
+            
+            answer, captcha_data = self._solve_once(captcha_data)
+            posts_saved += answer.posts_saved
+            elapsed += answer.elapsed
+            if answer or not answer.posts_saved:
+                break
+        
+        # Süre, yeniden istenen CAPTCHA'lar dahil toplam çözücü süresidir
+        answer.posts_saved = posts_saved
+        answer.elapsed = elapsed
+        if posts_saved:
+            logger.info(f"💰 Bozuk CAPTCHA cevabı yüzünden atlanan POST: {posts_saved}")
+        return answer, captcha_data
+    
     def fill_appointment_form(self, form_html):
         """
         Form sayfasını doldur ve randevu kontrolü yap
@@ -290,229 +532,168 @@ class AppointmentChecker:
         - Hizmet Türü: Standart
         - Kişi Sayısı: 1
         
+        Önbellekte taze form ID'leri varsa birleşik body tek POST ile
+        gönderilir; sunucu reddederse adım adım zincire dönülür.
+        
         Args:
             form_html: Form sayfasının HTML içeriği
             
         Returns:
             tuple: (success: bool, result_html: str or None)
         """
+        self.readiness.reset()
         try:
             logger.info("📝 Form doldurma başlatılıyor...")
             
-            # Form sayfasındaki select option'ları parse et
-            soup = BeautifulSoup(form_html, 'html.parser')
-            
-            # 1. Şehir seçimi için option değerlerini al (dinamik bekleme ile)
-            izmir_option = None
-            max_retries = 3  # Maksimum 3 deneme
-            
-            for attempt in range(1, max_retries + 1):
-                logger.info(f"🏙️ Şehir seçenekleri kontrol ediliyor (Deneme {attempt}/{max_retries})...")
-                
-                # HTML'i yeniden parse et (her denemede)
-                soup = BeautifulSoup(form_html, 'html.parser')
-                city_select = soup.find('select', {'id': 'city_id'})
+            # 0. Önbellekteki ID'lerle tek POST
+            cached_ids = self.form_cache.get()
+            if cached_ids:
+                logger.info(f"⚡ Önbellekteki form ID'leri kullanılıyor: {cached_ids}")
+                response = self.transport.post(self._unlocker_payload(
+                    self.config.APPOINTMENT_URL,
+                    body=self._form_body(applicant_count=1, **cached_ids)
+                ))
+                expected = dict(cached_ids, applicant_count=1)
+                if response.status_code == 200 and self._is_final_form_page(response.text, expected):
+                    logger.info("✅ Form tek POST ile dolduruldu (önbellek)")
+                    return True, response.text
                 
-                if city_select:
-                    options = city_select.find_all('option')
-                    logger.info(f"📊 {len(options)} şehir seçeneği bulundu")
-                    
-                    # İzmir'i ara
-                    for option in options:
-                        option_text = option.get_text().strip().lower()
-                        if 'izmir' in option_text and option.get('value'):
-                            izmir_option = option.get('value')
-                            logger.info(f"✅ İzmir bulundu: value={izmir_option}, text={option.get_text().strip()}")
-                            break
-                    
-                    if izmir_option:
-                        break  # İzmir bulundu, döngüden çık
-                    else:
-                        logger.warning(f"⚠️ İzmir bulunamadı, 2 saniye bekleniyor...")
-                        if attempt < max_retries:
-                            time.sleep(2)
-                            # Sayfayı yeniden getir
-                            logger.info("🔄 Sayfa yeniden getiriliyor...")
-                            _, form_html, _ = self.fetch_with_brightdata(self.config.APPOINTMENT_URL)
-                else:
-                    logger.warning(f"⚠️ city_id select elementi bulunamadı, 2 saniye bekleniyor...")
-                    if attempt < max_retries:
-                        time.sleep(2)
-                        # Sayfayı yeniden getir
-                        _, form_html, _ = self.fetch_with_brightdata(self.config.APPOINTMENT_URL)
+                logger.warning(f"⚠️ Önbellekteki ID'ler sonuç sayfası döndürmedi ({response.status_code}), adım adım zincire dönülüyor")
+                self.form_cache.invalidate()
+            
+            # 1. Şehir seçeneği (yoksa sayfa back-off ile yeniden getirilir)
+            logger.info("🏙️ Şehir seçenekleri kontrol ediliyor...")
+            city_ids, form_html = self._wait_for_options(
+                'city', form_html, {'city_id': ['izmir']},
+                lambda: self.fetch_with_brightdata(self.config.APPOINTMENT_URL)[1]
+            )
             
-            if not izmir_option:
-                logger.error("❌ İzmir seçeneği bulunamadı (3 deneme sonrası)!")
+            if not city_ids:
+                logger.error("❌ İzmir seçeneği bulunamadı!")
+                _, city_options = self._find_option(form_html, 'city_id', ['izmir'])
                 logger.info("📋 Bulunan seçenekler:")
-                if city_select:
-                    for opt in city_select.find_all('option'):
-                        logger.info(f"   - value={opt.get('value')}, text={opt.get_text().strip()}")
+                for value, text in city_options or []:
+                    logger.info(f"   - value={value}, text={text}")
                 return False, None
             
+            izmir_option = city_ids['city_id']
+            logger.info(f"✅ İzmir bulundu: value={izmir_option}")
+            
             # 2. İlk POST: Şehir seçimi (İzmir)
             logger.info("📤 POST 1/4: Şehir seçimi (İzmir)...")
-            city_payload = {
-                "zone": "web_unlocker1",
-                "url": self.config.APPOINTMENT_URL,
-                "format": "raw",
-                "country": "tr",
-                "method": "POST",
-                "body": f"city_id={izmir_option}"
-            }
-            
-            api_url = "https://api.brightdata.com/request"
-            headers = {
-                "Authorization": f"Bearer {self.config.BRIGHTDATA_API_KEY}",
-                "Content-Type": "application/json"
-            }
+            city_payload = self._unlocker_payload(
+                self.config.APPOINTMENT_URL,
+                body=self._form_body(izmir_option)
+            )
             
-            response = requests.post(api_url, json=city_payload, headers=headers, timeout=45)
+            response = self.transport.post(city_payload)
             
             if response.status_code != 200:
                 logger.error(f"❌ Şehir seçimi başarısız: {response.status_code}")
                 return False, None
             
-            logger.info("✅ İzmir seçildi, ofis seçenekleri yükleniyor...")
-            time.sleep(3)  # Server'ın ofis seçeneklerini yüklemesini bekle
+            logger.info("✅ İzmir seçildi, ofis seçenekleri kontrol ediliyor...")
             
-            # 3. İkinci GET: Ofis seçeneklerini al (dinamik bekleme ile)
-            izmir_office = None
+            # 3. Ofis seçeneği (cevapta yoksa şehir POST'u back-off ile tekrarlanır)
+            office_ids, _ = self._wait_for_options(
+                'office', response.text, {'office_id': ['izmir']},
+                lambda: self._post_form_html(city_payload)
+            )
             
-            for attempt in range(1, max_retries + 1):
-                logger.info(f"🏢 Ofis seçenekleri kontrol ediliyor (Deneme {attempt}/{max_retries})...")
-                
-                office_soup = BeautifulSoup(response.text, 'html.parser')
-                office_select = office_soup.find('select', {'id': 'office_id'})
-                
-                if office_select:
-                    options = office_select.find_all('option')
-                    logger.info(f"📊 {len(options)} ofis seçeneği bulundu")
-                    
-                    # İzmir Ofisi'ni ara
-                    for option in options:
-                        option_text = option.get_text().strip().lower()
-                        if 'izmir' in option_text and option.get('value'):
-                            izmir_office = option.get('value')
-                            logger.info(f"✅ İzmir Ofisi bulundu: value={izmir_office}, text={option.get_text().strip()}")
-                            break
-                    
-                    if izmir_office:
-                        break  # İzmir Ofisi bulundu
-                    else:
-                        logger.warning(f"⚠️ İzmir Ofisi bulunamadı, 2 saniye bekleniyor...")
-                        if attempt < max_retries:
-                            time.sleep(2)
-                else:
-                    logger.warning(f"⚠️ office_id select elementi bulunamadı, 2 saniye bekleniyor...")
-                    if attempt < max_retries:
-                        time.sleep(2)
-            
-            if not izmir_office:
-                logger.error("❌ İzmir Ofisi bulunamadı (3 deneme sonrası)!")
-                logger.info("📋 Bulunan ofis seçenekleri:")
-                if office_select:
-                    for opt in office_select.find_all('option'):
-                        logger.info(f"   - value={opt.get('value')}, text={opt.get_text().strip()}")
+            if not office_ids:
+                logger.error("❌ İzmir Ofisi bulunamadı!")
                 return False, None
             
+            izmir_office = office_ids['office_id']
+            logger.info(f"✅ İzmir Ofisi bulundu: value={izmir_office}")
+            
             # 4. İkinci POST: Ofis seçimi
             logger.info("📤 POST 2/4: Ofis seçimi (İzmir Ofisi)...")
-            office_payload = {
-                "zone": "web_unlocker1",
-                "url": self.config.APPOINTMENT_URL,
-                "format": "raw",
-                "country": "tr",
-                "method": "POST",
-                "body": f"city_id={izmir_option}&office_id={izmir_office}"
-            }
+            office_payload = self._unlocker_payload(
+                self.config.APPOINTMENT_URL,
+                body=self._form_body(izmir_option, izmir_office)
+            )
             
-            response = requests.post(api_url, json=office_payload, headers=headers, timeout=45)
+            response = self.transport.post(office_payload)
             
             if response.status_code != 200:
                 logger.error(f"❌ Ofis seçimi başarısız: {response.status_code}")
                 return False, None
             
-            logger.info("✅ İzmir Ofisi seçildi, vize tipleri yükleniyor...")
-            time.sleep(2)
-            
-            # 5. Üçüncü GET: Vize tipi ve hizmet türü seçeneklerini al
-            visa_soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Gidiş amacı (purpose)
-            purpose_select = visa_soup.find('select', {'id': 'visa_purpose_id'})
-            tourist_purpose = None
-            
-            if purpose_select:
-                logger.info("🎯 Gidiş amacı bulundu, Turistik aranıyor...")
-                options = purpose_select.find_all('option')
-                for option in options:
-                    if 'turist' in option.get_text().lower():
-                        tourist_purpose = option.get('value')
-                        logger.info(f"✅ Turistik bulundu: value={tourist_purpose}")
-                        break
-            
-            # Hizmet türü (service type)
-            service_select = visa_soup.find('select', {'id': 'service_type_id'})
-            standard_service = None
-            
-            if service_select:
-                logger.info("🛠️ Hizmet türü bulundu, Standart aranıyor...")
-                options = service_select.find_all('option')
-                for option in options:
-                    if 'standart' in option.get_text().lower() or 'standard' in option.get_text().lower():
-                        standard_service = option.get('value')
-                        logger.info(f"✅ Standart bulundu: value={standard_service}")
-                        break
-            
-            if not tourist_purpose or not standard_service:
+            logger.info("✅ İzmir Ofisi seçildi, vize tipleri kontrol ediliyor...")
+            
+            # 5. Gidiş amacı (Turistik) + hizmet türü (Standart)
+            visa_ids, _ = self._wait_for_options(
+                'visa', response.text,
+                {'visa_purpose_id': ['turist'], 'service_type_id': ['standart', 'standard']},
+                lambda: self._post_form_html(office_payload)
+            )
+            
+            if not visa_ids:
                 logger.warning("⚠️ Vize tipi veya hizmet türü bulunamadı!")
                 return False, None
             
+            tourist_purpose = visa_ids['visa_purpose_id']
+            standard_service = visa_ids['service_type_id']
+            logger.info(f"✅ Turistik bulundu: value={tourist_purpose}")
+            logger.info(f"✅ Standart bulundu: value={standard_service}")
+            
             # 6. Üçüncü POST: Vize tipi ve hizmet türü seçimi
             logger.info("📤 POST 3/4: Turistik + Standart seçimi...")
-            visa_payload = {
-                "zone": "web_unlocker1",
-                "url": self.config.APPOINTMENT_URL,
-                "format": "raw",
-                "country": "tr",
-                "method": "POST",
-                "body": f"city_id={izmir_option}&office_id={izmir_office}&visa_purpose_id={tourist_purpose}&service_type_id={standard_service}"
-            }
+            visa_payload = self._unlocker_payload(
+                self.config.APPOINTMENT_URL,
+                body=self._form_body(izmir_option, izmir_office, tourist_purpose, standard_service)
+            )
             
-            response = requests.post(api_url, json=visa_payload, headers=headers, timeout=45)
+            response = self.transport.post(visa_payload)
             
             if response.status_code != 200:
                 logger.error(f"❌ Vize tipi seçimi başarısız: {response.status_code}")
                 return False, None
             
             logger.info("✅ Turistik + Standart seçildi, kişi sayısı ayarlanıyor...")
-            time.sleep(2)
             
             # 7. Dördüncü POST: Kişi sayısı (1 kişi)
             logger.info("📤 POST 4/4: Kişi sayısı (1 kişi)...")
-            count_payload = {
-                "zone": "web_unlocker1",
-                "url": self.config.APPOINTMENT_URL,
-                "format": "raw",
-                "country": "tr",
-                "method": "POST",
-                "body": f"city_id={izmir_option}&office_id={izmir_office}&visa_purpose_id={tourist_purpose}&service_type_id={standard_service}&applicant_count=1"
-            }
+            count_payload = self._unlocker_payload(
+                self.config.APPOINTMENT_URL,
+                body=self._form_body(izmir_option, izmir_office, tourist_purpose, standard_service, 1)
+            )
             
-            response = requests.post(api_url, json=count_payload, headers=headers, timeout=45)
+            response = self.transport.post(count_payload)
             
             if response.status_code != 200:
                 logger.error(f"❌ Kişi sayısı ayarı başarısız: {response.status_code}")
                 return False, None
             
+            # 8. Sonuç sayfası (değilse kişi sayısı POST'u back-off ile tekrarlanır)
+            form_ids = dict(
+                city_id=izmir_option,
+                office_id=izmir_office,
+                visa_purpose_id=tourist_purpose,
+                service_type_id=standard_service
+            )
+            final, result_html = self._wait_for_final_page(
+                response.text, dict(form_ids, applicant_count=1),
+                lambda: self._post_form_html(count_payload)
+            )
+            
             logger.info("✅ Form doldurma tamamlandı!")
-            logger.info("📊 Son sayfa HTML boyutu: {} karakter".format(len(response.text)))
+            logger.info("📊 Son sayfa HTML boyutu: {} karakter".format(len(result_html)))
             
-            return True, response.text
+            if final:
+                self.form_cache.store(**form_ids)
+            else:
+                logger.warning("⚠️ Sonuç sayfası gelmedi, form ID'leri önbelleğe alınmadı")
+            
+            return True, result_html
             
         except Exception as e:
             logger.error(f"❌ Form doldurma hatası: {e}")
             return False, None
+        
+        finally:
+            logger.info(f"⏱️ Form adım beklemeleri: {self.readiness.summary()}")
     
     def check_appointment_availability(self, html):
         """
@@ -525,48 +706,39 @@ class AppointmentChecker:
             tuple: (available: bool, message: str)
         """
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            text = soup.get_text().lower()
+            page = parse_page(html)
             
             logger.info("🔍 Randevu durumu kontrol ediliyor...")
             
+            # Sayfa dar kalıp setiyle bir kez sınıflandırılır
+            verdict = page.availability()
+            
             # Form sayfasında mıyız? (CAPTCHA geçildiyse)
-            if "appointment-form" in html or "BAŞVURU BİLGİLERİ" in html:
+            if verdict.label == 'form':
                 logger.info("📋 Form sayfasında - Randevu seçenekleri aranıyor...")
                 
                 # "Uygun randevu yok" alert div
-                no_appointment_alert = soup.find('div', class_='alert-danger')
-                if no_appointment_alert and "Uygun randevu tarihi bulunmamaktadır" in no_appointment_alert.get_text():
+                no_appointment_alert = page.alert_danger_text()
+                if no_appointment_alert and "Uygun randevu tarihi bulunmamaktadır" in no_appointment_alert:
                     logger.info("😔 'Uygun randevu tarihi bulunmamaktadır' mesajı bulundu")
                     return False, "😔 Randevu yok"
                 
                 # "İLERİ" butonu var mı? (Randevu varsa görünür)
-                ileri_button = soup.find('a', id='btnAppCountNext')
-                if ileri_button and hasattr(ileri_button, 'get'):
-                    style = str(ileri_button.get('style', ''))
-                    if 'display: none' not in style:
-                        logger.info("✅ 'İLERİ' butonu aktif - RANDEVU VAR!")
-                        return True, "🎉 RANDEVU VAR!"
+                if page.next_button_visible():
+                    logger.info("✅ 'İLERİ' butonu aktif - RANDEVU VAR!")
+                    return True, "🎉 RANDEVU VAR!"
                 
                 logger.info("ℹ️ Form sayfası yüklendi ama randevu durumu belirsiz")
                 return False, "ℹ️ Form sayfası - durum belirsiz"
             
-            # İlk sayfa (CAPTCHA sayfası)
+            # İlk sayfa (CAPTCHA sayfası) - görünür metin kalıpları
             # "Randevu yok" mesajları
-            no_appointment_keywords = [
-                "no appointment",
-                "randevu yok",
-                "müsait randevu yok",
-                "no available appointment"
-            ]
-            
-            for keyword in no_appointment_keywords:
-                if keyword in text:
-                    logger.info(f"😔 '{keyword}' mesajı bulundu - Randevu yok")
-                    return False, "😔 Randevu yok"
+            if verdict.has('no-appointment'):
+                logger.info(f"😔 '{verdict.first('no-appointment')}' mesajı bulundu - Randevu yok")
+                return False, "😔 Randevu yok"
             
-            # Randevu butonları ara (ilk sayfada)
-            appointment_count = text.count('randevu') + text.count('appointment')
+            # Randevu referansları ara (ilk sayfada)
+            appointment_count = verdict.count('appointment-available')
             if appointment_count > 0:
                 logger.info(f"🎉 Randevu referansları bulundu! ({appointment_count} adet)")
                 return True, f"🎉 RANDEVU VAR! ({appointment_count} referans)"
@@ -589,13 +761,21 @@ class AppointmentChecker:
             dict: {
                 'status': str,  # Sonuç mesajı
                 'captcha_image': str or None,  # Base64 CAPTCHA görseli
-                'captcha_text': str or None    # Çözülen CAPTCHA metni
+                'captcha_text': str or None,   # Çözülen CAPTCHA metni
+                'captcha_correct': bool or None,  # Sunucu cevabı kabul etti mi
+                'captcha_posts_saved': int,    # Bozuk cevap yüzünden atlanan POST
+                'captcha_solve_ms': int or None,  # Toplam çözücü süresi
+                'captcha_source': str or None  # Cevabı veren backend
             }
         """
         result = {
             'status': "Kontrol başlatılıyor...",
             'captcha_image': None,
-            'captcha_text': None
+            'captcha_text': None,
+            'captcha_correct': None,
+            'captcha_posts_saved': 0,
+            'captcha_solve_ms': None,
+            'captcha_source': None
         }
         
         def update_progress(step, message):
@@ -618,8 +798,10 @@ class AppointmentChecker:
             
             # 2. Cloudflare kontrolü
             update_progress(2, "Cloudflare kontrolü...")
-            if "cloudflare" in html.lower() or "attention required" in html.lower():
+            verdict = parse_page(html).classify()
+            if verdict.has('cloudflare'):
                 logger.error("❌ Bright Data bile Cloudflare'ı geçemedi!")
+                logger.error(f"🔎 Kanıt: {verdict.evidence['cloudflare'][:3]}")
                 logger.error("💡 Bu çok nadir bir durum, API key'i kontrol edin")
                 result['status'] = "❌ Cloudflare bypass başarısız"
                 return result
@@ -632,17 +814,18 @@ class AppointmentChecker:
             captcha_data = self.extract_captcha_from_html(html)
             
             if captcha_data:
-                logger.info("🔐 CAPTCHA bulundu, Mistral AI ile çözülüyor...")
+                logger.info("🔐 CAPTCHA bulundu, çözülüyor...")
+                
+                # CAPTCHA'yı çöz (bozuk cevap POST edilmez)
+                update_progress(3, "CAPTCHA çözülüyor...")
+                answer, captcha_data = self._solve_captcha(captcha_data)
+                captcha_text = answer.text
                 
                 # CAPTCHA görselini kaydet
                 result['captcha_image'] = captcha_data
-                
-                from src.captcha_solver import CaptchaSolver
-                solver = CaptchaSolver(self.config.MISTRAL_API_KEY)
-                
-                # CAPTCHA'yı çöz
-                update_progress(3, "CAPTCHA çözülüyor (Mistral AI)...")
-                captcha_text = solver.solve_captcha_from_base64(captcha_data)
+                result['captcha_posts_saved'] = answer.posts_saved
+                result['captcha_solve_ms'] = int(answer.elapsed * 1000)
+                result['captcha_source'] = answer.source
                 
                 if captcha_text:
                     logger.info(f"✅ CAPTCHA çözüldü: {captcha_text}")
@@ -654,6 +837,8 @@ class AppointmentChecker:
                     update_progress(4, "CAPTCHA gönderiliyor...")
                     logger.info("📤 CAPTCHA kodu POST ediliyor...")
                     success, form_html = self.submit_captcha(captcha_text)
+                    result['captcha_correct'] = self.captcha_accepted
+                    self._report_captcha(answer)
                     
                     if success and form_html:
                         logger.info("✅ CAPTCHA POST başarılı, form sayfası alındı!")
@@ -684,6 +869,7 @@ class AppointmentChecker:
             update_progress(7, "Sonuç analiz ediliyor...")
             
             logger.info(f"📊 Sonuç: {message}")
+            logger.info(f"🔌 Unlocker bağlantı havuzu: {self.transport.stats.as_dict()}")
             result['status'] = message
             return result
             
@@ -698,9 +884,13 @@ class AppointmentChecker:
             logger.info("🔚 Kontrol tamamlandı")
     
     def cleanup(self):
-        """Temizlik işlemleri"""
+        """Temizlik işlemleri (sadece kendi açtığı transport ve çözücüyü kapatır)"""
         logger.info("🧹 Temizlik yapılıyor...")
-        self.session.close()
+        logger.info(f"📊 Unlocker bağlantı havuzu: {self.transport.stats.as_dict()}")
+        if self._owns_transport:
+            self.transport.close()
+        if self._owns_solver:
+            self.solver.close()
         logger.info("✅ Session kapatıldı")
 
 def main():
@@ -1,71 +1,393 @@
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 import logging
 
+from src.rollups import ROLLUP_COLUMNS, aggregate, backfill, summarize
+from src.storage import WRITE_REJECTED, WRITE_UNAVAILABLE, history_query
+
 logger = logging.getLogger(__name__)
 
+# Şema migrasyonları: (sürüm, açıklama, SQL'ler). Uygulanan son sürüm
+# PRAGMA user_version'da tutulur; yeni değişiklik listenin sonuna eklenir.
+MIGRATIONS = [
+    (1, 'checks tablosu', [
+        '''
+        CREATE TABLE IF NOT EXISTS checks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            status TEXT,
+            appointment_found BOOLEAN,
+            error TEXT
+        )
+        ''',
+    ]),
+    (2, 'timestamp indeksi', [
+        # Geçmiş sorguları timestamp'e göre sıralar
+        '''
+        CREATE INDEX IF NOT EXISTS idx_checks_timestamp
+        ON checks (timestamp, id)
+        ''',
+    ]),
+    (3, 'MySQL ile aynı kayıt şeması (check_logs / captcha_history / system_status)', [
+        'ALTER TABLE checks ADD COLUMN message TEXT',
+        'ALTER TABLE checks ADD COLUMN captcha_text TEXT',
+        'ALTER TABLE checks ADD COLUMN response_time INTEGER',
+        '''
+        CREATE TABLE IF NOT EXISTS captcha_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            captcha_text TEXT,
+            solved_correctly BOOLEAN,
+            response_time INTEGER,
+            posts_saved INTEGER DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS system_status (
+            id INTEGER PRIMARY KEY,
+            last_check_time DATETIME,
+            total_checks INTEGER DEFAULT 0,
+            successful_checks INTEGER DEFAULT 0,
+            failed_checks INTEGER DEFAULT 0,
+            appointments_found INTEGER DEFAULT 0
+        )
+        ''',
+        # Mevcut kayıtlardan sayaçları bir kez hesapla
+        '''
+        INSERT OR IGNORE INTO system_status
+        SELECT 1, MAX(timestamp), COUNT(*),
+               COALESCE(SUM(status = 'success'), 0),
+               COALESCE(SUM(status != 'success'), 0),
+               COALESCE(SUM(status = 'success' AND appointment_found), 0)
+        FROM checks
+        ''',
+    ]),
+    (4, 'dakika / saat / gün rollup tablosu (system_status yerine)', [
+        f'''
+        CREATE TABLE IF NOT EXISTS stats_rollups (
+            granularity TEXT NOT NULL,
+            bucket DATETIME NOT NULL,
+            {', '.join(f'{column} INTEGER NOT NULL DEFAULT 0' for column in ROLLUP_COLUMNS)},
+            PRIMARY KEY (granularity, bucket)
+        ) WITHOUT ROWID
+        ''',
+        'DROP TABLE IF EXISTS system_status',
+    ]),
+]
+
+# stats_rollups'ı açan migrasyon; tablo boş açılır, init_db aynı açılışta
+# mevcut kontrollerden doldurur
+ROLLUPS_VERSION = 4
+
+# Sabit SQL metinleri: sqlite3 bağlantı başına derlenmiş ifadeleri
+# metne göre önbelleğe alır, her çağrı aynı hazır ifadeyi kullanır.
+INSERT_CHECK = '''
+    INSERT INTO checks
+    (timestamp, status, message, captcha_text, appointment_found, error, response_time)
+    VALUES (COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?, ?)
+'''
+INSERT_CAPTCHA = '''
+    INSERT INTO captcha_history
+    (timestamp, captcha_text, solved_correctly, response_time, posts_saved)
+    VALUES (COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?)
+'''
+UPSERT_ROLLUP = f'''
+    INSERT INTO stats_rollups (granularity, bucket, {', '.join(ROLLUP_COLUMNS)})
+    VALUES (?, ?, {', '.join('?' for _ in ROLLUP_COLUMNS)})
+    ON CONFLICT (granularity, bucket) DO UPDATE SET
+    {', '.join(f'{column} = {column} + excluded.{column}' for column in ROLLUP_COLUMNS)}
+'''
+SELECT_RECENT = '''
+    SELECT * FROM checks
+    ORDER BY timestamp DESC, id DESC
+    LIMIT ?
+'''
+
+def _sqlite_timestamp(value):
+    """datetime'ı CURRENT_TIMESTAMP biçimine (UTC metin) çevir; diğerlerini olduğu gibi bırak"""
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+def _local_datetime(value):
+    """SQLite'taki UTC metni MySQL satırlarındaki gibi yerel (naive) datetime'a çevir"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+def _history_row(row):
+    item = dict(row)
+    item['timestamp'] = _local_datetime(item['timestamp'])
+    return item
+
 class Database:
+    """
+    SQLite deposu (arayüz: src/storage.py)
+
+    Süreç boyunca tek bir bağlantı (WAL, synchronous=NORMAL) kullanılır;
+    thread'ler arası erişim bir kilitle sıralanır. Dışa aktarım kendi
+    salt okunur bağlantısını açar (WAL'da yazmaları bloklamaz).
+
+    Args:
+        db_path: SQLite dosyası
+    """
+
+    name = 'sqlite'
+    write_error = None
+    write_error_message = None
+
     def __init__(self, db_path='appointments.db'):
         self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = None
         self.init_db()
-    
+
     def init_db(self):
-        """Veritabanı tablolarını oluştur"""
+        """Bağlantıyı aç, pragma'ları ayarla ve bekleyen migrasyonları uygula"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS checks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT,
-                    appointment_found BOOLEAN,
-                    error TEXT
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
-            logger.info("✅ Veritabanı hazır")
-            
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            journal_mode = conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with self._lock:
+                self._conn = conn
+                previous = conn.execute('PRAGMA user_version').fetchone()[0]
+                version = self.migrate()
+            logger.info(f"✅ Veritabanı hazır (journal: {journal_mode}, şema v{version})")
+            if previous < ROLLUPS_VERSION <= version:
+                self._fill_rollups()
+
         except Exception as e:
             logger.error(f"❌ Veritabanı hatası: {e}")
-    
+
+    def _fill_rollups(self):
+        """
+        Yeni açılan stats_rollups'ı mevcut kontrollerden doldur
+
+        Yükseltmeden önceki kontroller ömür boyu istatistiklerde 0 görünmesin;
+        depo henüz kimseye verilmediği için araya yazma girmez, çift sayım olmaz.
+        """
+        try:
+            processed = backfill(self)
+        except Exception as e:
+            logger.warning(f"⚠️ stats_rollups doldurulamadı ({e}); uygulama durmuşken "
+                           f"'python -m src.rollups --backend sqlite' çalıştırın")
+            return
+        if processed:
+            logger.info(f"📊 stats_rollups mevcut {processed} kontrolden dolduruldu")
+
+    def migrate(self):
+        """
+        user_version'dan sonraki migrasyonları sırayla uygula (kilit tutulurken çağrılır)
+
+        Returns:
+            int: Şema sürümü
+        """
+        version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+        for target, description, statements in MIGRATIONS:
+            if target <= version:
+                continue
+            # sqlite3'ün varsayılan modunda DDL autocommit çalışır; açık BEGIN
+            # ile migrasyon ve sürüm artışı ya birlikte uygulanır ya hiç
+            self._conn.execute('BEGIN')
+            try:
+                for statement in statements:
+                    self._conn.execute(statement)
+                # PRAGMA parametre almaz; target koddaki sabit bir tamsayı
+                self._conn.execute(f'PRAGMA user_version = {int(target)}')
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            version = target
+            logger.info(f"🗄️ Migrasyon v{target} uygulandı: {description}")
+        return version
+
+    @property
+    def available(self):
+        return self._conn is not None
+
+    def close(self):
+        """Bağlantıyı kapat (WAL checkpoint'i SQLite kapanışta yapar)"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
     def log_check(self, status, appointment_found=False, error=None):
         """Kontrol kaydı ekle"""
+        self.log_checks([{'status': status, 'appointment_found': appointment_found, 'error': error}])
+
+    def log_checks(self, checks):
+        """
+        Kontrol kayıtlarını tek transaction'da toplu ekle
+
+        Returns:
+            bool: Yazıldı mı
+        """
+        return self.write_batch(checks=checks)
+
+    def write_batch(self, checks=(), captchas=()):
+        """
+        Kontrol ve CAPTCHA kayıtlarını tek transaction'da toplu yaz
+
+        Args:
+            checks: Kontrol kayıtları; timestamp datetime ya da UTC
+                'YYYY-MM-DD HH:MM:SS' (yoksa şimdiki zaman)
+            captchas: CAPTCHA kayıtları
+
+        Returns:
+            bool: Yazıldı mı (değilse write_error: kilit / disk hatasında
+                  WRITE_UNAVAILABLE, veri / parametre hatasında WRITE_REJECTED)
+        """
+        self.write_error = self.write_error_message = None
+        if not checks and not captchas:
+            return True
+        if self._conn is None:
+            self.write_error = WRITE_UNAVAILABLE
+            self.write_error_message = "bağlantı yok"
+            return False
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO checks (status, appointment_found, error)
-                VALUES (?, ?, ?)
-            ''', (status, appointment_found, error))
-            
-            conn.commit()
-            conn.close()
-            
+            with self._lock, self._conn:
+                if checks:
+                    timestamps = [_sqlite_timestamp(c.get('timestamp')) for c in checks]
+                    self._conn.executemany(INSERT_CHECK, [
+                        (timestamp, c['status'], c.get('message'), c.get('captcha_text'),
+                         bool(c.get('appointment_found')), c.get('error'), c.get('response_time'))
+                        for timestamp, c in zip(timestamps, checks)
+                    ])
+                    self._add_rollups(aggregate(
+                        dict(c, timestamp=_local_datetime(timestamp) if timestamp else None)
+                        for timestamp, c in zip(timestamps, checks)
+                    ))
+                if captchas:
+                    self._conn.executemany(INSERT_CAPTCHA, [
+                        (_sqlite_timestamp(c.get('timestamp')), c.get('captcha_text'),
+                         c.get('solved_correctly'), c.get('response_time'), c.get('posts_saved', 0))
+                        for c in captchas
+                    ])
+            return True
+
         except Exception as e:
             logger.error(f"❌ Kayıt hatası: {e}")
-    
+            rejected = isinstance(e, (sqlite3.IntegrityError, sqlite3.DataError, sqlite3.InterfaceError,
+                                      sqlite3.ProgrammingError, KeyError, TypeError, ValueError))
+            self.write_error = WRITE_REJECTED if rejected else WRITE_UNAVAILABLE
+            self.write_error_message = str(e)
+            return False
+
     def get_recent_checks(self, limit=50):
         """Son kontrolleri getir"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT * FROM checks 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            ''', (limit,))
-            
-            results = cursor.fetchall()
-            conn.close()
-            
-            return results
-            
+            with self._lock:
+                return self._conn.execute(SELECT_RECENT, (limit,)).fetchall()
+
         except Exception as e:
             logger.error(f"❌ Sorgu hatası: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def _history_query(self, columns=None, **filters):
+        for key in ('since', 'until'):
+            if filters.get(key):
+                filters[key] = _sqlite_timestamp(filters[key])
+        if filters.get('before'):
+            before_time, before_id = filters['before']
+            filters['before'] = (_sqlite_timestamp(before_time), before_id)
+        return history_query('checks', columns, placeholder='?', **filters)
+
+    def get_history(self, limit=50, before_id=None, columns=None, **filters):
+        """
+        Filtrelenmiş, keyset sayfalı kontrol geçmişi (MySQLDatabase.get_history ile aynı)
+
+        Returns:
+            list: Kayıtlar (yeniden eskiye)
+        """
+        try:
+            with self._lock:
+                if before_id is not None:
+                    row = self._conn.execute('SELECT timestamp FROM checks WHERE id = ?', (before_id,)).fetchone()
+                    if not row:
+                        return []
+                    filters['before'] = (row['timestamp'], before_id)
+                sql, params = self._history_query(columns, **filters)
+                rows = self._conn.execute(sql + ' LIMIT ?', params + [limit]).fetchall()
+            return [_history_row(row) for row in rows]
+
+        except Exception as e:
+            logger.error(f"❌ Geçmiş okuma hatası: {e}")
+            return []
+
+    def iter_history(self, columns=None, batch_size=500, **filters):
+        """
+        Filtrelenmiş geçmişi ayrı bir bağlantıdan parça parça üret
+
+        Yields:
+            dict: Kayıt (yeniden eskiye)
+        """
+        conn = None
+        try:
+            conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+            conn.row_factory = sqlite3.Row
+            sql, params = self._history_query(columns, **filters)
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _history_row(row)
+        except Exception as e:
+            logger.error(f"❌ Geçmiş dışa aktarma hatası: {e}")
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _add_rollups(self, rollups):
+        """Kilit ve transaction tutulurken dilimlere ekle"""
+        self._conn.executemany(UPSERT_ROLLUP, [
+            (granularity, _sqlite_timestamp(bucket), *counts)
+            for (granularity, bucket), counts in rollups.items()
+        ])
+
+    def add_rollups(self, rollups):
+        """Dilim sayılarını ekle (backfill)"""
+        with self._lock, self._conn:
+            self._add_rollups(rollups)
+
+    def clear_rollups(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM stats_rollups')
+
+    def get_rollups(self, granularity, since=None):
+        """
+        Dilim satırları (eskiden yeniye)
+
+        Args:
+            granularity: minute / hour / day
+            since: İlk dilimin başı (yerel datetime; None: hepsi)
+        """
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT * FROM stats_rollups WHERE granularity = ? AND bucket >= ? ORDER BY bucket',
+                    (granularity, _sqlite_timestamp(since) if since else '')
+                ).fetchall()
+            return [dict(row, bucket=_local_datetime(row['bucket'])) for row in rows]
+
+        except Exception as e:
+            logger.error(f"❌ Rollup okuma hatası: {e}")
+            return []
+
+    def get_stats(self):
+        """Ömür boyu istatistikler (günlük dilimlerden)"""
+        try:
+            with self._lock:
+                last = self._conn.execute('SELECT MAX(timestamp) FROM checks').fetchone()[0]
+            stats = summarize(self.get_rollups('day'))
+            stats.update(last_check_time=_local_datetime(last), monitoring_active=False)
+            return stats
+
+        except Exception as e:
+            logger.error(f"❌ İstatistik okuma hatası: {e}")
+            return {}
@@ -0,0 +1,156 @@
+"""
+Server-Sent Events yayıncısı
+
+Dashboard'a durum, progress, log ve geçmiş değişiklikleri yalnızca fark
+(delta) olarak iletilir. Her olayın artan bir kimliği vardır; son olaylar
+sınırlı bir halka tamponda tutulur ve yeniden bağlanan istemci
+Last-Event-ID'den sonrasını alır. Her istemcinin kuyruğu sınırlıdır:
+dolarsa istemci düşürülür ve yeniden bağlanınca kaldığı yerden (tampon
+yetmezse 'reset' ile baştan) devam eder.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Tek bir SSE istemcisinin kuyruğu"""
+
+    def __init__(self, max_queue):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.overflowed = False
+        self.created_at = time.time()
+
+
+class EventBroker:
+    """
+    Olay yayıncısı
+
+    Args:
+        history: Last-Event-ID ile yeniden gönderilebilecek olay sayısı
+        max_queue: İstemci başına bekleyen en fazla olay
+        max_clients: Aynı anda en fazla SSE istemcisi
+    """
+
+    def __init__(self, history=500, max_queue=200, max_clients=8):
+        self.max_queue = max_queue
+        self.max_clients = max_clients
+        self.last_id = 0
+        self.dropped_clients = 0
+        self._history = deque(maxlen=history)  # (id, event, data)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event, data):
+        """
+        Olayı tampona ekle ve tüm istemcilere ilet (bloklamaz)
+
+        Kuyruğu dolu istemci düşürülür; yeniden bağlanınca kaldığı yerden
+        devam eder.
+        """
+        with self._lock:
+            self.last_id += 1
+            item = (self.last_id, event, data)
+            self._history.append(item)
+            for sub in list(self._subscribers):
+                try:
+                    sub.queue.put_nowait(item)
+                except queue.Full:
+                    sub.overflowed = True
+                    self._subscribers.discard(sub)
+                    self.dropped_clients += 1
+        return item[0]
+
+    def subscribe(self, last_event_id=None):
+        """
+        Yeni istemci kaydet
+
+        Args:
+            last_event_id: İstemcinin aldığı son olay (yeniden bağlanma)
+
+        Returns:
+            tuple: (Subscription, backlog: list veya None) - backlog None ise
+                kaçırılan olaylar tamponda yok, istemci durumu baştan almalı.
+                İstemci sınırı doluysa (None, None).
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                return None, None
+            sub = Subscription(self.max_queue)
+            self._subscribers.add(sub)
+
+            if last_event_id is None:
+                return sub, []
+            if last_event_id > self.last_id:
+                return sub, None
+            oldest = self._history[0][0] if self._history else self.last_id + 1
+            if last_event_id + 1 < oldest:
+                return sub, None
+            return sub, [item for item in self._history if item[0] > last_event_id]
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def client_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+def _json_default(value):
+    # Tembel nesneler (ör. LogEntry) ilk gönderildiklerinde sözlüğe çevrilir
+    as_dict = getattr(value, 'as_dict', None)
+    return as_dict() if as_dict else str(value)
+
+
+def format_event(event_id, event, data):
+    """SSE mesajı"""
+    payload = json.dumps(data, ensure_ascii=False, default=_json_default)
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
+
+
+def stream_events(broker, sub, backlog, snapshot, resumed=False, heartbeat=15, max_duration=300):
+    """
+    SSE akışı üreteci
+
+    Args:
+        broker: EventBroker
+        sub: subscribe() ile alınan Subscription
+        backlog: subscribe()'ın döndürdüğü kaçırılan olaylar (None = reset)
+        snapshot: Yeni / resetlenen istemciye gönderilecek tam durumu
+            üreten fonksiyon
+        resumed: İstemci Last-Event-ID ile yeniden bağlandı
+        heartbeat: Olay yokken yorum satırı gönderme aralığı (saniye)
+        max_duration: Bağlantı bu süreden sonra kapatılır; tarayıcı
+            Last-Event-ID ile yeniden bağlanır ve thread serbest kalır
+    """
+    try:
+        # Tarayıcı koptuğunda 3 sn sonra yeniden bağlansın
+        yield "retry: 3000\n\n"
+        seen = 0
+        if backlog is None or not resumed:
+            # Tam durum; kuyruğa bu arada düşen eski olaylar atlanır
+            seen = broker.last_id
+            yield format_event(seen, 'reset' if backlog is None else 'snapshot', snapshot())
+        for item in backlog or []:
+            seen = item[0]
+            yield format_event(*item)
+
+        deadline = time.monotonic() + max_duration
+        while time.monotonic() < deadline and not sub.overflowed:
+            try:
+                item = sub.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": ping\n\n"
+                continue
+            if item[0] > seen:
+                yield format_event(*item)
+    finally:
+        broker.unsubscribe(sub)
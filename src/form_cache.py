@@ -0,0 +1,99 @@
+"""
+Form seçenek ID önbelleği
+
+fill_appointment_form her çalışmada aynı city_id / office_id /
+visa_purpose_id / service_type_id değerlerini ara sayfalardan yeniden
+keşfeder. Bu modül çözülen ID'leri veritabanının yanında bir JSON dosyasında
+TTL ile saklar; önbellek tazeyken form tek POST ile gönderilebilir.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+FORM_ID_FIELDS = ('city_id', 'office_id', 'visa_purpose_id', 'service_type_id')
+
+
+class FormOptionCache:
+    """
+    Çözülen form ID'lerinin kalıcı önbelleği
+
+    Args:
+        path: JSON dosya yolu
+        ttl: Kaydın geçerli sayılacağı süre (saniye)
+    """
+
+    def __init__(self, path='form_options_cache.json', ttl=86400):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entry = self._load()
+
+    def _load(self):
+        """Diskteki kaydı oku (yoksa veya bozuksa None)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if all(entry.get('ids', {}).get(field) for field in FORM_ID_FIELDS):
+                return entry
+            logger.warning("⚠️ Form ID önbelleği eksik alan içeriyor, yok sayılıyor")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Form ID önbelleği okunamadı: {e}")
+        return None
+
+    def _write(self, entry):
+        """Kaydı atomik olarak diske yaz"""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"⚠️ Form ID önbelleği yazılamadı: {e}")
+
+    def is_stale(self):
+        """Kayıt yoksa veya TTL dolduysa True"""
+        with self._lock:
+            entry = self._entry
+        return entry is None or time.time() - entry['saved_at'] > self.ttl
+
+    def get(self):
+        """
+        Taze ID'leri getir
+
+        Returns:
+            dict or None: {city_id, office_id, visa_purpose_id, service_type_id}
+        """
+        if self.is_stale():
+            return None
+        with self._lock:
+            return dict(self._entry['ids'])
+
+    def store(self, **ids):
+        """Zincirden çözülen ID'leri kaydet"""
+        entry = {
+            'ids': {field: str(ids[field]) for field in FORM_ID_FIELDS},
+            'saved_at': time.time()
+        }
+        with self._lock:
+            self._entry = entry
+            self._write(entry)
+        logger.info(f"💾 Form ID'leri önbelleğe alındı: {entry['ids']}")
+
+    def invalidate(self):
+        """Sunucu ID'leri reddettiğinde kaydı sil"""
+        with self._lock:
+            self._entry = None
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"⚠️ Form ID önbelleği silinemedi: {e}")
+        logger.info("🗑️ Form ID önbelleği geçersiz kılındı")
@@ -0,0 +1,55 @@
+"""
+İçerik adresli CAPTCHA görsel deposu
+
+Görsel bir kez decode edilip içeriğinin SHA-256 özetiyle saklanır;
+/api/status yalnızca özeti ve URL'yi taşır, görsel
+/api/captcha/<özet>.png üzerinden değişmez (immutable) olarak sunulur.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from src.captcha_image import decode_data_url
+
+DIGEST_LENGTH = 32  # hex karakter (128 bit)
+
+
+class ImageStore:
+    """
+    Son görsellerin sınırlı deposu (en eskisi atılır)
+
+    Args:
+        max_items: Tutulan en fazla görsel
+    """
+
+    def __init__(self, max_items=20):
+        self.max_items = max_items
+        self._images = OrderedDict()  # özet -> (mime, bytes)
+        self._lock = threading.Lock()
+
+    def put(self, data_url):
+        """
+        data:image URL'sini sakla
+
+        Returns:
+            str or None: İçerik özeti (decode edilemezse None)
+        """
+        mime, raw = decode_data_url(data_url)
+        if raw is None:
+            return None
+        digest = hashlib.sha256(raw).hexdigest()[:DIGEST_LENGTH]
+        with self._lock:
+            self._images[digest] = (mime, raw)
+            self._images.move_to_end(digest)
+            while len(self._images) > self.max_items:
+                self._images.popitem(last=False)
+        return digest
+
+    def get(self, digest):
+        """
+        Returns:
+            tuple: (mime, bytes) veya None
+        """
+        with self._lock:
+            return self._images.get(digest)
@@ -0,0 +1,173 @@
+"""
+Arka plan iş kuyruğu
+
+Kontroller HTTP isteğinin içinde değil, sınırlı bir worker havuzunda
+çalışır; endpoint'ler hemen bir iş (job) kimliği döner ve iş durumu
+/api/jobs/<id> üzerinden izlenir. Aynı türden bir iş zaten kuyrukta ya da
+çalışıyorsa yeni iş açılmaz, mevcut işe bağlanılır.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class JobQueueFull(Exception):
+    """Kuyrukta bekleyen iş sınırı aşıldı"""
+
+
+class Job:
+    """
+    Tek bir arka plan işi
+
+    Attributes:
+        id: İş kimliği
+        kind: İş türü (aynı türden tek aktif iş olur)
+        trigger: İşi başlatan (ör. 'check-now', 'start', 'scheduler')
+        state: queued / running / done / failed
+        stages: [(adım, mesaj, başlangıçtan itibaren ms), ...]
+    """
+
+    def __init__(self, kind, trigger=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.trigger = trigger
+        self.state = QUEUED
+        self.stages = []
+        self.result = None
+        self.error = None
+        self.attached = 0  # Bu işe bağlanan tekrar istek sayısı
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.state in (QUEUED, RUNNING)
+
+    def set_stage(self, step, message):
+        """İşin bulunduğu adımı kaydet (progress_callback ile uyumlu)"""
+        started = self.started_at or self.created_at
+        with self._lock:
+            self.stages.append((step, message, int((time.time() - started) * 1000)))
+
+    def as_dict(self):
+        """API çıktısı: durum, adım ve süreler"""
+        now = time.time()
+        with self._lock:
+            stages = list(self.stages)
+        step, message = (stages[-1][0], stages[-1][1]) if stages else (0, None)
+        end = self.finished_at or now
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'trigger': self.trigger,
+            'state': self.state,
+            'step': step,
+            'message': message,
+            'stages': [
+                {'step': s, 'message': m, 'at_ms': at} for s, m, at in stages
+            ],
+            'result': self.result,
+            'error': self.error,
+            'attached': self.attached,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'queued_ms': int(((self.started_at or now) - self.created_at) * 1000),
+            'run_ms': int((end - self.started_at) * 1000) if self.started_at else None
+        }
+
+
+class JobQueue:
+    """
+    Sınırlı worker havuzu ile iş kuyruğu
+
+    Args:
+        max_workers: Aynı anda çalışan iş sayısı
+        max_pending: Kuyrukta bekleyebilecek en fazla iş
+        history: Bellekte tutulan bitmiş iş sayısı
+    """
+
+    def __init__(self, max_workers=1, max_pending=10, history=100):
+        self.max_pending = max_pending
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, trigger=None):
+        """
+        İşi kuyruğa ekle; aynı türden aktif iş varsa ona bağlan
+
+        Args:
+            kind: İş türü
+            fn: fn(job) - dönüş değeri job.result olur
+            trigger: İşi başlatan
+
+        Returns:
+            tuple: (Job, created: bool)
+
+        Raises:
+            JobQueueFull: Bekleyen iş sınırı aşıldıysa
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and job.active:
+                    job.attached += 1
+                    logger.info(f"🔗 Zaten {job.state} durumda iş var, ona bağlanıldı: {job.id}")
+                    return job, False
+
+            pending = sum(job.state == QUEUED for job in self._jobs.values())
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"Kuyrukta {pending} iş bekliyor")
+
+            job = Job(kind, trigger)
+            self._jobs[job.id] = job
+            self._prune()
+
+        logger.info(f"📥 İş kuyruğa alındı: {job.id} ({kind}, {trigger})")
+        self._executor.submit(self._run, job, fn)
+        return job, True
+
+    def _run(self, job, fn):
+        job.state = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn(job)
+            job.state = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.state = FAILED
+            logger.error(f"❌ İş hatası ({job.id}): {e}")
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        """Bitmiş işlerden en eskileri at (aktif işler korunur)"""
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active(self, kind=None):
+        """Aktif (kuyrukta / çalışan) işler"""
+        with self._lock:
+            return [
+                job for job in self._jobs.values()
+                if job.active and (kind is None or job.kind == kind)
+            ]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,124 @@
+"""
+Bellek içi log halkası
+
+Her log kaydına artan bir sıra numarası (seq) verilir; istemciler
+/api/logs/recent?after=<seq> ile yalnızca yeni kayıtları alır. Kayıt
+metni (handler.format) kayıt okunana kadar hesaplanmaz.
+"""
+
+import itertools
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+
+class LogEntry:
+    """Tek bir log kaydı; sözlük biçimi ilk okunduğunda üretilir"""
+
+    __slots__ = ('seq', 'record', 'handler', '_data')
+
+    def __init__(self, seq, record, handler):
+        self.seq = seq
+        self.record = record
+        self.handler = handler
+        self._data = None
+
+    def as_dict(self):
+        if self._data is None:
+            record, handler = self.record, self.handler
+            if record is None:
+                # Başka bir thread aynı anda biçimlendirdi
+                return self._data
+            self._data = {
+                'seq': self.seq,
+                'timestamp': datetime.fromtimestamp(record.created).strftime('%H:%M:%S'),
+                'level': record.levelname,
+                'logger': record.name,
+                'message': handler.format(record)
+            }
+            # Biçimlendirildikten sonra kaydı (ve argümanlarını) tutma
+            self.record = self.handler = None
+        return self._data
+
+
+class LogRing:
+    """
+    Sıra numaralı sınırlı log tamponu
+
+    Args:
+        maxlen: Tutulan en fazla kayıt
+    """
+
+    def __init__(self, maxlen=100):
+        self._entries = deque(maxlen=maxlen)
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self.last_seq = 0
+
+    def append(self, record, handler):
+        with self._lock:
+            entry = LogEntry(next(self._seq), record, handler)
+            self._entries.append(entry)
+            self.last_seq = entry.seq
+        return entry
+
+    def since(self, after=None, limit=None):
+        """
+        after'dan sonraki kayıtlar (eskiden yeniye)
+
+        Args:
+            after: İstemcinin aldığı son seq (None = tampondaki son `limit` kayıt)
+            limit: En fazla kayıt
+
+        Returns:
+            tuple: (kayıtlar: [dict], next: int, truncated: bool) - truncated,
+                after ile tampondaki en eski kayıt arasında kayıp varsa True
+        """
+        with self._lock:
+            entries = list(self._entries)
+            last_seq = self.last_seq
+
+        truncated = False
+        if after is not None and after > last_seq:
+            # İmleç bu süreçten değil (yeniden başlatma): baştan gönder
+            after, truncated = None, True
+
+        if after is None:
+            selected = entries[-limit:] if limit else entries
+        else:
+            first_seq = entries[0].seq if entries else last_seq + 1
+            truncated = after + 1 < first_seq
+            start = max(after + 1 - first_seq, 0)
+            selected = entries[start:start + limit] if limit else entries[start:]
+
+        next_seq = selected[-1].seq if selected else (last_seq if after is None else after)
+        return [entry.as_dict() for entry in selected], next_seq, truncated
+
+    def clear(self):
+        """Kayıtları sil (seq devam eder, istemci imleçleri geçerli kalır)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class MemoryLogHandler(logging.Handler):
+    """
+    Logları LogRing'de tutan handler
+
+    Args:
+        ring: LogRing
+        on_entry: Her yeni kayıtta çağrılır (ör. SSE yayını); LogEntry alır
+    """
+
+    def __init__(self, ring, on_entry=None):
+        super().__init__()
+        self.ring = ring
+        self.on_entry = on_entry
+
+    def emit(self, record):
+        entry = self.ring.append(record, self)
+        if self.on_entry:
+            self.on_entry(entry)
@@ -5,18 +5,69 @@ Persistent log storage with fast queries
 
 import os
 import logging
+import threading
 from datetime import datetime
 import mysql.connector
 from mysql.connector import Error, pooling
+from mysql.connector.errors import InterfaceError, OperationalError, PoolError
+
+from src.rollups import ROLLUP_COLUMNS, aggregate, summarize
+from src.storage import WRITE_REJECTED, WRITE_UNAVAILABLE, history_query
 
 logger = logging.getLogger(__name__)
 
+UPSERT_ROLLUP = f"""
+    INSERT INTO stats_rollups (granularity, bucket, {', '.join(ROLLUP_COLUMNS)})
+    VALUES (%s, %s, {', '.join('%s' for _ in ROLLUP_COLUMNS)})
+    ON DUPLICATE KEY UPDATE
+    {', '.join(f'{column} = {column} + VALUES({column})' for column in ROLLUP_COLUMNS)}
+"""
+
 class MySQLDatabase:
-    def __init__(self):
+    """
+    MySQL deposu (arayüz: src/storage.py)
+    
+    Pool açılışta kurulamazsa arka planda artan aralıklarla (en fazla
+    max_reconnect_interval) yeniden denenir; kurulunca tablolar oluşturulur.
+    
+    Args:
+        reconnect_interval: İlk yeniden bağlanma denemesi aralığı (saniye)
+        max_reconnect_interval: Deneme aralığının üst sınırı (saniye)
+    """
+    
+    name = 'mysql'
+    write_error = None
+    write_error_message = None
+    
+    def __init__(self, reconnect_interval=5.0, max_reconnect_interval=60.0):
         """MySQL database bağlantısı"""
         self.connection_pool = None
+        self.reconnect_interval = reconnect_interval
+        self.max_reconnect_interval = max_reconnect_interval
+        self._closed = threading.Event()
         self.setup_connection_pool()
         self.create_tables()
+        if not self.connection_pool and reconnect_interval:
+            threading.Thread(target=self._reconnect_loop, name='mysql-reconnect', daemon=True).start()
+    
+    @property
+    def available(self):
+        return self.connection_pool is not None
+    
+    def _reconnect_loop(self):
+        """Pool kurulana kadar arka planda dene"""
+        delay = self.reconnect_interval
+        while not self._closed.wait(delay):
+            self.setup_connection_pool()
+            if self.connection_pool:
+                self.create_tables()
+                logger.info("🔌 MySQL bağlantısı kuruldu (arka planda yeniden deneme)")
+                return
+            delay = min(delay * 2, self.max_reconnect_interval)
+    
+    def close(self):
+        """Yeniden bağlanma denemesini durdur (pool bağlantıları süreçle kapanır)"""
+        self._closed.set()
     
     def setup_connection_pool(self):
         """Connection pool oluştur"""
@@ -55,7 +106,7 @@ class MySQLDatabase:
     def create_tables(self):
         """Tabloları oluştur"""
         if not self.connection_pool:
-            logger.warning("⚠️ MySQL yok, SQLite kullanılacak")
+            logger.warning("⚠️ MySQL yok, yedek depo kullanılacak")
             return
         
         connection = self.get_connection()
@@ -90,29 +141,31 @@ class MySQLDatabase:
                     captcha_text VARCHAR(10),
                     solved_correctly BOOLEAN,
                     mistral_response_time INT,
+                    posts_saved INT DEFAULT 0,
                     INDEX idx_timestamp (timestamp)
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
             """)
             
-            # Sistem durumu
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS system_status (
-                    id INT PRIMARY KEY DEFAULT 1,
-                    last_check_time DATETIME,
-                    monitoring_active BOOLEAN DEFAULT FALSE,
-                    total_checks INT DEFAULT 0,
-                    successful_checks INT DEFAULT 0,
-                    failed_checks INT DEFAULT 0,
-                    appointments_found INT DEFAULT 0,
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            # Eski captcha_history tablolarına sonradan eklenen kolonlar
+            self._ensure_column(cursor, 'captcha_history', 'posts_saved', 'INT DEFAULT 0')
+            
+            # Dakika / saat / gün istatistik dilimleri (her kontrolde aynı transaction'da artırılır)
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS stats_rollups (
+                    granularity ENUM('minute', 'hour', 'day') NOT NULL,
+                    bucket DATETIME NOT NULL,
+                    {', '.join(f'{column} INT NOT NULL DEFAULT 0' for column in ROLLUP_COLUMNS)},
+                    PRIMARY KEY (granularity, bucket)
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
             """)
             
-            # İlk kayıt
-            cursor.execute("""
-                INSERT IGNORE INTO system_status (id, total_checks)
-                VALUES (1, 0)
-            """)
+            # Rollup'lar geçmiş kayıtlardan otomatik doldurulmaz: birden fazla
+            # süreç aynı anda başlarsa iki kez sayılır
+            cursor.execute("SELECT EXISTS(SELECT 1 FROM stats_rollups), EXISTS(SELECT 1 FROM check_logs)")
+            has_rollups, has_checks = cursor.fetchone()
+            if has_checks and not has_rollups:
+                logger.warning("⚠️ stats_rollups boş ama check_logs dolu; ömür boyu istatistikler için "
+                               "uygulama durmuşken 'python -m src.rollups --backend mysql' çalıştırın")
             
             connection.commit()
             logger.info("✅ MySQL tabloları hazır")
@@ -124,85 +177,156 @@ class MySQLDatabase:
                 cursor.close()
                 connection.close()
     
+    def _ensure_column(self, cursor, table, column, definition):
+        """Kolon yoksa ekle (MySQL 8'de ADD COLUMN IF NOT EXISTS yok)"""
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table, column))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            logger.info(f"🔧 {table}.{column} kolonu eklendi")
+    
     def log_check(self, status, message=None, captcha_text=None, 
                   appointment_found=False, error=None, response_time=None):
         """Kontrol logla"""
+        self.write_batch(checks=[{
+            'timestamp': datetime.now(),
+            'status': status,
+            'message': message,
+            'captcha_text': captcha_text,
+            'appointment_found': appointment_found,
+            'error': error,
+            'response_time': response_time
+        }])
+    
+    def log_captcha(self, captcha_text, solved_correctly, response_time=None, posts_saved=0):
+        """
+        CAPTCHA logla
+        
+        Args:
+            posts_saved: Bozuk çözücü cevabı yüzünden atlanan CAPTCHA POST sayısı
+        """
+        self.write_batch(captchas=[{
+            'timestamp': datetime.now(),
+            'captcha_text': captcha_text,
+            'solved_correctly': solved_correctly,
+            'response_time': response_time,
+            'posts_saved': posts_saved
+        }])
+    
+    def write_batch(self, checks=(), captchas=()):
+        """
+        Kontrol ve CAPTCHA kayıtlarını tek transaction'da toplu yaz
+        
+        check_logs / captcha_history ve stats_rollups (dilim başına tek
+        upsert) için executemany çalışır.
+        
+        Args:
+            checks: log_check argümanları + 'timestamp' içeren dict'ler
+            captchas: log_captcha argümanları + 'timestamp' içeren dict'ler
+        
+        Returns:
+            bool: Yazıldı mı (değilse write_error: bağlantı / geçici hatada
+                  WRITE_UNAVAILABLE, deyim / veri hatasında WRITE_REJECTED)
+        """
+        self.write_error = self.write_error_message = None
+        if not checks and not captchas:
+            return True
+        
         connection = self.get_connection()
         if not connection:
-            return
+            self.write_error = WRITE_UNAVAILABLE
+            self.write_error_message = "bağlantı alınamadı"
+            return False
         
         try:
             cursor = connection.cursor()
             
-            cursor.execute("""
-                INSERT INTO check_logs 
-                (status, message, captcha_text, appointment_found, error, response_time)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (status, message, captcha_text, appointment_found, error, response_time))
-            
-            # İstatistikleri güncelle
-            if status == "success":
-                if appointment_found:
-                    cursor.execute("""
-                        UPDATE system_status 
-                        SET total_checks = total_checks + 1,
-                            successful_checks = successful_checks + 1,
-                            appointments_found = appointments_found + 1,
-                            last_check_time = NOW()
-                        WHERE id = 1
-                    """)
-                else:
-                    cursor.execute("""
-                        UPDATE system_status 
-                        SET total_checks = total_checks + 1,
-                            successful_checks = successful_checks + 1,
-                            last_check_time = NOW()
-                        WHERE id = 1
-                    """)
-            else:
-                cursor.execute("""
-                    UPDATE system_status 
-                    SET total_checks = total_checks + 1,
-                        failed_checks = failed_checks + 1,
-                        last_check_time = NOW()
-                    WHERE id = 1
-                """)
+            if checks:
+                cursor.executemany("""
+                    INSERT INTO check_logs 
+                    (timestamp, status, message, captcha_text, appointment_found, error, response_time)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, [
+                    (c['timestamp'], c['status'], c.get('message'), c.get('captcha_text'),
+                     bool(c.get('appointment_found')), c.get('error'), c.get('response_time'))
+                    for c in checks
+                ])
+                
+                # İstatistik dilimlerini güncelle
+                self._add_rollups(cursor, aggregate(checks))
+            
+            if captchas:
+                cursor.executemany("""
+                    INSERT INTO captcha_history 
+                    (timestamp, captcha_text, solved_correctly, mistral_response_time, posts_saved)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, [
+                    (c['timestamp'], c.get('captcha_text'), c.get('solved_correctly'),
+                     c.get('response_time'), c.get('posts_saved', 0))
+                    for c in captchas
+                ])
             
             connection.commit()
             
         except Error as e:
-            logger.error(f"❌ Log kaydetme hatası: {e}")
+            logger.error(f"❌ Toplu log kaydetme hatası: {e}")
+            # Bağlantı kopması, kilit zaman aşımı vb. geçicidir; diğerleri
+            # (veri / kodlama / strict mode hataları) aynı batch'te tekrarlanır
+            transient = isinstance(e, (InterfaceError, OperationalError, PoolError))
+            self.write_error = WRITE_UNAVAILABLE if transient else WRITE_REJECTED
+            self.write_error_message = str(e)
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            return False
         finally:
             if connection.is_connected():
                 cursor.close()
                 connection.close()
+        
+        return True
     
-    def log_captcha(self, captcha_text, solved_correctly, response_time=None):
-        """CAPTCHA logla"""
+    def get_recent_logs(self, limit=50):
+        """Son logları getir"""
         connection = self.get_connection()
         if not connection:
-            return
+            return []
         
         try:
-            cursor = connection.cursor()
+            cursor = connection.cursor(dictionary=True)
             
             cursor.execute("""
-                INSERT INTO captcha_history 
-                (captcha_text, solved_correctly, mistral_response_time)
-                VALUES (%s, %s, %s)
-            """, (captcha_text, solved_correctly, response_time))
+                SELECT * FROM check_logs 
+                ORDER BY timestamp DESC 
+                LIMIT %s
+            """, (limit,))
             
-            connection.commit()
+            return cursor.fetchall()
             
         except Error as e:
-            logger.error(f"❌ CAPTCHA log hatası: {e}")
+            logger.error(f"❌ Log okuma hatası: {e}")
+            return []
         finally:
             if connection.is_connected():
                 cursor.close()
                 connection.close()
     
-    def get_recent_logs(self, limit=50):
-        """Son logları getir"""
+    def get_history(self, limit=50, before_id=None, columns=None, **filters):
+        """
+        Filtrelenmiş, keyset sayfalı kontrol geçmişi
+        
+        Args:
+            limit: Sayfa boyutu
+            before_id: Önceki sayfanın son kaydının id'si (bu kayıttan eskiler)
+            columns: Seçilecek kolonlar (HISTORY_COLUMNS içinden)
+            **filters: status, appointment_found, since, until
+        
+        Returns:
+            list: Kayıtlar (yeniden eskiye)
+        """
         connection = self.get_connection()
         if not connection:
             return []
@@ -210,35 +334,137 @@ class MySQLDatabase:
         try:
             cursor = connection.cursor(dictionary=True)
             
-            cursor.execute("""
-                SELECT * FROM check_logs 
-                ORDER BY timestamp DESC 
-                LIMIT %s
-            """, (limit,))
+            before = None
+            if before_id is not None:
+                cursor.execute("SELECT timestamp FROM check_logs WHERE id = %s", (before_id,))
+                row = cursor.fetchone()
+                if not row:
+                    return []
+                before = (row['timestamp'], before_id)
             
+            sql, params = history_query('check_logs', columns, before=before, **filters)
+            cursor.execute(sql + " LIMIT %s", params + [limit])
             return cursor.fetchall()
             
         except Error as e:
-            logger.error(f"❌ Log okuma hatası: {e}")
+            logger.error(f"❌ Geçmiş okuma hatası: {e}")
             return []
         finally:
             if connection.is_connected():
                 cursor.close()
                 connection.close()
     
-    def get_stats(self):
-        """İstatistikleri getir"""
+    def iter_history(self, columns=None, batch_size=500, **filters):
+        """
+        Filtrelenmiş geçmişi sunucu tarafı imleçle satır satır üret
+        
+        Sonuçlar belleğe alınmaz; tamponsuz imleçten batch_size'lık
+        parçalar halinde okunur. Bağlantı üreteç bitene (veya kapatılana)
+        kadar tutulur.
+        
+        Yields:
+            dict: Kayıt (yeniden eskiye)
+        """
         connection = self.get_connection()
         if not connection:
-            return {}
+            return
+        
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            sql, params = history_query('check_logs', columns, **filters)
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        except Error as e:
+            logger.error(f"❌ Geçmiş dışa aktarma hatası: {e}")
+        finally:
+            try:
+                # Yarıda kesilen dışa aktarımda okunmamış satırları at
+                connection.consume_results()
+                if cursor is not None:
+                    cursor.close()
+            finally:
+                connection.close()
+    
+    def _add_rollups(self, cursor, rollups):
+        if rollups:
+            cursor.executemany(UPSERT_ROLLUP, [
+                (granularity, bucket, *counts)
+                for (granularity, bucket), counts in rollups.items()
+            ])
+    
+    def add_rollups(self, rollups):
+        """Dilim sayılarını ekle (backfill)"""
+        self._execute_write(lambda cursor: self._add_rollups(cursor, rollups))
+    
+    def clear_rollups(self):
+        self._execute_write(lambda cursor: cursor.execute("DELETE FROM stats_rollups"))
+    
+    def _execute_write(self, work):
+        connection = self.get_connection()
+        if not connection:
+            raise Error("MySQL bağlantısı yok")
+        
+        try:
+            cursor = connection.cursor()
+            work(cursor)
+            connection.commit()
+        except Error:
+            connection.rollback()
+            raise
+        finally:
+            if connection.is_connected():
+                cursor.close()
+                connection.close()
+    
+    def get_rollups(self, granularity, since=None):
+        """
+        Dilim satırları (eskiden yeniye)
+        
+        Args:
+            granularity: minute / hour / day
+            since: İlk dilimin başı (None: hepsi)
+        """
+        connection = self.get_connection()
+        if not connection:
+            return []
         
         try:
             cursor = connection.cursor(dictionary=True)
             
-            cursor.execute("SELECT * FROM system_status WHERE id = 1")
-            stats = cursor.fetchone()
+            sql = "SELECT * FROM stats_rollups WHERE granularity = %s"
+            params = [granularity]
+            if since:
+                sql += " AND bucket >= %s"
+                params.append(since)
+            cursor.execute(sql + " ORDER BY bucket", params)
+            
+            return cursor.fetchall()
+            
+        except Error as e:
+            logger.error(f"❌ Rollup okuma hatası: {e}")
+            return []
+        finally:
+            if connection.is_connected():
+                cursor.close()
+                connection.close()
+    
+    def get_stats(self):
+        """Ömür boyu istatistikler (günlük dilimlerden)"""
+        connection = self.get_connection()
+        if not connection:
+            return {}
+        
+        try:
+            cursor = connection.cursor()
             
-            return stats or {}
+            # idx_timestamp'ten tek satır
+            cursor.execute("SELECT MAX(timestamp) FROM check_logs")
+            last_check_time = cursor.fetchone()[0]
             
         except Error as e:
             logger.error(f"❌ İstatistik okuma hatası: {e}")
@@ -247,3 +473,7 @@ class MySQLDatabase:
             if connection.is_connected():
                 cursor.close()
                 connection.close()
+        
+        stats = summarize(self.get_rollups('day'))
+        stats.update(last_check_time=last_check_time, monitoring_active=False)
+        return stats
@@ -0,0 +1,161 @@
+"""
+Tek seferde parse edilen sayfa modeli
+
+Bir kontrolde aynı HTML birden çok aşamada sorgulanır (CAPTCHA görseli,
+<select> seçenekleri, alert-danger mesajı, İLERİ butonu, sayfa metni).
+ParsedPage her cevabı lxml ile bir kez parse eder ve bu sorguları sunar.
+parse_page() içerik hash'ine göre memo tutar; değişmeyen sayfa yeniden
+parse edilmez.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import lxml.html
+from lxml import etree
+
+from src.page_classifier import default_availability_classifier, default_classifier
+
+_CLASS_XPATH = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+
+
+class ParsedPage:
+    """
+    lxml ile parse edilmiş HTML cevabı
+
+    Args:
+        html: Sayfa HTML içeriği
+    """
+
+    def __init__(self, html):
+        self.html = html or ""
+        self._text = None
+        self._options = {}
+        self._verdicts = {}
+        try:
+            self.root = lxml.html.document_fromstring(self.html) if self.html.strip() else None
+        except (etree.ParserError, ValueError):
+            self.root = None
+
+    @property
+    def text(self):
+        """Görünür metin (bir kez hesaplanır)"""
+        if self._text is None:
+            self._text = self.root.text_content() if self.root is not None else ""
+        return self._text
+
+    def classify(self, source='html'):
+        """
+        Sayfayı sınıflandır (kaynak başına bir kez)
+
+        Args:
+            source: 'html' (ham HTML) veya 'text' (görünür metin)
+
+        Returns:
+            PageVerdict
+        """
+        if source not in self._verdicts:
+            content = self.html if source == 'html' else self.text
+            self._verdicts[source] = default_classifier().classify(content)
+        return self._verdicts[source]
+
+    def availability(self):
+        """
+        Randevu durumu için sınıflandır (bir kez; bkz. AvailabilityClassifier)
+
+        Returns:
+            PageVerdict
+        """
+        if 'availability' not in self._verdicts:
+            self._verdicts['availability'] = default_availability_classifier().classify(self)
+        return self._verdicts['availability']
+
+    def images(self):
+        """Tüm <img> elementleri"""
+        if self.root is None:
+            return []
+        return self.root.xpath('//img')
+
+    def captcha_src(self):
+        """img.imageCaptcha elementinin src değeri (yoksa None)"""
+        if self.root is None:
+            return None
+        imgs = self.root.xpath(f"//img[{_CLASS_XPATH.format('imageCaptcha')}]")
+        if not imgs:
+            return None
+        return imgs[0].get('src', '')
+
+    def select_options(self, select_id):
+        """
+        <select id=select_id> seçenekleri
+
+        Returns:
+            list[(value, text)] or None: select yoksa None
+        """
+        if select_id not in self._options:
+            options = None
+            if self.root is not None:
+                selects = self.root.xpath('//select[@id=$select_id]', select_id=select_id)
+                if selects:
+                    options = [
+                        (opt.get('value'), opt.text_content().strip())
+                        for opt in selects[0].iter('option')
+                    ]
+            self._options[select_id] = options
+        return self._options[select_id]
+
+    def selected_value(self, select_id):
+        """
+        <select id=select_id> içinde selected işaretli option'ın value'su
+
+        Returns:
+            str or None: select yoksa ya da seçili option yoksa None
+        """
+        if self.root is None:
+            return None
+        selected = self.root.xpath('//select[@id=$select_id]//option[@selected]', select_id=select_id)
+        return selected[0].get('value') if selected else None
+
+    def alert_danger_text(self):
+        """İlk div.alert-danger elementinin metni (yoksa None)"""
+        if self.root is None:
+            return None
+        alerts = self.root.xpath(f"//div[{_CLASS_XPATH.format('alert-danger')}]")
+        return alerts[0].text_content() if alerts else None
+
+    def next_button_visible(self):
+        """a#btnAppCountNext var ve display: none değilse True"""
+        if self.root is None:
+            return False
+        buttons = self.root.xpath("//a[@id='btnAppCountNext']")
+        return bool(buttons) and 'display: none' not in buttons[0].get('style', '')
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_CACHE_SIZE = 32
+
+
+def parse_page(html):
+    """
+    HTML'i ParsedPage'e çevir (içerik hash'i ile memo)
+
+    Aynı içerik için aynı ParsedPage nesnesi döner.
+    """
+    if isinstance(html, ParsedPage):
+        return html
+
+    key = hashlib.sha1((html or "").encode('utf-8', 'surrogatepass')).digest()
+    with _cache_lock:
+        page = _cache.get(key)
+        if page is not None:
+            _cache.move_to_end(key)
+            return page
+
+    page = ParsedPage(html)
+    with _cache_lock:
+        _cache[key] = page
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return page
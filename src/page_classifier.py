@@ -0,0 +1,178 @@
+"""
+Derlenmiş çoklu-kalıp sayfa sınıflandırıcı
+
+Sayfa, tüm kategorilerin kalıplarından oluşan tek bir derlenmiş regex ile
+tek geçişte taranır ve Cloudflare, CAPTCHA, CAPTCHA hatası, form, randevu
+yok veya randevu var olarak sınıflandırılır. Her karar, eşleşen kalıpların
+metin içindeki konumlarıyla (kanıt) birlikte döner.
+
+Kalıplar Config.PAGE_PATTERNS içinde veri olarak tutulur. Randevu durumu
+kontrolü kendi dar kalıp setini (Config.AVAILABILITY_*) kullanır.
+"""
+
+import json
+import logging
+import re
+import threading
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class PageVerdict:
+    """
+    Sınıflandırma sonucu
+
+    Attributes:
+        label: Önceliği en yüksek eşleşen kategori (hiçbiri yoksa None)
+        evidence: {kategori: [(başlangıç, bitiş, eşleşen metin), ...]}
+    """
+
+    def __init__(self, label, evidence):
+        self.label = label
+        self.evidence = evidence
+
+    def has(self, category):
+        """Kategoriden en az bir eşleşme var mı?"""
+        return bool(self.evidence.get(category))
+
+    def count(self, category):
+        """Kategorinin eşleşme sayısı"""
+        return len(self.evidence.get(category, ()))
+
+    def first(self, category):
+        """Kategorinin ilk eşleşen metni (yoksa None)"""
+        matches = self.evidence.get(category)
+        return matches[0][2] if matches else None
+
+    def as_dict(self):
+        return {'label': self.label, 'evidence': self.evidence}
+
+    def __repr__(self):
+        counts = {category: len(matches) for category, matches in self.evidence.items()}
+        return f"PageVerdict({self.label!r}, {counts})"
+
+
+class PageClassifier:
+    """
+    Kategorileri tek regex'te birleştiren sınıflandırıcı
+
+    Args:
+        patterns: {kategori: [düz metin kalıpları]}
+        priority: Karar için kategori öncelik sırası
+        ignore_case: Büyük/küçük harf duyarsız eşleştir
+    """
+
+    def __init__(self, patterns, priority, ignore_case=True):
+        self.priority = [category for category in priority if category in patterns]
+        self.priority += [category for category in patterns if category not in self.priority]
+
+        # Her kategori bir named group; grup içinde uzun kalıplar önce
+        # ("müsait randevu yok" -> "randevu yok"). Kategoriler öncelik
+        # sırasıyla dizildiği için "randevu yok" "randevu"dan önce denenir.
+        self._groups = {}
+        alternatives = []
+        for index, category in enumerate(self.priority):
+            if not patterns[category]:
+                continue
+            group = f"c{index}"
+            self._groups[group] = category
+            ordered = sorted(patterns[category], key=len, reverse=True)
+            alternatives.append(f"(?P<{group}>{'|'.join(re.escape(p) for p in ordered)})")
+
+        self._regex = re.compile("|".join(alternatives) or r"(?!x)x", re.IGNORECASE if ignore_case else 0)
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Config.PAGE_PATTERNS (ve varsa PAGE_PATTERNS_FILE) ile oluştur"""
+        config = config or Config()
+        patterns = dict(config.PAGE_PATTERNS)
+
+        if config.PAGE_PATTERNS_FILE:
+            try:
+                with open(config.PAGE_PATTERNS_FILE, 'r', encoding='utf-8') as f:
+                    patterns.update(json.load(f))
+                logger.info(f"📄 Sayfa kalıpları yüklendi: {config.PAGE_PATTERNS_FILE}")
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ Sayfa kalıpları okunamadı: {e}")
+
+        return cls(patterns, config.PAGE_VERDICT_PRIORITY)
+
+    def classify(self, text):
+        """
+        Metni tek geçişte sınıflandır
+
+        Returns:
+            PageVerdict
+        """
+        evidence = {}
+        for match in self._regex.finditer(text or ""):
+            category = self._groups[match.lastgroup]
+            evidence.setdefault(category, []).append((match.start(), match.end(), match.group(0)))
+
+        label = next((category for category in self.priority if category in evidence), None)
+        return PageVerdict(label, evidence)
+
+
+class AvailabilityClassifier:
+    """
+    Randevu durumu sınıflandırıcı (dar kalıp seti)
+
+    Form sayfası ham HTML'de büyük/küçük harf duyarlı işaretlerle tanınır;
+    form sayfası değilse küçük harfe çevrilmiş görünür metin tek geçişte
+    taranır. 'randevu' ve 'appointment' sayısı metindeki ayrı ayrı
+    geçişlerinin toplamıdır.
+
+    Args:
+        form_markers: Ham HTML'de aranan form işaretleri
+        patterns: {kategori: [küçük harf kalıplar]} (görünür metin için)
+    """
+
+    def __init__(self, form_markers, patterns):
+        self._form = PageClassifier({'form': form_markers}, ['form'], ignore_case=False)
+        self._text = PageClassifier(patterns, list(patterns), ignore_case=False)
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Config.AVAILABILITY_FORM_MARKERS ve AVAILABILITY_PATTERNS ile oluştur"""
+        config = config or Config()
+        return cls(config.AVAILABILITY_FORM_MARKERS, config.AVAILABILITY_PATTERNS)
+
+    def classify(self, page):
+        """
+        Args:
+            page: ParsedPage (html ve text)
+
+        Returns:
+            PageVerdict: 'form', 'no-appointment', 'appointment-available' ya da None
+        """
+        verdict = self._form.classify(page.html)
+        if verdict.label is not None:
+            return verdict
+        return self._text.classify(page.text.lower())
+
+
+_default_classifier = None
+_default_availability = None
+_default_lock = threading.Lock()
+
+
+def default_classifier():
+    """Config'ten oluşturulan paylaşılan sınıflandırıcı"""
+    global _default_classifier
+    if _default_classifier is None:
+        with _default_lock:
+            if _default_classifier is None:
+                _default_classifier = PageClassifier.from_config()
+    return _default_classifier
+
+
+def default_availability_classifier():
+    """Config'ten oluşturulan paylaşılan randevu durumu sınıflandırıcısı"""
+    global _default_availability
+    if _default_availability is None:
+        with _default_lock:
+            if _default_availability is None:
+                _default_availability = AvailabilityClassifier.from_config()
+    return _default_availability
@@ -0,0 +1,83 @@
+"""
+Form adımları için hazır-olma (readiness) takibi
+
+Eskiden her form POST'undan sonra sabit time.sleep(2-3) yapılıyordu. Artık
+cevapta beklenen <select> seçenekleri varsa hemen sonraki adıma geçilir;
+yoksa sınırlı ve adaptif bir geri çekilme (back-off) ile sayfa yeniden
+istenir. Her adımın bekleme süresi kaydedilir.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Eski akıştaki sabit beklemeler (saniye) - kazancı raporlamak için
+FIXED_STEP_SLEEPS = {
+    'city': 0,
+    'office': 3,
+    'visa': 2,
+    'count': 2
+}
+
+
+class ReadinessBackoff:
+    """
+    Adım bazlı sınırlı, adaptif back-off
+
+    Bir adım daha önce bekleme gerektirdiyse sonraki kontrolde o gecikmeden
+    başlanır; bekleme gerektirmeden hazır olduğunda başlangıç gecikmesi
+    yarıya inerek initial_delay'e döner.
+
+    Args:
+        initial_delay: İlk bekleme (saniye)
+        max_delay: Tek bekleme için üst sınır (saniye)
+        max_attempts: Hazır olmayan sayfa için en fazla yeniden deneme
+        factor: Her denemede gecikme çarpanı
+    """
+
+    def __init__(self, initial_delay=0.25, max_delay=2.0, max_attempts=3, factor=2.0):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.factor = factor
+        self._start_delays = {}
+        self.wait_times = {}
+
+    def reset(self):
+        """Yeni kontrol için adım sürelerini sıfırla (öğrenilen gecikmeler kalır)"""
+        self.wait_times = {}
+
+    def delays(self, step):
+        """Adım için sırayla denenecek gecikmeler"""
+        delay = self._start_delays.get(step, self.initial_delay)
+        for _ in range(self.max_attempts):
+            yield delay
+            delay = min(delay * self.factor, self.max_delay)
+
+    def record(self, step, waited, ready_delay=None):
+        """
+        Adımın bekleme süresini kaydet ve başlangıç gecikmesini uyarla
+
+        Args:
+            step: Adım adı ('city', 'office', 'visa', ...)
+            waited: Hazır olana kadar geçen süre (saniye)
+            ready_delay: Sayfanın hazır geldiği denemedeki gecikme
+                         (None: beklemeden hazırdı veya hiç hazır olmadı)
+        """
+        self.wait_times[step] = round(self.wait_times.get(step, 0.0) + waited, 3)
+
+        if ready_delay is not None:
+            self._start_delays[step] = ready_delay
+        elif waited == 0:
+            start = self._start_delays.get(step, self.initial_delay)
+            self._start_delays[step] = max(start / 2, self.initial_delay)
+
+    def summary(self):
+        """Adım süreleri ve eski sabit beklemelere göre kazanç"""
+        fixed = sum(FIXED_STEP_SLEEPS.values())
+        waited = sum(self.wait_times.values())
+        return {
+            'steps': dict(self.wait_times),
+            'total_wait': round(waited, 3),
+            'saved_vs_fixed': round(fixed - waited, 3)
+        }
@@ -0,0 +1,76 @@
+"""
+Serileştirilmiş API yanıtları için read-through önbellek
+
+/api/history ve /api/stats'ın JSON gövdesi bir kez üretilip saklanır;
+kontrol kayıtları depoya yazıldığında (write-behind kuyruğunun on_flush
+geri çağrısı, src/app.py on_persisted) geçersiz kılınır. Yazma bildirimi
+kaçsa bile en fazla `ttl` saniye eski veri döner.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Anahtar başına (gövde, oluşturulma zamanı) tutan önbellek
+
+    Args:
+        ttl: Güvenlik amaçlı en uzun ömür (saniye)
+        clock: Zaman kaynağı
+    """
+
+    def __init__(self, ttl=300, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """
+        Önbellekteki gövdeyi döndür; yoksa / eskiyse build() ile üret
+
+        build() sırasında geçersiz kılma olursa sonuç saklanmaz (yazmadan
+        önce okunmuş veri önbelleğe girmez). build() hata fırlatırsa hiçbir
+        şey saklanmaz.
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[1] < self.ttl:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        body = build()
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (body, now)
+        return body
+
+    def invalidate(self, *keys):
+        """Verilen anahtarları (verilmezse hepsini) sil"""
+        with self._lock:
+            self._generation += 1
+            if keys:
+                for key in keys:
+                    self._entries.pop(key, None)
+            else:
+                self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'keys': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
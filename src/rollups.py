@@ -0,0 +1,188 @@
+"""
+Kontrol istatistikleri için zaman dilimli özet (rollup) tabloları
+
+Her kontrol yazılırken aynı transaction'da dakikalık, saatlik ve günlük
+dilime eklenir: kontrol sayısı, başarılı / başarısız, bulunan randevu ve
+response_time histogramı. /api/stats?window=1h|24h|7d tablo taramadan
+birkaç satırdan cevaplanır; ömür boyu toplamlar günlük dilimlerden
+hesaplanır.
+
+Geçmiş kayıtlardan yeniden oluşturma (check_logs / checks):
+    python -m src.rollups [--backend mysql|sqlite]
+
+Backfill, tarama sırasında gelen yazmaları iki kez sayabileceği için
+uygulama durdurulmuşken çalıştırılmalıdır.
+"""
+
+import argparse
+import bisect
+import logging
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ('minute', 'hour', 'day')
+
+# Pencere -> (dilim türü, süre); pencere başı dilim sınırına yuvarlanır
+WINDOWS = {
+    '1h': ('minute', timedelta(hours=1)),
+    '24h': ('hour', timedelta(hours=24)),
+    '7d': ('day', timedelta(days=7)),
+}
+
+# response_time histogramı kutu üst sınırları (ms); son kutu taşanlar
+LATENCY_EDGES_MS = (500, 1000, 2000, 3000, 5000, 7500, 10000, 15000, 20000, 30000, 60000)
+
+COUNTER_COLUMNS = ('checks', 'successful', 'failed', 'appointments_found')
+HISTOGRAM_COLUMNS = tuple(f'h{i}' for i in range(len(LATENCY_EDGES_MS) + 1))
+ROLLUP_COLUMNS = COUNTER_COLUMNS + HISTOGRAM_COLUMNS
+
+
+def bucket_start(moment, granularity):
+    """Zamanın düştüğü dilimin başı"""
+    moment = moment.replace(second=0, microsecond=0)
+    if granularity in ('hour', 'day'):
+        moment = moment.replace(minute=0)
+    if granularity == 'day':
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def window_range(window, now=None):
+    """
+    Returns:
+        tuple: (dilim türü, ilk dilimin başı)
+
+    Raises:
+        KeyError: Bilinmeyen pencere
+    """
+    granularity, span = WINDOWS[window]
+    return granularity, bucket_start((now or datetime.now()) - span, granularity)
+
+
+def aggregate(checks, into=None):
+    """
+    Kontrol kayıtlarını dilimlere topla
+
+    Args:
+        checks: status, appointment_found, response_time ve timestamp
+            (datetime; yoksa şimdi) içeren dict'ler
+        into: Eklenecek mevcut sonuç
+
+    Returns:
+        dict: {(dilim türü, dilim başı): [ROLLUP_COLUMNS sırasıyla sayılar]}
+    """
+    rollups = into if into is not None else {}
+    for check in checks:
+        moment = check.get('timestamp') or datetime.now()
+        success = check['status'] == 'success'
+        latency = check.get('response_time')
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(moment, granularity))
+            counts = rollups.get(key)
+            if counts is None:
+                counts = rollups[key] = [0] * len(ROLLUP_COLUMNS)
+            counts[0] += 1
+            counts[1 if success else 2] += 1
+            counts[3] += int(success and bool(check.get('appointment_found')))
+            if latency is not None:
+                counts[len(COUNTER_COLUMNS) + bisect.bisect_left(LATENCY_EDGES_MS, latency)] += 1
+    return rollups
+
+
+def _percentile(histogram, total, q):
+    """Değerin düştüğü kutunun üst sınırı (taşma kutusunda son sınır)"""
+    rank, seen = q * total, 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= rank and count:
+            return LATENCY_EDGES_MS[min(index, len(LATENCY_EDGES_MS) - 1)]
+    return LATENCY_EDGES_MS[-1]
+
+
+def summarize(rows):
+    """
+    Dilim satırlarının toplamı
+
+    Args:
+        rows: ROLLUP_COLUMNS anahtarlı dict'ler
+
+    Returns:
+        dict: Sayaçlar, başarı oranı ve gecikme yüzdelikleri (ms)
+    """
+    totals = [sum(row[column] or 0 for row in rows) for column in ROLLUP_COLUMNS]
+    checks, successful, failed, appointments = totals[:len(COUNTER_COLUMNS)]
+    histogram = totals[len(COUNTER_COLUMNS):]
+    measured = sum(histogram)
+    return {
+        'buckets': len(rows),
+        'total_checks': checks,
+        'successful_checks': successful,
+        'failed_checks': failed,
+        'appointments_found': appointments,
+        'success_rate': round(successful / checks * 100, 2) if checks else 0,
+        'latency': {
+            'count': measured,
+            'p50_ms': _percentile(histogram, measured, 0.50) if measured else None,
+            'p90_ms': _percentile(histogram, measured, 0.90) if measured else None,
+            'p99_ms': _percentile(histogram, measured, 0.99) if measured else None,
+            # le_ms: kutunun üst sınırı (None: son sınırı aşanlar)
+            'histogram': [
+                {'le_ms': edge, 'count': count}
+                for edge, count in zip(LATENCY_EDGES_MS + (None,), histogram)
+            ]
+        }
+    }
+
+
+def backfill(storage, chunk=10000):
+    """
+    Dilimleri depodaki tüm kontrol kayıtlarından yeniden oluştur
+
+    Kayıtlar imleçle okunur ve chunk'lık parçalar halinde eklenir;
+    bellek kullanımı geçmişin boyuna bağlı değildir.
+
+    Returns:
+        int: İşlenen kayıt sayısı
+    """
+    storage.clear_rollups()
+    pending, processed = [], 0
+    for row in storage.iter_history(columns=['status', 'appointment_found', 'response_time']):
+        pending.append(row)
+        if len(pending) >= chunk:
+            storage.add_rollups(aggregate(pending))
+            processed += len(pending)
+            pending = []
+            logger.info(f"📊 Backfill: {processed} kayıt işlendi")
+    if pending:
+        storage.add_rollups(aggregate(pending))
+        processed += len(pending)
+    return processed
+
+
+def main():
+    from config.settings import Config
+    from src.storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Rollup tablolarını kontrol geçmişinden yeniden oluştur")
+    parser.add_argument("--backend", choices=("mysql", "sqlite"), default=Config.STORAGE_BACKEND)
+    parser.add_argument("--chunk", type=int, default=10000, help="Tek seferde eklenen kayıt")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    storage = open_storage(args.backend, Config)
+    if not storage.available:
+        logger.error(f"❌ {storage.name} deposuna bağlanılamadı")
+        return 1
+    started = time.perf_counter()
+    try:
+        processed = backfill(storage, chunk=args.chunk)
+    finally:
+        storage.close()
+    logger.info(f"✅ Backfill tamamlandı: {processed} kayıt, {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
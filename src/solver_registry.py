@@ -0,0 +1,320 @@
+"""
+CAPTCHA çözücü kayıt defteri (registry) ve yarış modu
+
+Birden fazla çözücü backend'i (yerel tanıyıcı, Mistral, 2captcha) tek
+yerden yönetilir. Yerel (inline) backend'ler ağ çağrısından önce sırayla
+denenir; ardından beklenen maliyeti en düşük N ağ backend'ine görsel aynı
+anda gönderilir ve normalize edilip 6 haneye indirgenebilen ilk cevap
+alınır. Kaybedenlere iptal sinyali verilir.
+
+Her backend için gecikme (EWMA) ve doğruluk istatistikleri tutulur;
+sıralama "doğru cevaba beklenen süre" = gecikme / doğruluk ile yapılır.
+
+Backend arayüzü:
+    name: str
+    inline: bool          (True: yarıştan önce satır içinde dene)
+    available: bool
+    solve(data_url, cancel) -> str, (str, task_id) veya None   (cancel: threading.Event)
+    report(correct, task_id)  (opsiyonel: sunucu cevabı doğru/yanlış buldu)
+
+task_id, servis tarafındaki görev kimliğidir (2captcha captcha id'si);
+cevapla birlikte CaptchaAnswer.task_id'de taşınır ve rapor o göreve yapılır.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src.captcha_answer import CaptchaAnswer, normalize_captcha_answer
+
+logger = logging.getLogger(__name__)
+
+
+class BackendStats:
+    """
+    Tek backend'in gecikme / doğruluk istatistikleri
+
+    Args:
+        alpha: Gecikme EWMA katsayısı
+    """
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.attempts = 0
+        self.valid = 0
+        self.invalid = 0
+        self.errors = 0
+        self.wins = 0
+        self.cancelled = 0
+        self.correct = 0
+        self.wrong = 0
+        self.latency = None
+        self._lock = threading.Lock()
+
+    def record_attempt(self):
+        with self._lock:
+            self.attempts += 1
+
+    def record_result(self, latency, valid):
+        """Backend cevap döndü (geçerli veya geçersiz)"""
+        with self._lock:
+            if valid:
+                self.valid += 1
+            else:
+                self.invalid += 1
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency = self.alpha * latency + (1 - self.alpha) * self.latency
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def record_cancel(self):
+        with self._lock:
+            self.cancelled += 1
+
+    def record_win(self):
+        with self._lock:
+            self.wins += 1
+
+    def record_report(self, correct):
+        with self._lock:
+            if correct:
+                self.correct += 1
+            else:
+                self.wrong += 1
+
+    @property
+    def accuracy(self):
+        """
+        Laplace düzeltmeli doğruluk tahmini (veri yoksa 0.5)
+
+        Geçersiz format ve hata da yanlış cevap sayılır.
+        """
+        failures = self.wrong + self.invalid + self.errors
+        return (self.correct + 1) / (self.correct + failures + 2)
+
+    @property
+    def expected_cost(self):
+        """Doğru cevaba beklenen süre (ölçüm yoksa 0: önce denenir)"""
+        if self.latency is None:
+            return 0.0
+        return self.latency / self.accuracy
+
+    def as_dict(self):
+        return {
+            'attempts': self.attempts,
+            'valid': self.valid,
+            'invalid': self.invalid,
+            'errors': self.errors,
+            'wins': self.wins,
+            'cancelled': self.cancelled,
+            'correct': self.correct,
+            'wrong': self.wrong,
+            'latency': round(self.latency, 3) if self.latency is not None else None,
+            'accuracy': round(self.accuracy, 3)
+        }
+
+
+class SolverRegistry:
+    """
+    Backend kayıt defteri ve yarıştırıcı
+
+    Args:
+        backends: Başlangıç backend listesi
+        race_width: Aynı anda yarıştırılacak ağ backend sayısı (1: sırayla,
+            kaybeden ücretli backend'ler de ücret kestiği için varsayılan)
+        timeout: Tek CAPTCHA için toplam süre sınırı (saniye)
+    """
+
+    def __init__(self, backends=(), race_width=1, timeout=60.0):
+        self.race_width = max(1, race_width)
+        self.timeout = timeout
+        self.backends = {}
+        self.stats = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        for backend in backends:
+            self.register(backend)
+
+    def register(self, backend):
+        """Backend ekle (aynı isim varsa değiştirir)"""
+        self.backends[backend.name] = backend
+        self.stats.setdefault(backend.name, BackendStats())
+        logger.info(f"🧩 CAPTCHA backend kaydedildi: {backend.name} (hazır: {backend.available})")
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(2, len(self.backends) * 2),
+                    thread_name_prefix='captcha-solver'
+                )
+            return self._executor
+
+    def ranked(self):
+        """Hazır ağ backend'leri, beklenen maliyete göre sıralı"""
+        candidates = [
+            backend for backend in self.backends.values()
+            if backend.available and not backend.inline
+        ]
+        return sorted(candidates, key=lambda backend: self.stats[backend.name].expected_cost)
+
+    def _attempt(self, backend, data_url, cancel):
+        """
+        Backend'i çalıştır, cevabı normalize et ve istatistiğe yaz
+
+        Returns:
+            tuple: (6 haneli kod veya None, görev kimliği veya None,
+                    bozuk cevap reddedildi mi)
+        """
+        stats = self.stats[backend.name]
+        stats.record_attempt()
+        started = time.perf_counter()
+        try:
+            raw = backend.solve(data_url, cancel)
+        except Exception as e:
+            stats.record_error()
+            logger.warning(f"⚠️ {backend.name} çözücü hatası: {e}")
+            return None, None, False
+
+        task_id = None
+        if isinstance(raw, tuple):
+            raw, task_id = raw
+        if raw is None and cancel.is_set():
+            stats.record_cancel()
+            return None, None, False
+
+        text = normalize_captcha_answer(raw)
+        stats.record_result(time.perf_counter() - started, text is not None)
+        if raw and text is None:
+            logger.info(f"🚫 {backend.name} bozuk cevap döndü, POST edilmeyecek: '{raw}'")
+            return None, task_id, True
+        if text and text != raw:
+            logger.info(f"🔧 {backend.name} cevabı normalize edildi: '{raw}' -> '{text}'")
+        return text, task_id, False
+
+    def _race(self, group, data_url, deadline):
+        """
+        Grubu aynı anda çalıştır, ilk geçerli cevabı döndür
+
+        Returns:
+            tuple: (kod veya None, kazanan adı veya None, kazananın görev
+                    kimliği veya None, reddedilen cevap sayısı)
+        """
+        cancel = threading.Event()
+        futures = {
+            self._pool().submit(self._attempt, backend, data_url, cancel): backend
+            for backend in group
+        }
+        pending = set(futures)
+        rejected = 0
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("⏱️ CAPTCHA yarışı süre sınırına ulaştı")
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    text, task_id, was_rejected = future.result()
+                    rejected += was_rejected
+                    if text:
+                        return text, futures[future].name, task_id, rejected
+            return None, None, None, rejected
+        finally:
+            cancel.set()
+            for future in pending:
+                future.cancel()
+
+    def solve(self, data_url):
+        """
+        CAPTCHA'yı çöz (tek tur: inline backend'ler, sonra yarış grupları)
+
+        Returns:
+            CaptchaAnswer
+        """
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        rejected = 0
+
+        def answer(text=None, source=None, task_id=None):
+            return CaptchaAnswer(
+                text, source, rejected=rejected, elapsed=time.perf_counter() - started,
+                task_id=task_id
+            )
+
+        for backend in self.backends.values():
+            if backend.inline and backend.available:
+                text, task_id, was_rejected = self._attempt(backend, data_url, threading.Event())
+                rejected += was_rejected
+                if text:
+                    self.stats[backend.name].record_win()
+                    return answer(text, backend.name, task_id)
+
+        ranked = self.ranked()
+        for start in range(0, len(ranked), self.race_width):
+            group = ranked[start:start + self.race_width]
+            logger.info(f"🏁 CAPTCHA yarışı: {[backend.name for backend in group]}")
+            text, winner, task_id, group_rejected = self._race(group, data_url, deadline)
+            rejected += group_rejected
+            if text:
+                self.stats[winner].record_win()
+                logger.info(f"🏆 Kazanan: {winner} -> '{text}'")
+                return answer(text, winner, task_id)
+            if time.monotonic() >= deadline:
+                break
+
+        logger.warning("⚠️ Hiçbir CAPTCHA backend'i geçerli cevap vermedi")
+        return answer()
+
+    def report(self, backend_name, correct, task_id=None):
+        """Sunucunun CAPTCHA cevabını kabul edip etmediğini kaydet"""
+        if backend_name not in self.backends:
+            return
+        self.stats[backend_name].record_report(correct)
+        reporter = getattr(self.backends[backend_name], 'report', None)
+        if reporter and task_id is not None:
+            try:
+                reporter(correct, task_id)
+            except Exception as e:
+                logger.warning(f"⚠️ {backend_name} rapor hatası: {e}")
+
+    def stats_dict(self):
+        """Backend başına istatistikler"""
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+    def warm_up(self):
+        """
+        warm_up() destekleyen hazır backend'leri ısıt
+
+        Returns:
+            dict: {backend adı: süre (saniye) veya None}
+        """
+        return {
+            name: backend.warm_up()
+            for name, backend in self.backends.items()
+            if backend.available and hasattr(backend, 'warm_up')
+        }
+
+    def connection_stats(self):
+        """pool_stats tutan backend'lerin bağlantı sayaçları"""
+        return {
+            name: backend.pool_stats.as_dict()
+            for name, backend in self.backends.items()
+            if hasattr(backend, 'pool_stats')
+        }
+
+    def close(self):
+        """Thread havuzunu ve backend bağlantılarını kapat (süren çağrılar beklenmez)"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+        for backend in self.backends.values():
+            closer = getattr(backend, 'close', None)
+            if closer:
+                closer()
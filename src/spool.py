@@ -0,0 +1,242 @@
+"""
+Diske yazılan replay journal (spool)
+
+Birincil depo yazamadığında batch'ler yalnızca sona eklenen bir dosyaya
+yazılır; süreç yeniden başlasa bile birincil geri geldiğinde aktarılır.
+
+Dosya biçimi: ardışık kayıtlar, her biri
+    tür (1 bayt) | uzunluk (4 bayt, big-endian) | CRC32 (4 bayt) | gövde
+    B: batch  - gövde JSON {'check': [...], 'captcha': [...]}
+    A: onay   - gövde 4 bayt; baştaki o kadar batch aktarıldı
+
+Açılışta dosya baştan okunur; yarım ya da CRC'si tutmayan son kayıt
+(yazarken çökme) kesilip atılır. fsync her eklemede değil, arka plan
+thread'inde en fazla fsync_interval saniyede bir yapılır. Tüm batch'ler
+aktarılınca dosya sıfırlanır.
+
+Birincilin reddettiği batch'ler ayrı bir dead-letter dosyasına (JSON
+satırları) yazılır; elle incelenip düzeltilebilsin diye silinmez.
+"""
+
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from collections import deque
+from datetime import datetime
+
+from src.storage import batch_size
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct('>cII')
+ACK = struct.Struct('>I')
+BATCH, ACKED = b'B', b'A'
+
+
+def _encode(batch):
+    return json.dumps(
+        batch, ensure_ascii=False, separators=(',', ':'),
+        default=lambda o: o.isoformat() if isinstance(o, datetime) else str(o)
+    ).encode('utf-8')
+
+
+def _decode(payload):
+    batch = json.loads(payload.decode('utf-8'))
+    for records in batch.values():
+        for record in records:
+            if isinstance(record.get('timestamp'), str):
+                record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+    return batch
+
+
+class SpoolJournal:
+    """
+    Dosyaya kalıcı FIFO batch journal'ı (ReplayJournal ile aynı arayüz)
+
+    Args:
+        path: Spool dosyası
+        max_records: Bekleyen en fazla kayıt; aşılırsa en eski batch atılır
+        fsync_interval: fsync'ler arası en uzun süre (saniye)
+    """
+
+    def __init__(self, path, max_records=50000, fsync_interval=1.0):
+        self.path = path
+        self.max_records = max_records
+        self.fsync_interval = fsync_interval
+        self.records = 0
+        self.dropped = 0
+        self.fsyncs = 0
+        self._batches = deque()  # (offset, uzunluk, kayıt sayısı)
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._load()
+        self._file = open(self.path, 'ab')
+        self._syncer = threading.Thread(target=self._sync_loop, name='spool-fsync', daemon=True)
+        self._syncer.start()
+        if self._batches:
+            logger.warning(f"📼 Spool'da aktarılmamış {self.records} kayıt var ({len(self._batches)} batch)")
+
+    def _load(self):
+        """Dosyayı tara; bekleyen batch'leri bul, bozuk kuyruğu kes"""
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        with open(self.path, 'rb') as f:
+            while True:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                kind, length, crc = HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc or kind not in (BATCH, ACKED):
+                    break
+                if kind == BATCH:
+                    count = batch_size(_decode(payload))
+                    self._batches.append((offset, length, count))
+                    self.records += count
+                else:
+                    for _ in range(min(ACK.unpack(payload)[0], len(self._batches))):
+                        self.records -= self._batches.popleft()[2]
+                offset += HEADER.size + length
+
+        size = os.path.getsize(self.path)
+        if offset < size:
+            logger.warning(f"⚠️ Spool sonunda yarım kayıt ({size - offset} bayt), kesiliyor")
+            with open(self.path, 'r+b') as f:
+                f.truncate(offset)
+                os.fsync(f.fileno())
+        if not self._batches and offset:
+            self._reset()
+
+    def _reset(self):
+        """Bekleyen batch kalmadı: dosyayı sıfırla"""
+        with open(self.path, 'r+b') as f:
+            f.truncate(0)
+            os.fsync(f.fileno())
+
+    def _write(self, kind, payload):
+        """Kaydı sona ekle (kilit tutulurken); kaydın offset'ini döndür"""
+        offset = self._file.tell()
+        self._file.write(HEADER.pack(kind, len(payload), zlib.crc32(payload)) + payload)
+        self._file.flush()
+        self._dirty = True
+        return offset
+
+    def __len__(self):
+        return len(self._batches)
+
+    def append(self, batch):
+        payload = _encode(batch)
+        count = batch_size(batch)
+        with self._lock:
+            offset = self._write(BATCH, payload)
+            self._batches.append((offset, len(payload), count))
+            self.records += count
+            dropped, lost = 0, 0
+            while self.records > self.max_records and len(self._batches) > 1:
+                count = self._batches.popleft()[2]
+                self.records -= count
+                dropped += 1
+                lost += count
+            if dropped:
+                self._write(ACKED, ACK.pack(dropped))
+                self.dropped += lost
+                logger.error(f"❌ Spool dolu, en eski {lost} kayıt atıldı")
+
+    def head(self, max_records=500):
+        """
+        Baştaki batch'ler (toplam kayıt max_records'u geçmeyecek kadar, en az bir)
+
+        Returns:
+            list: Batch'ler (eskiden yeniye)
+        """
+        with self._lock:
+            entries, total = [], 0
+            for entry in self._batches:
+                if entries and total + entry[2] > max_records:
+                    break
+                entries.append(entry)
+                total += entry[2]
+        batches = []
+        with open(self.path, 'rb') as f:
+            for offset, length, _ in entries:
+                f.seek(offset + HEADER.size)
+                batches.append(_decode(f.read(length)))
+        return batches
+
+    def pop(self, count=1):
+        """Baştaki count batch'i aktarıldı olarak işaretle"""
+        with self._lock:
+            count = min(count, len(self._batches))
+            for _ in range(count):
+                self.records -= self._batches.popleft()[2]
+            if self._batches:
+                self._write(ACKED, ACK.pack(count))
+                self._sync()
+            else:
+                self._file.truncate(0)
+                self._file.seek(0)
+                self._dirty = True
+                self._sync()
+
+    def _sync(self):
+        """Kilit tutulurken: kirli veriyi diske indir"""
+        if self._dirty:
+            os.fsync(self._file.fileno())
+            self._dirty = False
+            self.fsyncs += 1
+
+    def _sync_loop(self):
+        while not self._closed.wait(self.fsync_interval):
+            with self._lock:
+                try:
+                    self._sync()
+                except (OSError, ValueError) as e:
+                    logger.error(f"❌ Spool fsync hatası: {e}")
+
+    def close(self):
+        """fsync thread'ini durdur, bekleyenleri diske indir ve dosyayı kapat"""
+        self._closed.set()
+        self._syncer.join(timeout=5)
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+
+class DeadLetterFile:
+    """
+    Birincilin reddettiği batch'ler (yalnızca sona eklenen JSON satırları)
+
+    Her satır: {"time": ..., "reason": ..., "batch": {"check": [...], "captcha": [...]}}
+
+    Args:
+        path: Dead-letter dosyası
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.batches = 0
+        self.records = 0
+        self._lock = threading.Lock()
+
+    def append(self, batch, reason):
+        line = _encode({'time': datetime.now(), 'reason': reason, 'batch': batch}) + b'\n'
+        with self._lock:
+            try:
+                with open(self.path, 'ab') as f:
+                    f.write(line)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                logger.error(f"❌ Dead-letter yazılamadı ({self.path}): {e}")
+                return
+            self.batches += 1
+            self.records += batch_size(batch)
+
+    def close(self):
+        pass
@@ -0,0 +1,507 @@
+"""
+Kalıcı depo arayüzü, bellek içi depo ve yedekli (failover) depo
+
+Kontrol / CAPTCHA kayıtları tek bir depoya yazılır; hangisi olduğu
+Config.STORAGE_BACKEND ile seçilir (mysql, sqlite, memory). Birincil
+yazamadığında kayıtlar replay journal'a (STORAGE_SPOOL verilmişse diske,
+bkz. src/spool.py) ve varsa yedeğe (STORAGE_FALLBACK) yazılır; birincil
+geri gelince journal sırayla ona aktarılır, kesinti sırasında yazılanlar
+kaybolmaz.
+
+Birincil ayaktayken reddettiği (deyim / veri hatası) batch'ler yeniden
+denenmez; dead-letter dosyasına (STORAGE_DEAD_LETTER, bkz. src/spool.py)
+yazılır ve loglanır, journal'daki sonraki kayıtlar onun arkasında
+beklemez.
+
+Depo arayüzü:
+    name: str
+    available: bool
+    write_batch(checks, captchas) -> bool   (tek transaction)
+    write_error: None / WRITE_UNAVAILABLE / WRITE_REJECTED   (son write_batch)
+    write_error_message: str   (son hatanın metni)
+    get_history(limit, before_id, columns, **filters) -> [dict]
+    iter_history(columns, **filters) -> dict üreteci
+    get_stats() -> dict   (ömür boyu: rollups.summarize alanları +
+                           last_check_time, monitoring_active)
+    get_rollups(granularity, since) -> [dict]   (bucket + rollups.ROLLUP_COLUMNS)
+    add_rollups(rollups) / clear_rollups()      (backfill için)
+    close()
+
+Kayıt biçimleri:
+    check: timestamp, status, message, captcha_text, appointment_found,
+           error, response_time
+    captcha: timestamp, captcha_text, solved_correctly, response_time,
+             posts_saved
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from src.rollups import ROLLUP_COLUMNS, aggregate, summarize
+
+logger = logging.getLogger(__name__)
+
+# write_batch başarısızsa deponun write_error değeri
+WRITE_UNAVAILABLE = 'unavailable'  # Bağlantı / geçici hata: aynı batch sonra yeniden denenir
+WRITE_REJECTED = 'rejected'        # Deyim / veri hatası: yeniden denense de yazılmaz
+
+# /api/history'de seçilebilen kolonlar (keyset imleci için id ve timestamp hep seçilir)
+HISTORY_COLUMNS = (
+    'id', 'timestamp', 'status', 'message', 'captcha_text',
+    'appointment_found', 'error', 'response_time'
+)
+
+
+def history_columns(columns=None):
+    """İstenen kolonlar; id ve timestamp başta, bilinmeyenler atılır"""
+    columns = [c for c in (columns or HISTORY_COLUMNS) if c in HISTORY_COLUMNS]
+    return ['id', 'timestamp'] + [c for c in columns if c not in ('id', 'timestamp')]
+
+
+def history_query(table, columns=None, status=None, appointment_found=None,
+                  since=None, until=None, before=None, placeholder='%s'):
+    """
+    Geçmiş sorgusu (WHERE + ORDER BY, LIMIT hariç)
+
+    Sıralama (timestamp, id) azalan; keyset sayfalama (timestamp, id)
+    indeksiyle çalışır.
+
+    Args:
+        before: (timestamp, id) - bu kayıttan eskiler
+        placeholder: Sürücünün parametre işareti (MySQL %s, SQLite ?)
+
+    Returns:
+        tuple: (sql, params)
+    """
+    p = placeholder
+    clauses, params = [], []
+    if status:
+        clauses.append(f"status = {p}")
+        params.append(status)
+    if appointment_found is not None:
+        clauses.append(f"appointment_found = {p}")
+        params.append(bool(appointment_found))
+    if since:
+        clauses.append(f"timestamp >= {p}")
+        params.append(since)
+    if until:
+        clauses.append(f"timestamp < {p}")
+        params.append(until)
+    if before:
+        before_time, before_id = before
+        clauses.append(f"(timestamp < {p} OR (timestamp = {p} AND id < {p}))")
+        params.extend([before_time, before_time, before_id])
+
+    sql = f"SELECT {', '.join(history_columns(columns))} FROM {table}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY timestamp DESC, id DESC"
+    return sql, params
+
+
+class MemoryStorage:
+    """
+    Bellek içi depo (disk / ağ G/Ç'si yok; benchmark ve test için)
+
+    Args:
+        max_rows: Tutulan en fazla kontrol kaydı (None: sınırsız)
+    """
+
+    name = 'memory'
+    available = True
+    write_error = None
+    write_error_message = None
+
+    def __init__(self, max_rows=None):
+        self.checks = deque(maxlen=max_rows)
+        self.captchas = deque(maxlen=max_rows)
+        self.rollups = {}  # (dilim türü, dilim başı) -> sayılar
+        self.last_check_time = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def write_batch(self, checks=(), captchas=()):
+        with self._lock:
+            for check in checks:
+                row = {column: check.get(column) for column in HISTORY_COLUMNS}
+                row['id'] = self._next_id
+                row['appointment_found'] = bool(check.get('appointment_found'))
+                self._next_id += 1
+                self.checks.append(row)
+                last = self.last_check_time
+                self.last_check_time = max(last, row['timestamp']) if last else row['timestamp']
+            aggregate(checks, into=self.rollups)
+            self.captchas.extend(dict(captcha) for captcha in captchas)
+        return True
+
+    def _select(self, columns=None, status=None, appointment_found=None,
+                since=None, until=None, before=None):
+        with self._lock:
+            rows = list(self.checks)
+        if status:
+            rows = [r for r in rows if r['status'] == status]
+        if appointment_found is not None:
+            rows = [r for r in rows if r['appointment_found'] == bool(appointment_found)]
+        if since:
+            rows = [r for r in rows if r['timestamp'] >= since]
+        if until:
+            rows = [r for r in rows if r['timestamp'] < until]
+        if before:
+            rows = [r for r in rows if (r['timestamp'], r['id']) < before]
+        rows.sort(key=lambda r: (r['timestamp'], r['id']), reverse=True)
+        keys = history_columns(columns)
+        return [{key: row[key] for key in keys} for row in rows]
+
+    def get_history(self, limit=50, before_id=None, columns=None, **filters):
+        before = None
+        if before_id is not None:
+            with self._lock:
+                row = next((r for r in self.checks if r['id'] == before_id), None)
+            if row is None:
+                return []
+            before = (row['timestamp'], before_id)
+        return self._select(columns, before=before, **filters)[:limit]
+
+    def iter_history(self, columns=None, **filters):
+        yield from self._select(columns, **filters)
+
+    def get_rollups(self, granularity, since=None):
+        with self._lock:
+            rows = [
+                dict(zip(ROLLUP_COLUMNS, counts), bucket=bucket)
+                for (kind, bucket), counts in self.rollups.items()
+                if kind == granularity and (since is None or bucket >= since)
+            ]
+        return sorted(rows, key=lambda row: row['bucket'])
+
+    def add_rollups(self, rollups):
+        with self._lock:
+            for key, counts in rollups.items():
+                current = self.rollups.setdefault(key, [0] * len(ROLLUP_COLUMNS))
+                for index, count in enumerate(counts):
+                    current[index] += count
+
+    def clear_rollups(self):
+        with self._lock:
+            self.rollups.clear()
+
+    def get_stats(self):
+        stats = summarize(self.get_rollups('day'))
+        stats.update(last_check_time=self.last_check_time, monitoring_active=False)
+        return stats
+
+    def close(self):
+        pass
+
+
+class ReplayJournal:
+    """
+    Birincil depoya henüz yazılamamış batch'ler (bellek içi FIFO)
+
+    Kalıcı sürümü: src.spool.SpoolJournal (aynı arayüz).
+
+    Args:
+        max_records: Tutulan en fazla kayıt; aşılırsa en eski batch atılır
+    """
+
+    def __init__(self, max_records=50000):
+        self.max_records = max_records
+        self.records = 0
+        self.dropped = 0
+        self._batches = deque()
+
+    def __len__(self):
+        return len(self._batches)
+
+    def append(self, batch):
+        self._batches.append(batch)
+        self.records += batch_size(batch)
+        while self.records > self.max_records and len(self._batches) > 1:
+            lost = self._batches.popleft()
+            self.records -= batch_size(lost)
+            self.dropped += batch_size(lost)
+            logger.error(f"❌ Replay journal dolu, {batch_size(lost)} kayıt atıldı")
+
+    def head(self, max_records=500):
+        """
+        Baştaki batch'ler (toplam kayıt max_records'u geçmeyecek kadar, en az bir)
+
+        Returns:
+            list: Batch'ler (eskiden yeniye)
+        """
+        batches, total = [], 0
+        for batch in self._batches:
+            if batches and total + batch_size(batch) > max_records:
+                break
+            batches.append(batch)
+            total += batch_size(batch)
+        return batches
+
+    def pop(self, count=1):
+        """Baştaki count batch'i sil (birincil yazdıktan sonra)"""
+        for _ in range(min(count, len(self._batches))):
+            self.records -= batch_size(self._batches.popleft())
+
+    def close(self):
+        pass
+
+
+def batch_size(batch):
+    return len(batch['check']) + len(batch['captcha'])
+
+
+class FailoverStorage:
+    """
+    Birincil depo yazamazsa journal'a (ve varsa yedeğe) yazan, birincil
+    dönünce journal'ı toplu aktaran depo
+
+    Okumalar birincil ayaktayken ondan, değilken yedekten yapılır (yedek
+    yoksa birincilden). Birincil düşünce arka plan thread'i en fazla
+    retry_interval saniyede bir journal'ı aktarmayı dener; yazma
+    trafiği olmasa da kayıtlar birincil döner dönmez aktarılır.
+
+    Args:
+        primary: Birincil depo
+        fallback: Yedek depo (None: yalnızca journal)
+        journal: ReplayJournal / SpoolJournal (verilmezse bellek içi)
+        retry_interval: Birincili yeniden deneme aralığı (saniye)
+        replay_batch: Aktarımda tek write_batch'e birleştirilen en fazla kayıt
+        dead_letter: Birincilin reddettiği batch'lerin yazıldığı DeadLetterFile
+                     (None: yalnızca loglanır)
+        clock: Zaman kaynağı
+    """
+
+    def __init__(self, primary, fallback=None, journal=None, retry_interval=30.0,
+                 replay_batch=500, dead_letter=None, clock=time.monotonic):
+        self.primary = primary
+        self.fallback = fallback
+        self.journal = journal if journal is not None else ReplayJournal()
+        self.dead_letter = dead_letter
+        self.retry_interval = retry_interval
+        self.replay_batch = replay_batch
+        self.clock = clock
+        self.name = f'{primary.name}+{fallback.name}' if fallback else primary.name
+        self.primary_up = primary.available and not len(self.journal)
+        self.failovers = 0
+        self.replayed = 0
+        self.dead_lettered = 0
+        self._next_retry = 0.0
+        self._lock = threading.Lock()  # Yazma ve journal aktarımını sıralar
+        self._closed = threading.Event()
+        self._watcher = None
+        if not self.primary_up:
+            target = f"{fallback.name} + journal" if fallback else 'journal'
+            logger.warning(f"⚠️ {primary.name} hazır değil, kayıtlar {target}'a yazılacak")
+            self._watch()
+
+    @property
+    def available(self):
+        return self.primary.available or bool(self.fallback and self.fallback.available)
+
+    def _watch(self):
+        """Birincil dönene kadar arka planda journal aktarımını dene (kilit tutulurken)"""
+        if self._watcher is None or not self._watcher.is_alive():
+            self._watcher = threading.Thread(target=self._watch_loop, name='storage-recover', daemon=True)
+            self._watcher.start()
+
+    def _watch_loop(self):
+        while not self._closed.wait(self.retry_interval):
+            with self._lock:
+                if self._recover():
+                    return
+
+    def _recover(self):
+        """
+        Birincil ayakta mı; düşmüşse vakti geldiyse journal'ı aktararak dene
+
+        Returns:
+            bool: Birincile yazılabilir mi
+        """
+        if self.primary_up:
+            return True
+        if self.clock() < self._next_retry:
+            return False
+        if not self.primary.available:
+            self._next_retry = self.clock() + self.retry_interval
+            return False
+
+        replayed = 0
+        while len(self.journal):
+            batches = self.journal.head(self.replay_batch)
+            checks = [record for batch in batches for record in batch['check']]
+            captchas = [record for batch in batches for record in batch['captcha']]
+            if self.primary.write_batch(checks, captchas):
+                self.journal.pop(len(batches))
+                replayed += len(checks) + len(captchas)
+                continue
+            if self.primary.write_error == WRITE_REJECTED:
+                # Birleşik batch reddedildi: batch'leri tek tek yaz, reddedileni ayır
+                written = self._replay_each(batches)
+                if written is not None:
+                    replayed += written
+                    continue
+            self._next_retry = self.clock() + self.retry_interval
+            self.replayed += replayed
+            if replayed:
+                logger.warning(f"⚠️ Journal aktarımı yarıda kaldı ({replayed} kayıt aktarıldı)")
+            return False
+
+        self.replayed += replayed
+        self.primary_up = True
+        logger.info(f"✅ {self.primary.name} geri geldi, journal'dan {replayed} kayıt aktarıldı")
+        return True
+
+    def _replay_each(self, batches):
+        """
+        Journal başındaki batch'leri tek tek aktar; reddedilenleri dead-letter'a taşı
+
+        Returns:
+            int or None: Aktarılan kayıt (birincile ulaşılamadıysa None)
+        """
+        written = 0
+        for batch in batches:
+            if self.primary.write_batch(batch['check'], batch['captcha']):
+                written += batch_size(batch)
+            elif self.primary.write_error == WRITE_REJECTED:
+                self._reject(batch)
+            else:
+                self.replayed += written
+                return None
+            self.journal.pop(1)
+        return written
+
+    def _reject(self, batch):
+        """Birincilin reddettiği batch'i dead-letter'a yaz ve logla"""
+        count = batch_size(batch)
+        self.dead_lettered += count
+        reason = self.primary.write_error_message or self.primary.write_error
+        logger.error(f"☠️ {self.primary.name} {count} kaydı reddetti, dead-letter'a taşındı: {reason}")
+        if self.dead_letter is not None:
+            self.dead_letter.append(batch, reason)
+
+    def write_batch(self, checks=(), captchas=()):
+        """
+        Returns:
+            bool: Birincile yazıldı mı (journal'a / yedeğe alınan ya da
+                  reddedilip dead-letter'a taşınan batch için False)
+        """
+        with self._lock:
+            if self._recover():
+                if self.primary.write_batch(checks, captchas):
+                    return True
+                if self.primary.write_error == WRITE_REJECTED:
+                    self._reject({'check': list(checks), 'captcha': list(captchas)})
+                    return False
+                self.primary_up = False
+                self.failovers += 1
+                self._next_retry = self.clock() + self.retry_interval
+                target = self.fallback.name if self.fallback else 'journal'
+                logger.warning(f"⚠️ {self.primary.name} yazamadı, {target}'a geçildi")
+                self._watch()
+
+            self.journal.append({'check': list(checks), 'captcha': list(captchas)})
+            if self.fallback:
+                self.fallback.write_batch(checks, captchas)
+            return False
+
+    def _reader(self):
+        return self.primary if self.primary_up or not self.fallback else self.fallback
+
+    def get_history(self, limit=50, before_id=None, columns=None, **filters):
+        return self._reader().get_history(limit=limit, before_id=before_id, columns=columns, **filters)
+
+    def iter_history(self, columns=None, **filters):
+        return self._reader().iter_history(columns=columns, **filters)
+
+    def get_stats(self):
+        return self._reader().get_stats()
+
+    def get_rollups(self, granularity, since=None):
+        return self._reader().get_rollups(granularity, since)
+
+    def add_rollups(self, rollups):
+        return self.primary.add_rollups(rollups)
+
+    def clear_rollups(self):
+        return self.primary.clear_rollups()
+
+    def metrics(self):
+        """Failover / journal sayaçları"""
+        return {
+            'primary': self.primary.name,
+            'fallback': self.fallback.name if self.fallback else None,
+            'primary_up': self.primary_up,
+            'failovers': self.failovers,
+            'replayed': self.replayed,
+            'dead_lettered': self.dead_lettered,
+            'journal': type(self.journal).__name__,
+            'journal_batches': len(self.journal),
+            'journal_records': self.journal.records,
+            'journal_dropped': self.journal.dropped,
+            'journal_fsyncs': getattr(self.journal, 'fsyncs', None)
+        }
+
+    def close(self):
+        """Kapanmadan önce birincili son kez dene, sonra depoları kapat"""
+        self._closed.set()
+        with self._lock:
+            self._next_retry = 0.0
+            if len(self.journal):
+                self._recover()
+            self.journal.close()
+            if self.dead_letter is not None:
+                self.dead_letter.close()
+        self.primary.close()
+        if self.fallback:
+            self.fallback.close()
+
+
+def open_storage(name, config):
+    """İsme göre depo oluştur (mysql / sqlite / memory)"""
+    if name == 'mysql':
+        from src.mysql_db import MySQLDatabase
+        return MySQLDatabase(reconnect_interval=config.MYSQL_RECONNECT_INTERVAL)
+    if name == 'sqlite':
+        from src.database import Database
+        return Database(config.STORAGE_DB)
+    if name == 'memory':
+        return MemoryStorage()
+    raise ValueError(f"Bilinmeyen depo: {name} (mysql, sqlite, memory)")
+
+
+def create_storage(config):
+    """
+    Config'e göre depo: STORAGE_BACKEND; yedek veya spool verilmişse
+    FailoverStorage içinde (bellek deposunun journal'a ihtiyacı yok)
+    """
+    primary = open_storage(config.STORAGE_BACKEND, config)
+    fallback_name = config.STORAGE_FALLBACK if config.STORAGE_FALLBACK != config.STORAGE_BACKEND else ''
+    if primary.name == 'memory' or not (fallback_name or config.STORAGE_SPOOL):
+        logger.info(f"🗄️ Depo: {primary.name}")
+        return primary
+
+    dead_letter = None
+    if config.STORAGE_DEAD_LETTER:
+        from src.spool import DeadLetterFile
+        dead_letter = DeadLetterFile(config.STORAGE_DEAD_LETTER)
+    if config.STORAGE_SPOOL:
+        from src.spool import SpoolJournal
+        journal = SpoolJournal(
+            config.STORAGE_SPOOL,
+            max_records=config.STORAGE_JOURNAL_MAX,
+            fsync_interval=config.STORAGE_SPOOL_FSYNC_INTERVAL
+        )
+    else:
+        journal = ReplayJournal(config.STORAGE_JOURNAL_MAX)
+    storage = FailoverStorage(
+        primary,
+        open_storage(fallback_name, config) if fallback_name else None,
+        journal=journal,
+        retry_interval=config.STORAGE_RETRY_INTERVAL,
+        dead_letter=dead_letter
+    )
+    fallback = storage.fallback.name if storage.fallback else 'yok'
+    logger.info(f"🗄️ Depo: {primary.name} (yedek: {fallback}, journal: {type(journal).__name__})")
+    return storage
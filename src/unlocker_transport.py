@@ -0,0 +1,263 @@
+"""
+Bright Data Unlocker API için ortak HTTP transport katmanı
+
+Bir kontrolde api.brightdata.com'a 5-6 çağrı yapılır (sayfa GET, CAPTCHA POST,
+4 form POST'u). Hepsi bu katmandan geçer; böylece aynı keep-alive bağlantı
+havuzu kullanılır ve her çağrı için yeni TCP+TLS el sıkışması yapılmaz.
+
+Havuzdan yeniden kullanılan bağlantılar "hit", yeni açılan bağlantılar
+"miss" olarak sayılır.
+"""
+
+import socket
+import threading
+import time
+import logging
+
+import aiohttp
+import requests
+from multidict import CIMultiDict
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Bağlantı havuzu sayaçları (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def as_dict(self):
+        """Sayaçları dict olarak döndür"""
+        with self._lock:
+            misses = self.new_connections
+            hits = max(self.requests - misses, 0)
+            return {
+                'requests': self.requests,
+                'pool_hits': hits,
+                'pool_misses': misses,
+                'hit_rate': round(hits / self.requests, 3) if self.requests else 0.0
+            }
+
+
+def _counting_pool_classes(stats):
+    """connect() çağrılarını sayan urllib3 pool sınıflarını oluştur"""
+
+    class CountingHTTPConnection(HTTPConnection):
+        def connect(self):
+            stats.record_new_connection()
+            super().connect()
+
+    class CountingHTTPSConnection(HTTPSConnection):
+        def connect(self):
+            stats.record_new_connection()
+            super().connect()
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = CountingHTTPConnection
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = CountingHTTPSConnection
+
+    return {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+
+class _PooledAdapter(HTTPAdapter):
+    """TCP keep-alive açık, bağlantı sayan HTTPAdapter"""
+
+    def __init__(self, stats, **kwargs):
+        self._pool_classes = _counting_pool_classes(stats)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault(
+            'socket_options',
+            HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        )
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes
+
+
+class UnlockerTransport:
+    """
+    Senkron Unlocker transport'u (requests.Session + bağlantı havuzu)
+
+    Args:
+        config: Config nesnesi (verilmezse oluşturulur)
+        pool_size: Host başına tutulacak maksimum bağlantı
+        keepalive: Boşta kalan bağlantının yeniden kullanılacağı maksimum süre (s);
+                   daha uzun boşta kalan havuz, sunucu bağlantıyı kapatmış
+                   olabileceği için yenilenir
+        connect_timeout: Bağlantı kurma timeout'u (s)
+        read_timeout: Cevap okuma timeout'u (s)
+    """
+
+    def __init__(self, config=None, pool_size=None, keepalive=None,
+                 connect_timeout=None, read_timeout=None):
+        self.config = config or Config()
+        self.pool_size = pool_size or self.config.BRIGHTDATA_POOL_SIZE
+        self.keepalive = keepalive if keepalive is not None else self.config.BRIGHTDATA_KEEPALIVE
+        self.connect_timeout = connect_timeout or self.config.BRIGHTDATA_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or self.config.BRIGHTDATA_READ_TIMEOUT
+
+        self.stats = PoolStats()
+        self._last_used = None
+        self._in_flight = 0
+        # Paylaşılan transport'ta (gunicorn thread'leri) boşta kalma kontrolü,
+        # havuz temizliği ve süren istek sayacı aynı kilitle korunur
+        self._idle_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = _PooledAdapter(
+            self.stats,
+            pool_connections=1,
+            pool_maxsize=self.pool_size
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @property
+    def headers(self):
+        """Bright Data API header'ları"""
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.config.BRIGHTDATA_API_KEY}"
+        }
+
+    def _expire_idle_connections(self):
+        """
+        keepalive süresinden uzun boşta kalan bağlantıları kapat ve isteği başlat
+
+        Havuz yalnızca süren istek yokken temizlenir; başka bir thread'in
+        kullandığı bağlantı kapatılmaz.
+        """
+        with self._idle_lock:
+            idle = self._last_used is not None and time.monotonic() - self._last_used > self.keepalive
+            if idle and not self._in_flight:
+                for adapter in self.session.adapters.values():
+                    adapter.poolmanager.clear()
+            self._in_flight += 1
+
+    def _request_done(self):
+        """İstek bitti: boşta kalma süresi buradan sayılır"""
+        with self._idle_lock:
+            self._in_flight -= 1
+            self._last_used = time.monotonic()
+
+    def post(self, payload, read_timeout=None):
+        """
+        Unlocker API'ye payload POST et
+
+        Args:
+            payload: Unlocker request gövdesi
+            read_timeout: Bu çağrı için okuma timeout'u (verilmezse varsayılan)
+
+        Returns:
+            requests.Response
+        """
+        self._expire_idle_connections()
+        self.stats.record_request()
+        try:
+            return self.session.post(
+                self.config.BRIGHTDATA_API_URL,
+                json=payload,
+                headers=self.headers,
+                timeout=(self.connect_timeout, read_timeout or self.read_timeout)
+            )
+        finally:
+            self._request_done()
+
+    def close(self):
+        """Havuzdaki bağlantıları kapat"""
+        self.session.close()
+
+
+class AsyncUnlockerTransport:
+    """
+    Asyncio Unlocker transport'u (aiohttp.ClientSession + TCPConnector)
+
+    Parametreler UnlockerTransport ile aynıdır. Hit/miss sayımı aiohttp
+    trace hook'larıyla yapılır.
+    """
+
+    def __init__(self, config=None, pool_size=None, keepalive=None,
+                 connect_timeout=None, read_timeout=None):
+        self.config = config or Config()
+        self.pool_size = pool_size or self.config.BRIGHTDATA_POOL_SIZE
+        self.keepalive = keepalive if keepalive is not None else self.config.BRIGHTDATA_KEEPALIVE
+        self.connect_timeout = connect_timeout or self.config.BRIGHTDATA_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or self.config.BRIGHTDATA_READ_TIMEOUT
+
+        self.stats = PoolStats()
+        self.session = None
+
+    @property
+    def headers(self):
+        """Bright Data API header'ları"""
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.config.BRIGHTDATA_API_KEY}"
+        }
+
+    def _get_session(self):
+        """ClientSession'ı ilk kullanımda (event loop içinde) oluştur"""
+        if self.session is None or self.session.closed:
+            async def on_request_start(session, ctx, params):
+                self.stats.record_request()
+
+            async def on_connection_create_end(session, ctx, params):
+                self.stats.record_new_connection()
+
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_request_start.append(on_request_start)
+            trace_config.on_connection_create_end.append(on_connection_create_end)
+
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_size,
+                    keepalive_timeout=self.keepalive
+                ),
+                trace_configs=[trace_config]
+            )
+        return self.session
+
+    async def post(self, payload, read_timeout=None):
+        """
+        Unlocker API'ye payload POST et
+
+        Returns:
+            tuple: (status_code: int, text: str, headers: CIMultiDict)
+        """
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=self.connect_timeout,
+            sock_read=read_timeout or self.read_timeout
+        )
+        async with self._get_session().post(
+            self.config.BRIGHTDATA_API_URL,
+            json=payload,
+            headers=self.headers,
+            timeout=timeout
+        ) as response:
+            text = await response.text()
+            # CIMultiDict: requests'teki gibi büyük/küçük harf duyarsız header erişimi
+            return response.status, text, CIMultiDict(response.headers)
+
+    async def close(self):
+        """Havuzdaki bağlantıları kapat"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
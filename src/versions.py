@@ -0,0 +1,41 @@
+"""
+Durum sürüm sayaçları (koşullu GET için)
+
+Her kaynağın (status, progress, history, stats) bir sürüm numarası vardır;
+kaynak değiştiğinde artırılır. Endpoint'ler ETag'i bu sayaçtan üretir ve
+If-None-Match eşleşirse yanıtı (ve veritabanı sorgusunu) hiç üretmeden
+304 döner. Sayaçlar süreç başına bir önekle birleştirilir; yeniden
+başlatma sonrası eski ETag'ler eşleşmez.
+"""
+
+import threading
+import uuid
+
+
+class VersionCounters:
+    """Kaynak başına artan sürüm numaraları"""
+
+    def __init__(self):
+        self.boot = uuid.uuid4().hex[:8]
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *names):
+        """Verilen kaynakların sürümünü artır (yazma tamamlandıktan sonra çağrılmalı)"""
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+    def get(self, name):
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def etag(self, name, *extra):
+        """
+        Kaynağın zayıf ETag değeri (tırnaksız)
+
+        Args:
+            extra: Yanıtı etkileyen sorgu parametreleri
+        """
+        parts = [name, self.boot, str(self.get(name))] + [str(e) for e in extra]
+        return '-'.join(parts)
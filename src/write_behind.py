@@ -0,0 +1,158 @@
+"""
+Write-behind kalıcılık kuyruğu
+
+Kontrol ve CAPTCHA sonuçları kontrolün kritik yolunda veritabanına
+yazılmaz; kuyruğa bırakılır ve arka plan thread'i bunları toplu halde
+(executemany, flush başına tek transaction) yazar. Kuyruk dolarsa yeni
+kayıt düşürülür ve sayılır; kontrol asla beklemez.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """
+    Toplu yazan arka plan kuyruğu
+
+    Args:
+        writers: [writer(batch) -> bool, ...]; batch {tür: [kayıt, ...]}
+            biçimindedir, her writer kendi transaction'ını açar
+        batch_size: Bu kadar kayıt birikince beklemeden yaz
+        flush_interval: En geç bu kadar saniyede bir yaz
+        max_pending: Bekleyen en fazla kayıt (dolunca yeni kayıt düşürülür)
+        on_flush: Her flush'tan sonra çağrılır (batch alır)
+    """
+
+    def __init__(self, writers, batch_size=100, flush_interval=2.0,
+                 max_pending=10000, on_flush=None):
+        self.writers = list(writers)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.on_flush = on_flush
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._worker = threading.Thread(target=self._run, name='write-behind', daemon=True)
+
+        self.submitted = {}
+        self.dropped = {}
+        self.written = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.high_water = 0
+        self.backpressure_events = 0  # Kuyruk %80 doluluğu aştığında
+        self.last_flush_ms = None
+        self._worker.start()
+
+    def submit(self, kind, record):
+        """
+        Kaydı kuyruğa bırak (bloklamaz)
+
+        Returns:
+            bool: Kuyruğa alındı mı (dolu ya da kapanıyorsa False)
+        """
+        with self._cond:
+            if self._closing or len(self._pending) >= self.max_pending:
+                self.dropped[kind] = self.dropped.get(kind, 0) + 1
+                return False
+            self._pending.append((kind, record))
+            self.submitted[kind] = self.submitted.get(kind, 0) + 1
+
+            pending = len(self._pending)
+            if pending > self.high_water:
+                self.high_water = pending
+            if pending == int(self.max_pending * 0.8):
+                self.backpressure_events += 1
+            if pending >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _take_batch(self):
+        batch = {}
+        for _ in range(min(self.batch_size, len(self._pending))):
+            kind, record = self._pending.popleft()
+            batch.setdefault(kind, []).append(record)
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closing and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if not self._pending:
+                    if self._closing:
+                        return
+                    continue
+                batch = self._take_batch()
+            self._flush(batch)
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        ok = True
+        for writer in self.writers:
+            try:
+                ok = writer(batch) is not False and ok
+            except Exception as e:
+                ok = False
+                logger.error(f"❌ Toplu yazma hatası: {e}")
+
+        count = sum(len(records) for records in batch.values())
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.batches += 1
+        self.flushed += count
+        if ok:
+            self.written += count
+        else:
+            self.failed_batches += 1
+        if self.on_flush:
+            try:
+                self.on_flush(batch)
+            except Exception as e:
+                logger.error(f"❌ Flush sonrası hata: {e}")
+
+    def flush(self):
+        """Bekleyen tüm kayıtları çağıran thread'de hemen yaz"""
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+            if not batch:
+                return
+            self._flush(batch)
+
+    def close(self, timeout=10):
+        """Yeni kayıt almayı bırak, bekleyenleri yaz ve thread'i durdur"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._worker.join(timeout)
+        if self._worker.is_alive():
+            logger.warning(f"⚠️ Write-behind kuyruğu {timeout}s içinde boşalmadı ({len(self._pending)} kayıt)")
+        else:
+            logger.info("💾 Write-behind kuyruğu boşaltıldı")
+
+    def metrics(self):
+        """Kuyruk / flush sayaçları"""
+        with self._cond:
+            pending = len(self._pending)
+            submitted, dropped = dict(self.submitted), dict(self.dropped)
+        return {
+            'pending': pending,
+            'max_pending': self.max_pending,
+            'high_water': self.high_water,
+            'backpressure_events': self.backpressure_events,
+            'submitted': submitted,
+            'dropped': dropped,
+            'written': self.written,
+            'batches': self.batches,
+            'failed_batches': self.failed_batches,
+            'avg_batch_size': round(self.flushed / self.batches, 2) if self.batches else 0,
+            'last_flush_ms': self.last_flush_ms
+        }
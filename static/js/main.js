@@ -5,13 +5,18 @@ let statsInterval = null;
 let detailedLogsInterval = null;
 let isCheckingNow = false; // Çift tıklama koruması
 
+let liveStream = null;        // /api/stream EventSource
+let liveRetryTimer = null;
+let currentStatus = {};       // SSE delta'larının uygulandığı son durum
+let historyData = [];         // Son kontroller (SSE ile başa eklenir)
+let logCursor = null;         // Alınan son backend log seq'i
+
 // Sayfa yüklendiğinde
 document.addEventListener('DOMContentLoaded', () => {
     console.log('🚀 Uygulama başlatıldı');
     loadStatus();
     loadHistory();
-    startStatusPolling();
-    startDetailedLogsPolling(); // Detaylı log polling başlat
+    startLiveUpdates(); // SSE; desteklenmez / koparsa polling
 });
 
 // İzlemeyi başlat
@@ -42,8 +47,8 @@ async function startMonitoring() {
             addLog(`✅ İzleme başlatıldı (${interval}s aralıklarla)`, 'success');
             showToast('İzleme başlatıldı!', 'success');
             
-            // Durum güncellemelerini başlat
-            if (!statusInterval) {
+            // Durum güncellemelerini başlat (SSE yoksa polling)
+            if (!liveStream && !statusInterval) {
                 startStatusPolling();
             }
         } else {
@@ -102,27 +107,37 @@ async function checkNow() {
         showProgressCard();
         resetProgress();
         
-        // Progress polling başlat
-        const progressPoll = setInterval(updateProgress, 500);
-        
+        // Kontrol arka planda iş olarak çalışır; 202 + iş kimliği döner
         const response = await fetch('/api/check-now', {
             method: 'POST'
         });
         
-        clearInterval(progressPoll);
-        
         const data = await response.json();
         
-        if (response.ok) {
+        if (!response.ok) {
+            hideProgressCard();
+            addLog(`❌ Kontrol hatası: ${data.error}`, 'error');
+            showToast(data.error, 'error');
+            return;
+        }
+        
+        if (!data.created) {
+            addLog(`🔗 Devam eden kontrole bağlanıldı (${data.job_id})`, 'info');
+        }
+        
+        const job = await waitForJob(data.url);
+        
+        if (job.state === 'done' && !job.result?.error) {
             setProgress(6, 'Tamamlandı!');
             setTimeout(() => hideProgressCard(), 2000);
-            addLog(`✅ Kontrol tamamlandı: ${data.result}`, 'success');
+            addLog(`✅ Kontrol tamamlandı: ${job.result?.status} (${job.run_ms}ms)`, 'success');
             showToast('Kontrol tamamlandı!', 'success');
             loadHistory();
         } else {
+            const error = job.error || job.result?.error || 'Bilinmeyen hata';
             hideProgressCard();
-            addLog(`❌ Kontrol hatası: ${data.error}`, 'error');
-            showToast(data.error, 'error');
+            addLog(`❌ Kontrol hatası: ${error}`, 'error');
+            showToast(error, 'error');
         }
     } catch (error) {
         hideProgressCard();
@@ -137,6 +152,25 @@ async function checkNow() {
     }
 }
 
+// İş bitene kadar durumunu izle (adımları progress kartına yansıt)
+async function waitForJob(url) {
+    while (true) {
+        const response = await fetch(url);
+        const job = await response.json();
+        
+        if (!response.ok) {
+            return { state: 'failed', error: job.error };
+        }
+        if (job.step > 0) {
+            setProgress(job.step, job.message);
+        }
+        if (job.state !== 'queued' && job.state !== 'running') {
+            return job;
+        }
+        await new Promise(resolve => setTimeout(resolve, 500));
+    }
+}
+
 // Progress card göster/gizle
 function showProgressCard() {
     const card = document.getElementById('progressCard');
@@ -152,20 +186,6 @@ function hideProgressCard() {
     }, 300);
 }
 
-// Progress güncelle
-async function updateProgress() {
-    try {
-        const response = await fetch('/api/progress');
-        const data = await response.json();
-        
-        if (data.step > 0) {
-            setProgress(data.step, data.message);
-        }
-    } catch (error) {
-        console.error('Progress güncelleme hatası:', error);
-    }
-}
-
 // Progress set et
 function setProgress(step, message) {
     // Progress bar güncelle
@@ -202,49 +222,126 @@ function startStatusPolling() {
     statsInterval = setInterval(loadHistory, 5000); // 5 saniyede bir
 }
 
+function stopPolling() {
+    if (statusInterval) clearInterval(statusInterval);
+    if (statsInterval) clearInterval(statsInterval);
+    if (detailedLogsInterval) clearInterval(detailedLogsInterval);
+    statusInterval = statsInterval = detailedLogsInterval = null;
+}
+
+function startPolling() {
+    if (statusInterval) return;
+    startStatusPolling();
+    startDetailedLogsPolling();
+}
+
+// Canlı güncellemeler: /api/stream (SSE) yalnızca değişiklikleri gönderir.
+// Bağlantı kurulamazsa veya koparsa eski polling devreye girer.
+function startLiveUpdates() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+    
+    liveStream = new EventSource('/api/stream');
+    
+    liveStream.onopen = () => {
+        stopPolling();
+    };
+    
+    liveStream.onerror = () => {
+        // Tarayıcı Last-Event-ID ile kendisi yeniden bağlanır; bu arada polling
+        startPolling();
+        if (liveStream.readyState === EventSource.CLOSED) {
+            // Sunucu reddetti (ör. bağlantı sınırı): bir süre sonra tekrar dene
+            liveStream = null;
+            clearTimeout(liveRetryTimer);
+            liveRetryTimer = setTimeout(startLiveUpdates, 30000);
+        }
+    };
+    
+    // İlk bağlantıda tam durum; 'reset' ise kaçırılan olaylar tamponda yoktu
+    const onSnapshot = (event) => {
+        const data = JSON.parse(event.data);
+        currentStatus = data.status;
+        renderStatus(currentStatus);
+        if (event.type === 'snapshot') {
+            data.logs.forEach(prependLog);
+        }
+        loadHistory();
+    };
+    liveStream.addEventListener('snapshot', onSnapshot);
+    liveStream.addEventListener('reset', onSnapshot);
+    
+    liveStream.addEventListener('status', (event) => {
+        Object.assign(currentStatus, JSON.parse(event.data));
+        renderStatus(currentStatus);
+    });
+    
+    liveStream.addEventListener('progress', (event) => {
+        const progress = JSON.parse(event.data);
+        currentStatus.progress = progress;
+        if (document.getElementById('progressCard').style.display === 'block' && progress.step > 0) {
+            setProgress(progress.step, progress.message);
+        }
+    });
+    
+    liveStream.addEventListener('log', (event) => {
+        prependLog(JSON.parse(event.data));
+    });
+    
+    liveStream.addEventListener('history', (event) => {
+        historyData.unshift(JSON.parse(event.data));
+        historyData = historyData.slice(0, 50);
+        renderHistory(historyData);
+    });
+}
+
+// Backend log kaydını log paneline ekle (en yeni üstte, seq ile tekrarsız)
+function prependLog(log) {
+    if (logCursor !== null && log.seq <= logCursor) {
+        return;
+    }
+    logCursor = log.seq;
+    
+    const logContainer = document.getElementById('logContainer');
+    const logEntry = document.createElement('div');
+    const typeClass = log.level === 'ERROR' ? 'error' : 
+                     log.level === 'WARNING' ? 'warning' : 
+                     log.level === 'SUCCESS' ? 'success' : 'info';
+    
+    logEntry.className = `log-entry ${typeClass}`;
+    logEntry.innerHTML = `
+        <span class="log-time">${log.timestamp}</span>
+        <span class="log-message">${log.message}</span>
+    `;
+    logContainer.insertBefore(logEntry, logContainer.firstChild);
+    
+    // En fazla 100 log tut
+    while (logContainer.children.length > 100) {
+        logContainer.removeChild(logContainer.lastChild);
+    }
+}
+
 // Detaylı log polling (gerçek zamanlı backend logları)
 function startDetailedLogsPolling() {
     detailedLogsInterval = setInterval(loadDetailedLogs, 500); // 0.5 saniyede bir (ÇOK HIZLI!)
     loadDetailedLogs(); // İlk yüklemeyi hemen yap
 }
 
-// Backend'den detaylı logları yükle
+// Backend'den detaylı logları yükle (yalnızca imleçten sonrakiler)
 async function loadDetailedLogs() {
     try {
-        const response = await fetch('/api/logs/recent');
+        const url = logCursor === null ? '/api/logs/recent' : `/api/logs/recent?after=${logCursor}`;
+        const response = await fetch(url);
         const data = await response.json();
         
-        if (data.logs && data.logs.length > 0) {
-            const logContainer = document.getElementById('logContainer');
-            
-            // Mevcut logları sakla
-            const currentLogs = Array.from(logContainer.children);
-            const currentCount = currentLogs.length;
-            
-            // Yeni logları ekle (en yeni önce)
-            data.logs.reverse().forEach(log => {
-                const logEntry = document.createElement('div');
-                const typeClass = log.level === 'ERROR' ? 'error' : 
-                                 log.level === 'WARNING' ? 'warning' : 
-                                 log.level === 'SUCCESS' ? 'success' : 'info';
-                
-                logEntry.className = `log-entry ${typeClass}`;
-                logEntry.innerHTML = `
-                    <span class="log-time">${log.timestamp}</span>
-                    <span class="log-message">${log.message}</span>
-                `;
-                
-                // Yeni logu en üste ekle
-                if (currentCount === 0 || logEntry.textContent !== currentLogs[0].textContent) {
-                    logContainer.insertBefore(logEntry, logContainer.firstChild);
-                }
-            });
-            
-            // En fazla 100 log tut
-            while (logContainer.children.length > 100) {
-                logContainer.removeChild(logContainer.lastChild);
-            }
+        if (data.truncated) {
+            // Sunucu yeniden başladı / kayıt kaçırıldı: imleç yanıttan devam eder
+            logCursor = null;
         }
+        data.logs.forEach(prependLog);
+        logCursor = data.next;
         
     } catch (error) {
         console.error('Detaylı log yükleme hatası:', error);
@@ -255,123 +352,130 @@ async function loadDetailedLogs() {
 async function loadStatus() {
     try {
         const response = await fetch('/api/status');
-        const data = await response.json();
-        
-        // Durum göstergesini güncelle
-        const statusDot = document.getElementById('statusDot');
-        const statusText = document.getElementById('statusText');
-        
-        if (data.monitoring_active) {
-            statusDot.className = 'status-dot active';
-            statusText.textContent = 'İzleme aktif';
-            isMonitoring = true;
-        } else {
-            statusDot.className = 'status-dot';
-            statusText.textContent = 'Sistem hazır';
-            isMonitoring = false;
+        currentStatus = await response.json();
+        renderStatus(currentStatus);
+    } catch (error) {
+        console.error('Durum yükleme hatası:', error);
+    }
+}
+
+// Durumu ekrana yansıt
+function renderStatus(data) {
+    // Durum göstergesini güncelle
+    const statusDot = document.getElementById('statusDot');
+    const statusText = document.getElementById('statusText');
+    
+    if (data.monitoring_active) {
+        statusDot.className = 'status-dot active';
+        statusText.textContent = 'İzleme aktif';
+        isMonitoring = true;
+    } else {
+        statusDot.className = 'status-dot';
+        statusText.textContent = 'Sistem hazır';
+        isMonitoring = false;
+    }
+    
+    // Son kontrol bilgilerini güncelle
+    if (data.last_check_time) {
+        const lastCheckDate = new Date(data.last_check_time * 1000);
+        document.getElementById('lastCheck').textContent = lastCheckDate.toLocaleString('tr-TR');
+    }
+    
+    document.getElementById('lastResult').textContent = data.last_check_status;
+    document.getElementById('checkInterval').textContent = data.check_interval;
+    
+    // CAPTCHA görselini göster (otomatik güncelleme)
+    const captchaCard = document.getElementById('captchaCard');
+    const captchaImage = document.getElementById('captchaImage');
+    const captchaText = document.getElementById('captchaText');
+    
+    if (data.captcha_url) {
+        // CAPTCHA varsa kartı göster
+        if (captchaCard.style.display === 'none') {
+            captchaCard.style.display = 'block';
+            captchaCard.style.animation = 'fadeIn 0.3s ease-in';
         }
         
-        // Son kontrol bilgilerini güncelle
-        if (data.last_check_time) {
-            const lastCheckDate = new Date(data.last_check_time * 1000);
-            document.getElementById('lastCheck').textContent = lastCheckDate.toLocaleString('tr-TR');
+        // Görsel değiştiyse güncelle (smooth transition; URL içerik adresli, tarayıcı önbellekler)
+        if (captchaImage.dataset.hash !== data.captcha_hash) {
+            captchaImage.dataset.hash = data.captcha_hash;
+            captchaImage.style.opacity = '0.3';
+            setTimeout(() => {
+                captchaImage.src = data.captcha_url;
+                captchaImage.style.opacity = '1';
+            }, 150);
         }
         
-        document.getElementById('lastResult').textContent = data.last_check_status;
-        document.getElementById('checkInterval').textContent = data.check_interval;
-        
-        // CAPTCHA görselini göster (otomatik güncelleme)
-        const captchaCard = document.getElementById('captchaCard');
-        const captchaImage = document.getElementById('captchaImage');
-        const captchaText = document.getElementById('captchaText');
-        
-        if (data.captcha_image) {
-            // CAPTCHA varsa kartı göster
-            if (captchaCard.style.display === 'none') {
-                captchaCard.style.display = 'block';
-                captchaCard.style.animation = 'fadeIn 0.3s ease-in';
-            }
-            
-            // Görsel değiştiyse güncelle (smooth transition)
-            if (captchaImage.src !== data.captcha_image) {
-                captchaImage.style.opacity = '0.3';
-                setTimeout(() => {
-                    captchaImage.src = data.captcha_image;
-                    captchaImage.style.opacity = '1';
-                }, 150);
-            }
-            
-            // Metin değiştiyse güncelle (smooth transition)
-            if (captchaText.textContent !== (data.captcha_text || '-')) {
-                captchaText.style.transform = 'scale(1.2)';
-                captchaText.style.color = '#28a745';
-                captchaText.textContent = data.captcha_text || '-';
-                setTimeout(() => {
-                    captchaText.style.transform = 'scale(1)';
-                    captchaText.style.color = '#007bff';
-                }, 300);
-            }
-        } else {
-            captchaCard.style.display = 'none';
+        // Metin değiştiyse güncelle (smooth transition)
+        if (captchaText.textContent !== (data.captcha_text || '-')) {
+            captchaText.style.transform = 'scale(1.2)';
+            captchaText.style.color = '#28a745';
+            captchaText.textContent = data.captcha_text || '-';
+            setTimeout(() => {
+                captchaText.style.transform = 'scale(1)';
+                captchaText.style.color = '#007bff';
+            }, 300);
         }
-        
-        updateUIState(data.monitoring_active);
-        
-    } catch (error) {
-        console.error('Durum yükleme hatası:', error);
+    } else {
+        captchaCard.style.display = 'none';
     }
+    
+    updateUIState(data.monitoring_active);
 }
 
 // Kontrol geçmişini yükle
 async function loadHistory() {
     try {
         const response = await fetch('/api/history');
-        const data = await response.json();
-        
-        const historyContainer = document.getElementById('historyContainer');
-        
-        if (data.length === 0) {
-            historyContainer.innerHTML = '<p class="text-muted">Henüz kontrol yapılmadı...</p>';
-            return;
-        }
-        
-        // İstatistikleri hesapla
-        const totalChecks = data.length;
-        const successfulChecks = data.filter(c => c.status === 'success').length;
-        const failedChecks = data.filter(c => c.error).length;
-        const appointmentsFound = data.filter(c => c.appointment_found).length;
-        
-        document.getElementById('totalChecks').textContent = totalChecks;
-        document.getElementById('successfulChecks').textContent = successfulChecks;
-        document.getElementById('failedChecks').textContent = failedChecks;
-        document.getElementById('appointmentsFound').textContent = appointmentsFound;
-        
-        // Geçmişi göster
-        historyContainer.innerHTML = data.slice(0, 10).map(check => {
-            const date = new Date(check.timestamp);
-            const statusClass = check.error ? 'error' : 'success';
-            const badgeClass = check.error ? 'badge-error' : 'badge-success';
-            const statusText = check.appointment_found ? '🎉 Randevu bulundu!' : 
-                             check.error ? `❌ ${check.error}` : '✅ Başarılı';
-            
-            return `
-                <div class="history-item ${statusClass}">
-                    <div class="history-info">
-                        <div class="history-time">${date.toLocaleString('tr-TR')}</div>
-                        <div class="history-status">${statusText}</div>
-                    </div>
-                    <div class="history-badge ${badgeClass}">
-                        ${check.appointment_found ? 'Randevu' : check.error ? 'Hata' : 'Kontrol'}
-                    </div>
-                </div>
-            `;
-        }).join('');
-        
+        historyData = await response.json();
+        renderHistory(historyData);
     } catch (error) {
         console.error('Geçmiş yükleme hatası:', error);
     }
 }
 
+// Geçmişi ve özet sayaçları ekrana yansıt
+function renderHistory(data) {
+    const historyContainer = document.getElementById('historyContainer');
+    
+    if (data.length === 0) {
+        historyContainer.innerHTML = '<p class="text-muted">Henüz kontrol yapılmadı...</p>';
+        return;
+    }
+    
+    // İstatistikleri hesapla
+    const totalChecks = data.length;
+    const successfulChecks = data.filter(c => c.status === 'success').length;
+    const failedChecks = data.filter(c => c.error).length;
+    const appointmentsFound = data.filter(c => c.appointment_found).length;
+    
+    document.getElementById('totalChecks').textContent = totalChecks;
+    document.getElementById('successfulChecks').textContent = successfulChecks;
+    document.getElementById('failedChecks').textContent = failedChecks;
+    document.getElementById('appointmentsFound').textContent = appointmentsFound;
+    
+    // Geçmişi göster
+    historyContainer.innerHTML = data.slice(0, 10).map(check => {
+        const date = new Date(check.timestamp);
+        const statusClass = check.error ? 'error' : 'success';
+        const badgeClass = check.error ? 'badge-error' : 'badge-success';
+        const statusText = check.appointment_found ? '🎉 Randevu bulundu!' : 
+                         check.error ? `❌ ${check.error}` : '✅ Başarılı';
+        
+        return `
+            <div class="history-item ${statusClass}">
+                <div class="history-info">
+                    <div class="history-time">${date.toLocaleString('tr-TR')}</div>
+                    <div class="history-status">${statusText}</div>
+                </div>
+                <div class="history-badge ${badgeClass}">
+                    ${check.appointment_found ? 'Randevu' : check.error ? 'Hata' : 'Kontrol'}
+                </div>
+            </div>
+        `;
+    }).join('');
+}
+
 // Geçmişi yenile
 function refreshHistory() {
     addLog('🔄 Geçmiş yenileniyor...', 'info');
@@ -442,6 +546,7 @@ function showToast(message, type = 'info') {
 
 // Sayfa kapatılırken polling'i durdur
 window.addEventListener('beforeunload', () => {
+    if (liveStream) liveStream.close();
     if (statusInterval) clearInterval(statusInterval);
     if (statsInterval) clearInterval(statsInterval);
     if (detailedLogsInterval) clearInterval(detailedLogsInterval);